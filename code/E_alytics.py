@@ -1,21 +1,37 @@
+import os
+import time
+import uuid
 import streamlit as st
 import pandas as pd
-from Stats import parse_demo_file, parse_game_events
-from stat_viz import combine_heatmaps, create_heatmap_visuals
+from ingest import submit_parse_job, shared_view
+from demo_archive import DEMO_UPLOAD_TYPES, extract_demos, collect_demo_paths, demo_fingerprint
+from demo_index import catalogue_demos
+from stat_viz import HeadToHead, process_kills_data, create_heatmap_visuals
+from player_rounds import aggregate_player_stats, filter_player_rounds
+from event_index import events_in_rounds
+from export import EXPORT_FORMATS, export_archive
+from api_server import API_PORT_ENV, API_URL_ENV, export_url, serve_api
+from parse_cache import PARSE_CACHE_DIR, cached_demo_ids
+from search_index import SEARCH_DOCUMENTS_NAME, load_search_index
 from map_viz import (
     generate_map_visuals,
-    extract_map_name_from_filename,
     get_available_maps,
-    create_tab_customizations
+    create_tab_customizations,
+    collect_map_points,
+    build_position_index,
+    plot_hotspots,
 )
+from hotspots import ROUND_PHASES, match_hotspots, merge_hotspots
+from metrics import METRICS_PORT_ENV, RENDER_SECONDS, RERUN_SECONDS, serve_metrics
 
 
-def combine_game_events(parsed_matches):
+def combine_game_events(parsed_matches, round_range=None):
     """
     Combines game events across multiple matches into unified DataFrames.
 
     Parameters:
         parsed_matches (dict): Parsed matches with game events.
+        round_range (tuple): (first, last) rounds to keep, sliced per match through its round index (optional).
 
     Returns:
         dict: Combined DataFrames for all game events.
@@ -23,12 +39,255 @@ def combine_game_events(parsed_matches):
     combined_events = {key: [] for key in ["kills", "damages", "bomb_events", "grenades", "smokes", "infernos"]}
 
     for match_data in parsed_matches.values():
+        round_index = match_data.get("round_index")
         for event_type, event_df in match_data["game_events"].items():
+            # Ticks restart every demo, so rounds are sliced before the matches are stacked
+            if round_range is not None and round_index is not None:
+                event_df = events_in_rounds(event_df, round_index, *round_range)
             combined_events[event_type].append(event_df)
 
     return {event: pd.concat(dfs, ignore_index=True) for event, dfs in combined_events.items() if dfs}
 
 
+def combine_player_round_facts(parsed_matches):
+    """
+    Combines the per-player-per-round fact tables of multiple matches, tagging each row with its map.
+
+    Parameters:
+        parsed_matches (dict): Parsed matches with 'player_round_facts' and 'kills_df'.
+
+    Returns:
+        pd.DataFrame: Combined fact table with a 'map_name' column.
+    """
+    facts = []
+    for match_data in parsed_matches.values():
+        if "player_round_facts" not in match_data:
+            continue
+        map_name = match_data["kills_df"]["map_name"].iloc[0] if "map_name" in match_data["kills_df"] else None
+        facts.append(match_data["player_round_facts"].assign(map_name=map_name))
+
+    if not facts:
+        return pd.DataFrame()
+    return pd.concat(facts, ignore_index=True)
+
+
+def combine_economy(parsed_matches):
+    """
+    Combines the per-round buy-type tables of multiple matches, tagging each row with its demo file.
+
+    Parameters:
+        parsed_matches (dict): Parsed matches with 'economy'.
+
+    Returns:
+        pd.DataFrame: Combined buy-type table with a 'file_name' column.
+    """
+    economy = [
+        match_data["economy"].assign(file_name=match_data.get("file_name"))
+        for match_data in parsed_matches.values()
+        if match_data.get("economy") is not None
+    ]
+    if not economy:
+        return pd.DataFrame()
+    return pd.concat(economy, ignore_index=True)
+
+
+def show_ingest_progress(ingest_jobs, parsed_matches, session=None):
+    """
+    Shows a progress bar and cancel button for each background parse, and moves finished
+    results into parsed_matches.
+
+    Parameters:
+        ingest_jobs (dict): Demo ID -> ParseJob.
+        parsed_matches (dict): Parsed matches keyed by demo ID, updated in place.
+        session (str): ID of this session, withdrawn from a shared job by its cancel button.
+
+    Returns:
+        bool: True while at least one job is still queued or running.
+    """
+    ingesting = False
+    for demo_id, job in ingest_jobs.items():
+        file_name = job.file_name
+        if job.status == "done":
+            if demo_id not in parsed_matches:
+                # The job and its result are shared with every session that loaded this demo
+                parsed_matches[demo_id] = {**shared_view(job.result), "demo_id": demo_id, "file_name": file_name}
+            continue
+        if job.status == "failed":
+            st.error(f"Error processing file {file_name}: {job.error}")
+            continue
+        if job.status == "cancelled":
+            st.sidebar.caption(f"Parsing of {file_name} was cancelled.")
+            continue
+
+        ingesting = True
+        col_progress, col_cancel = st.sidebar.columns([4, 1])
+        col_progress.progress(job.progress, text=f"{file_name}: {job.stage or job.status}")
+        if col_cancel.button("✕", key=f"cancel_{demo_id}", help=f"Cancel parsing {file_name}"):
+            job.cancel(session)
+
+    return ingesting
+
+
+def show_demo_library(folder="cache"):
+    """
+    Shows a header-only catalogue of the demos in a folder so they can be filtered before any full parse.
+
+    Parameters:
+        folder (str): Folder holding the demo library.
+
+    Returns:
+        list: (demo ID, demo file name, path) for the demos the user chose to parse.
+    """
+    with st.expander("Demo Library"):
+        if st.button("Scan demo library", key="scan_demo_library"):
+            st.session_state["demo_catalogue"] = catalogue_demos(folder)
+
+        catalogue = st.session_state.get("demo_catalogue")
+        if catalogue is None or catalogue.empty:
+            st.write(f"Scan the `{folder}` folder to list its demos.")
+            return []
+
+        library_maps = st.multiselect("Filter library by map", sorted(catalogue["map_name"].dropna().unique()))
+        if library_maps:
+            catalogue = catalogue[catalogue["map_name"].isin(library_maps)]
+        st.dataframe(catalogue.drop(columns=["path"]))
+
+        selected = st.multiselect("Demos to parse", catalogue["file_name"].tolist())
+        if not st.button("Parse selected demos", key="parse_demo_library") or not selected:
+            return []
+
+        demos = []
+        for _, row in catalogue[catalogue["file_name"].isin(selected)].iterrows():
+            with open(row["path"], "rb") as f:
+                demos.append((demo_fingerprint(f), row["file_name"], row["path"]))
+        return demos
+
+
+def show_demo_search(cache_dir=PARSE_CACHE_DIR):
+    """
+    Shows a sidebar search over every demo parsed so far, by player, steamid, team, map or tournament.
+
+    Parameters:
+        cache_dir (str): Parse cache folder holding the search documents.
+
+    Returns:
+        list: (demo ID, demo file name, path) for the matching demos the user chose to load.
+    """
+    query = st.sidebar.text_input("Search Demos", placeholder="player:m0nesy map:nuke")
+    if not query.strip():
+        return []
+
+    # The index is rebuilt only when ingest has written new documents
+    documents_path = os.path.join(cache_dir, SEARCH_DOCUMENTS_NAME)
+    index_key = os.path.getmtime(documents_path) if os.path.exists(documents_path) else None
+    if st.session_state.get("search_index_key") != index_key or "search_index" not in st.session_state:
+        st.session_state["search_index"] = load_search_index(cache_dir)
+        st.session_state["search_index_key"] = index_key
+    search_index = st.session_state["search_index"]
+
+    results = search_index.search(query)
+    st.sidebar.caption(f"{len(results)} matching demos")
+    selected = st.sidebar.multiselect(
+        "Search Results",
+        results,
+        default=results,
+        format_func=lambda demo_id: search_index.documents[demo_id]["file_name"],
+    )
+    if not selected or not st.sidebar.button("Load search results"):
+        return []
+    return [
+        (demo_id, search_index.documents[demo_id]["file_name"], search_index.documents[demo_id]["demo_path"])
+        for demo_id in selected
+    ]
+
+
+# Columns that name a player in the game event tables
+PLAYER_COLUMNS = ["attacker_name", "victim_name", "thrower", "thrower_name"]
+
+EVENT_PAGE_SIZES = [50, 100, 500]
+
+
+def filter_events(event_df, player=None, columns=None):
+    """
+    Filter a game event table on the server before anything is rendered.
+
+    Parameters:
+        event_df (pd.DataFrame): One game event table.
+        player (str): Keep events where this player appears in any player column (optional).
+        columns (list): Columns to keep, in order (optional).
+
+    Returns:
+        pd.DataFrame: The filtered table.
+    """
+    if player:
+        player_columns = [col for col in PLAYER_COLUMNS if col in event_df.columns]
+        event_df = event_df[(event_df[player_columns] == player).any(axis=1)]
+    if columns:
+        event_df = event_df[[col for col in columns if col in event_df.columns]]
+    return event_df
+
+
+def event_page(event_df, page, page_size):
+    """
+    Slice one page out of a game event table.
+
+    Parameters:
+        event_df (pd.DataFrame): The filtered table.
+        page (int): 1-based page number, clamped to the available pages.
+        page_size (int): Rows per page.
+
+    Returns:
+        tuple: (page DataFrame, page number used, total number of pages).
+    """
+    n_pages = max(1, -(-len(event_df) // page_size))
+    page = min(max(1, page), n_pages)
+    return event_df.iloc[(page - 1) * page_size:page * page_size], page, n_pages
+
+
+def event_players(event_df):
+    """Sorted names of every player that appears in a game event table."""
+    player_columns = [col for col in PLAYER_COLUMNS if col in event_df.columns]
+    players = pd.unique(event_df[player_columns].values.ravel()) if player_columns else []
+    return sorted(str(name) for name in players if pd.notna(name))
+
+
+def show_event_table(event_df, event_name, key, data_key=None):
+    """
+    Show a game event table one page at a time with column and player filters.
+
+    Only the visible page is sent to the browser, however many demos are loaded.
+
+    Parameters:
+        event_df (pd.DataFrame): One game event table.
+        event_name (str): Event type, used in labels.
+        key (str): Unique widget key prefix.
+        data_key (tuple): Identifies the loaded matches and rounds behind event_df; the player list
+            is only rebuilt when it changes (optional).
+    """
+    col_columns, col_player = st.columns([3, 2])
+    columns = col_columns.multiselect("Columns", list(event_df.columns), key=f"{key}_columns")
+    cached = st.session_state.get(f"{key}_players")
+    if data_key is None or cached is None or cached[0] != data_key:
+        cached = (data_key, event_players(event_df))
+        st.session_state[f"{key}_players"] = cached
+    player = col_player.selectbox("Player", ["All Players"] + cached[1], key=f"{key}_player")
+
+    filtered = filter_events(event_df, None if player == "All Players" else player, columns)
+
+    col_size, col_page = st.columns(2)
+    page_size = col_size.selectbox("Rows per page", EVENT_PAGE_SIZES, index=1, key=f"{key}_page_size")
+    n_pages = max(1, -(-len(filtered) // page_size))
+    # The page lives only in session state, so it can be clamped when a narrower filter leaves it out of range
+    st.session_state[f"{key}_page"] = min(st.session_state.get(f"{key}_page", 1), n_pages)
+    page = col_page.number_input("Page", min_value=1, max_value=n_pages, key=f"{key}_page")
+
+    page_df, page, n_pages = event_page(filtered, int(page), page_size)
+    st.dataframe(page_df)
+    first_row = (page - 1) * page_size
+    st.caption(f"Rows {first_row + 1 if len(page_df) else 0}-{first_row + len(page_df)} of {len(filtered)} {event_name} (page {page} of {n_pages})")
+    download_csv_button(filtered, f"{event_name.capitalize()} Data", key=f"{key}_csv")
+
+
 def download_csv_button(dataframe, label, key):
     """
     Adds a download button for a given DataFrame.
@@ -39,10 +298,10 @@ def download_csv_button(dataframe, label, key):
         key (str): Unique key for Streamlit to avoid duplicate element errors.
     """
     if not dataframe.empty:
-        csv = dataframe.to_csv(index=False).encode("utf-8")
+        # Encoded only when the button is clicked, not on every rerun
         st.download_button(
             label=f"Download {label} as CSV",
-            data=csv,
+            data=lambda: dataframe.to_csv(index=False).encode("utf-8"),
             file_name=f"{label.replace(' ', '_').lower()}.csv",
             mime="text/csv",
             key=key,  # Unique key
@@ -51,6 +310,12 @@ def download_csv_button(dataframe, label, key):
 
 
 def main():
+    """
+    Render the app once.
+
+    Returns:
+        bool: True while background parses are running and the script should poll again.
+    """
     st.title("E-Alytics: CS2 Demos Analysis")
 
     tournament_file = "cache/tournaments.csv"  # Adjust path based on screenshots
@@ -87,46 +352,96 @@ def main():
     st.info("To download files, click the download button on the page located on the right side.")
 
 
-    st.warning("If the files download as a compressed `.rar` file, you can use [7-Zip](https://www.7-zip.org/) to unzip them. "
-               "Simply download and install 7-Zip, then right-click the file and choose 'Extract Here'. Once downloaded, you can upload the `.dem` files into"
-               "this repository's `Cache` folder.")
+    st.info("Demo archives (`.rar`, `.zip`, `.gz`, `.bz2`) can be uploaded directly, every map inside is parsed in parallel. "
+            "Demos and archives placed in this repository's `cache` folder can be loaded with the sidebar button.")
     
     st.warning("If uploading multiple matches, please make sure to upload matches from the same series/matches to avoid errors in the analysis.")
     
-    # Allow multiple .dem file uploads
+    # Allow multiple demo or demo archive uploads
     uploaded_files = st.sidebar.file_uploader(
-        "Upload .dem files", type=["dem"], accept_multiple_files=True
+        "Upload .dem files or archives", type=DEMO_UPLOAD_TYPES, accept_multiple_files=True
     )
+    load_cache_folder = st.sidebar.button("Load demos from cache folder")
+
+    # Initialize session state to store parsed matches and background parses
+    if "parsed_matches" not in st.session_state:
+        st.session_state["parsed_matches"] = {}
+    if "ingest_jobs" not in st.session_state:
+        st.session_state["ingest_jobs"] = {}
+    if "ingested_uploads" not in st.session_state:
+        st.session_state["ingested_uploads"] = set()
+    if "session_id" not in st.session_state:
+        st.session_state["session_id"] = uuid.uuid4().hex  # Identifies this tab to shared parse jobs
+
+    # Stream new uploads (and archive members) into the scratch folder, fingerprinting each demo
+    new_demos = []
+    for uploaded_file in uploaded_files or []:
+        upload_key = getattr(uploaded_file, "file_id", uploaded_file.name)
+        if upload_key in st.session_state["ingested_uploads"]:
+            continue
+        st.session_state["ingested_uploads"].add(upload_key)
+        try:
+            new_demos.extend(extract_demos(uploaded_file, uploaded_file.name))
+        except Exception as e:
+            st.error(f"Error reading {uploaded_file.name}: {e}")
+    if load_cache_folder:
+        new_demos.extend(collect_demo_paths("cache"))
+    new_demos.extend(show_demo_library("cache"))
+    new_demos.extend(show_demo_search())
+
+    # Each distinct demo gets its own background job keyed by its content hash, so the same
+    # demo under another name is parsed once and a whole series ingests in parallel
+    for demo_id, demo_name, demo_path in new_demos:
+        if demo_id in st.session_state["parsed_matches"] or demo_id in st.session_state["ingest_jobs"]:
+            continue
+        st.session_state["ingest_jobs"][demo_id] = submit_parse_job(
+            demo_path, demo_name, demo_id=demo_id, session=st.session_state["session_id"]
+        )
+
+    if st.session_state["ingest_jobs"]:
+        ingesting = show_ingest_progress(
+            st.session_state["ingest_jobs"], st.session_state["parsed_matches"], st.session_state["session_id"]
+        )
 
-    if uploaded_files:
-        # Initialize session state to store parsed matches
-        if "parsed_matches" not in st.session_state:
-            st.session_state["parsed_matches"] = {}
-
-        # Process each uploaded file and store it in session state
-        for uploaded_file in uploaded_files:
-            if uploaded_file.name not in st.session_state["parsed_matches"]:
-                temp_path = f"temp_{uploaded_file.name}"
-                with open(temp_path, "wb") as f:
-                    f.write(uploaded_file.read())
-
-                @st.cache_data(show_spinner=False)
-                def process_demo_file_with_events(demo_path, file_name):
-                    parsed_data = parse_demo_file(demo_path)
-                    parsed_data["kills_df"]["map_name"] = extract_map_name_from_filename(file_name)
-                    parsed_data["game_events"] = parse_game_events(demo_path)  # Add game events parsing
-                    return parsed_data
-
-                try:
-                    # Parse the file and store results
-                    parsed_data = process_demo_file_with_events(temp_path, uploaded_file.name)
-                    st.session_state["parsed_matches"][uploaded_file.name] = parsed_data
-                except Exception as e:
-                    st.error(f"Error processing file {uploaded_file.name}: {e}")
+        if not st.session_state["parsed_matches"]:
+            # Nothing to show yet, poll again until the first demo is parsed
+            return ingesting
 
         # Dropdown to select which match to view
         match_options = ["All Matches"] + list(st.session_state["parsed_matches"].keys())
-        selected_match = st.sidebar.selectbox("Select Match to View", match_options)
+        selected_match = st.sidebar.selectbox(
+            "Select Match to View",
+            match_options,
+            format_func=lambda key: key if key == "All Matches" else st.session_state["parsed_matches"][key]["file_name"],
+        )
+
+        # One archive with every table of the selected matches
+        st.sidebar.write("### Export")
+        export_format = st.sidebar.radio("Export Format", EXPORT_FORMATS, format_func=str.upper, horizontal=True)
+        export_matches = (
+            st.session_state["parsed_matches"] if selected_match == "All Matches"
+            else {selected_match: st.session_state["parsed_matches"][selected_match]}
+        )
+        api_url = os.environ.get(API_URL_ENV)
+        if not api_url:
+            try:
+                server = serve_api(int(os.environ.get(API_PORT_ENV, 0)))
+                api_url = f"http://127.0.0.1:{server.server_port}"
+            except OSError:
+                api_url = None
+        if api_url and set(export_matches) <= set(cached_demo_ids(PARSE_CACHE_DIR)):
+            # The API streams the archive from the parse cache, nothing is held in the app's memory
+            st.sidebar.link_button("Export Everything", export_url(api_url, list(export_matches), export_format))
+        else:
+            # Only when the API is unavailable or a match never reached the parse cache: the archive is
+            # written to a temporary file when clicked, but Streamlit reads it whole to serve it
+            st.sidebar.download_button(
+                label="Export Everything",
+                data=lambda: export_archive(export_matches, export_format),
+                file_name=f"e-alytics_export_{export_format}.zip",
+                mime="application/zip",
+                key="export_everything",
+            )
 
         # Dropdown to switch between Summary Stats and Game Events
         data_view = st.sidebar.radio("Select Data View", ["Summary Stats", "Game Events"])
@@ -153,7 +468,11 @@ def main():
 
             # Combine stats for "All Matches"
             all_combined_stats = pd.concat(combined_stats_list, ignore_index=True)
-            numeric_columns = ["kills", "assists", "deaths", "n_rounds", "total_damage"]
+            numeric_columns = [
+                "kills", "assists", "deaths", "n_rounds", "total_damage", "trade_kills", "traded_deaths",
+                "opening_kills", "opening_deaths", "clutch_attempts", "clutch_wins",
+                "smoke_impact_kills", "fire_impact_kills",
+            ]
             average_columns = ["kast_percentage", "average_damage_per_round", "rating_2.0", "impact"]
 
             all_combined_stats = (
@@ -166,9 +485,36 @@ def main():
             if selected_match == "All Matches":
                 filtered_data = all_combined_stats.copy()
                 kills_data = kills_data_list
+                round_facts = combine_player_round_facts(st.session_state["parsed_matches"])
             else:
                 filtered_data = st.session_state["parsed_matches"][selected_match]["combined_stats"]
                 kills_data = [st.session_state["parsed_matches"][selected_match]["kills_df"]]
+                round_facts = combine_player_round_facts(
+                    {selected_match: st.session_state["parsed_matches"][selected_match]}
+                )
+
+            # Round and map filters, recomputed from the per-player-per-round facts
+            if not round_facts.empty:
+                st.sidebar.write("### Round Filter")
+                round_filter = st.sidebar.radio("Select Rounds", ["All Rounds", "Pistol Rounds", "Round Range"])
+                round_range = None
+                if round_filter == "Round Range":
+                    last_round = int(round_facts["round"].max())
+                    round_range = st.sidebar.slider("Round Range", 1, max(last_round, 2), (1, min(12, last_round)))
+
+                map_filter = []
+                if selected_match == "All Matches":
+                    map_filter = st.sidebar.multiselect("Filter Maps", sorted(round_facts["map_name"].dropna().unique()))
+
+                if round_filter != "All Rounds" or map_filter:
+                    filtered_data = aggregate_player_stats(
+                        filter_player_rounds(
+                            round_facts,
+                            round_range=round_range,
+                            pistol_only=round_filter == "Pistol Rounds",
+                            map_names=map_filter,
+                        )
+                    )
 
             # Sidebar filters for dataset customization
             st.sidebar.write("### Dataset Customization")
@@ -193,25 +539,51 @@ def main():
             # Download filtered data
             download_csv_button(filtered_data, "Filtered Player Statistics", key="summary_stats_csv")
 
+            # Buy type of each side per round, sampled at freeze end
+            if selected_match == "All Matches":
+                economy = combine_economy(st.session_state["parsed_matches"])
+            else:
+                economy = combine_economy({selected_match: st.session_state["parsed_matches"][selected_match]})
+            if not economy.empty:
+                st.write("### Round Economy")
+                st.dataframe(economy)
+                st.write(pd.crosstab(economy["team_name"], economy["buy_type"]))
+
 
 
         elif data_view == "Game Events":
             # Game Events Section
             st.write("### Game Events Viewer")
 
-            # Combine or select game events
+            # Combine or select game events, sliced to the selected rounds
             if selected_match == "All Matches":
-                game_events = combine_game_events(st.session_state["parsed_matches"])
+                event_matches = st.session_state["parsed_matches"]
             else:
-                game_events = st.session_state["parsed_matches"][selected_match]["game_events"]
+                event_matches = {selected_match: st.session_state["parsed_matches"][selected_match]}
+
+            round_range = None
+            last_round = max(
+                (int(match["round_index"]["round"].max()) for match in event_matches.values()
+                 if match.get("round_index") is not None and not match["round_index"].empty),
+                default=0,
+            )
+            if last_round > 1:
+                st.sidebar.write("### Round Selection")
+                round_range = st.sidebar.slider("Event Rounds", 1, last_round, (1, last_round), key="event_rounds")
+                if round_range == (1, last_round):
+                    round_range = None
+
+            game_events = combine_game_events(event_matches, round_range)
 
             # Display each game event type in an expandable section
             for event_name, event_df in game_events.items():
                 with st.expander(f"{event_name.replace('_', ' ').capitalize()} Data"):
                     if not event_df.empty:
-                        st.dataframe(event_df)
-                        # Download game event data
-                        download_csv_button(event_df, f"{event_name.capitalize()} Data", key=f"{selected_match}_{event_name}_csv")
+                        # Filtered and paginated server side, with a download of the filtered rows
+                        show_event_table(
+                            event_df, event_name, key=f"{selected_match}_{event_name}",
+                            data_key=(tuple(event_matches), round_range),
+                        )
 
                     else:
                         st.write(f"No {event_name} data available for this match.")
@@ -228,13 +600,24 @@ def main():
 
         # Generate heatmaps for Summary Stats (remain static when switching views)
         if kills_data:
-            team1_data, team2_data = combine_heatmaps(kills_data)
-            create_heatmap_visuals(
-                team1_data,
-                team2_data,
-                team1_data[0].index.name or "Team 1",
-                team2_data[0].index.name or "Team 2",
-            )
+            # The sparse head-to-head table is rebuilt only when the match selection changes
+            head_to_head_key = (selected_match, tuple(st.session_state["parsed_matches"]))
+            if st.session_state.get("head_to_head_key") != head_to_head_key:
+                st.session_state["head_to_head"] = HeadToHead(pd.concat(kills_data, ignore_index=True))
+                st.session_state["head_to_head_key"] = head_to_head_key
+            head_to_head = st.session_state["head_to_head"]
+
+            selected_players = st.sidebar.multiselect("Head-to-Head Players", list(head_to_head.players))
+            compact = st.sidebar.checkbox("Compact Head-to-Head Hover", value=True)
+            team1_data, team2_data = process_kills_data(None, head_to_head, players=selected_players, compact=compact)
+            with RENDER_SECONDS.time(function="create_heatmap_visuals"):
+                create_heatmap_visuals(
+                    team1_data,
+                    team2_data,
+                    team1_data[0].index.name or "Team 1",
+                    team2_data[0].index.name or "Team 2",
+                    head_to_head=head_to_head if compact else None,
+                )
 
 
 
@@ -247,16 +630,43 @@ def main():
         # Generate map visuals
         if selected_map:
             try:
+                side = st.sidebar.selectbox("Side", ["Both", "CT", "TERRORIST"])
+
+                # Positions and their grid index are only needed for the area filter, and are rebuilt
+                # only when the map, option or loaded demos change; otherwise per-demo histograms are summed
+                area = None
+                points = None
+                if st.sidebar.checkbox("Filter by Area"):
+                    index_key = (selected_map, show_option, tuple(st.session_state["parsed_matches"]))
+                    if st.session_state.get("position_index_key") != index_key:
+                        points = collect_map_points(st.session_state["parsed_matches"], selected_map, show_option)
+                        st.session_state["map_points"] = points
+                        st.session_state["position_index"] = build_position_index(points)
+                        st.session_state["position_index_key"] = index_key
+                    points = st.session_state["map_points"]
+
+                    if len(points):
+                        x_bounds = (int(points["X"].min()), int(points["X"].max()) + 1)
+                        y_bounds = (int(points["Y"].min()), int(points["Y"].max()) + 1)
+                        x_range = st.sidebar.slider("X Range", *x_bounds, x_bounds)
+                        y_range = st.sidebar.slider("Y Range", *y_bounds, y_bounds)
+                        area = (x_range[0], y_range[0], x_range[1], y_range[1])
+
                 # Retrieve team names dynamically from the kills_df
                 clan1_name = st.session_state["parsed_matches"][list(st.session_state["parsed_matches"].keys())[0]]["kills_df"]["attacker_team_clan_name"].iloc[0]
                 clan2_name = st.session_state["parsed_matches"][list(st.session_state["parsed_matches"].keys())[0]]["kills_df"]["victim_team_clan_name"].iloc[0]
 
                 # Call the updated generate_map_visuals function
-                map_visuals_clan1, map_visuals_clan2 = generate_map_visuals(
-                    st.session_state["parsed_matches"],
-                    selected_map,
-                    show_option
-                )
+                with RENDER_SECONDS.time(function="generate_map_visuals"):
+                    map_visuals_clan1, map_visuals_clan2 = generate_map_visuals(
+                        st.session_state["parsed_matches"],
+                        selected_map,
+                        show_option,
+                        area=area,
+                        points=points,
+                        position_index=st.session_state.get("position_index") if points is not None else None,
+                        side=None if side == "Both" else side,
+                    )
 
                 st.write(f"### {clan1_name} Heatmap for {show_option.capitalize()} on {selected_map}")
                 st.pyplot(map_visuals_clan1)
@@ -266,6 +676,44 @@ def main():
             except Exception as e:
                 st.error(f"Error generating map visuals for {selected_map}: {e}")
 
+            # Hotspots are clustered per demo at ingest; several demos only merge the stored centroids
+            if st.sidebar.checkbox("Show Hotspots"):
+                phase = st.sidebar.selectbox("Round Phase", list(ROUND_PHASES))
+
+                hotspots = merge_hotspots({
+                    demo_id: match_data if "hotspots" in match_data
+                    else {"hotspots": match_hotspots(match_data["kills_df"], match_data.get("round_index"))}
+                    for demo_id, match_data in st.session_state["parsed_matches"].items()
+                })
+                hotspots = hotspots[
+                    (hotspots["map_name"] == selected_map)
+                    & (hotspots["show_option"] == show_option)
+                    & (hotspots["phase"] == phase)
+                    & ((side == "Both") | (hotspots["side"] == side))
+                ]
+                if hotspots.empty:
+                    st.write(f"No {phase} round {show_option} hotspots on {selected_map}.")
+                else:
+                    title = f"{phase.capitalize()} Round {show_option.capitalize()} Hotspots on {selected_map}"
+                    st.write(f"### {title}")
+                    try:
+                        st.pyplot(plot_hotspots(hotspots, selected_map, title))
+                    except Exception as e:
+                        st.error(f"Error drawing hotspots for {selected_map}: {e}")
+                    st.dataframe(hotspots.drop(columns=["map_name", "show_option", "phase"]))
+
+        # Keep polling background parses; the loaded matches above stay usable meanwhile
+        return ingesting
+    return False
+
 
 if __name__ == "__main__":
-    main()
+    # Streamlit re-runs this script on every interaction; the metrics server is started once per process
+    if os.environ.get(METRICS_PORT_ENV):
+        serve_metrics(int(os.environ[METRICS_PORT_ENV]))
+    with RERUN_SECONDS.time():
+        poll = main()
+    # The poll interval is waited outside the timer, so run times stay the time spent rendering
+    if poll:
+        time.sleep(1)
+        st.rerun()
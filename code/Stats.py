@@ -1,19 +1,25 @@
 import pandas as pd
 from awpy import Demo
-from awpy.stats import kast, adr, rating
+from player_rounds import compute_combined_stats
+from zones import build_zone_raster, assign_zones
+from trades import detect_trades
+from utility import combine_utility, utility_at_kills, add_utility_context
 
-def parse_demo_file(demo_path):
+def parse_demo_file(demo_path, demo=None):
     """
     Parse a .dem file and calculate player stats (kills, assists, deaths, KAST, ADR, Rating 2.0, Impact).
 
     Parameters:
         demo_path (str): Path to the demo file.
+        demo (Demo): An already parsed demo to reuse instead of parsing demo_path again (optional).
 
     Returns:
-        dict: A dictionary containing 'combined_stats' (player stats) and 'kills_df' (raw kills data).
+        dict: A dictionary containing 'combined_stats' (player stats), 'kills_df' (raw kills data)
+        and 'player_round_facts' (per-player-per-round stat components).
     """
     # Parse the demo file
-    demo = Demo(demo_path)
+    if demo is None:
+        demo = Demo(demo_path)
     kills_df = demo.kills
 
     # Ensure positional data is present in kills_df
@@ -22,87 +28,24 @@ def parse_demo_file(demo_path):
         if col not in kills_df.columns:
             kills_df[col] = None  # Fill with None if not available
 
-    # Calculate kills, assists, and deaths
-    player_stats = (
-        kills_df.groupby(["attacker_name", "attacker_team_name", "attacker_team_clan_name"])
-        .agg(kills=("attacker_name", "count"), assists=("assister_name", "count"))
-        .reset_index()
-        .rename(
-            columns={
-                "attacker_name": "player_name",
-                "attacker_team_name": "team_name",
-                "attacker_team_clan_name": "clan_name",
-            }
-        )
-    )
-
-    deaths_stats = (
-        kills_df.groupby(["victim_name", "victim_team_name", "victim_team_clan_name"])
-        .agg(deaths=("victim_name", "count"))
-        .reset_index()
-        .rename(
-            columns={
-                "victim_name": "player_name",
-                "victim_team_name": "team_name",
-                "victim_team_clan_name": "clan_name",
-            }
-        )
-    )
-
-    final_stats = pd.merge(
-        player_stats, deaths_stats, on=["player_name", "team_name", "clan_name"], how="outer"
-    ).fillna(0)
+    # is_traded, trade_of and time_to_trade on every kill
+    kills_df = detect_trades(kills_df)
 
-    final_stats["kills"] = final_stats["kills"].astype(int)
-    final_stats["assists"] = final_stats["assists"].astype(int)
-    final_stats["deaths"] = final_stats["deaths"].astype(int)
+    # Smokes and fires burning near each victim, from an interval index over their lifetimes
+    utility_pairs = utility_at_kills(kills_df, combine_utility(demo.smokes, demo.infernos))
+    kills_df = add_utility_context(kills_df, utility_pairs)
 
-    # Add "Both" side
-    both_stats = (
-        final_stats.groupby(["player_name", "clan_name"])
-        .agg(kills=("kills", "sum"), assists=("assists", "sum"), deaths=("deaths", "sum"))
-        .reset_index()
-        .assign(team_name="Both")
+    # Kills, assists, deaths, KAST, ADR, Impact, Rating 2.0, trades, opening duels, clutches and utility per side
+    # Stored demo tables keep only the round roster of the ticks, a parsed Demo has the ticks themselves
+    roster = getattr(demo, "round_roster", None)
+    combined_stats, player_round_facts = compute_combined_stats(
+        kills_df, demo.damages, roster if roster is not None else getattr(demo, "ticks", None),
+        rounds_df=getattr(demo, "rounds", None),
+        utility_pairs=utility_pairs,
     )
 
-    combined_stats = pd.concat([final_stats, both_stats], ignore_index=True)
-    combined_stats = combined_stats.sort_values(by=["team_name", "player_name"]).reset_index(drop=True)
-
-    # Add KAST
-    kast_stats = kast(demo)
-    kast_df = (
-        pd.DataFrame(kast_stats)
-        .rename(columns={"name": "player_name", "team_name": "team_name", "kast": "kast_percentage"})
-        .drop(columns=["steamid"])
-    )
-    kast_df["team_name"] = kast_df["team_name"].replace("all", "Both")
-
-    combined_stats = pd.merge(combined_stats, kast_df, on=["player_name", "team_name"], how="left").fillna(0)
-
-    # Add ADR
-    adr_stats = adr(demo)
-    adr_df = (
-        pd.DataFrame(adr_stats)
-        .rename(columns={"name": "player_name", "team_name": "team_name", "dmg": "total_damage", "adr": "average_damage_per_round"})
-        .drop(columns=["steamid", "n_rounds"])
-    )
-    adr_df["team_name"] = adr_df["team_name"].replace("all", "Both")
-
-    combined_stats = pd.merge(combined_stats, adr_df, on=["player_name", "team_name"], how="left").fillna(0)
-
-    # Add Rating 2.0 and Impact
-    rating_stats = rating(demo)
-    rating_df = (
-        pd.DataFrame(rating_stats)
-        .rename(columns={"name": "player_name", "team_name": "team_name", "rating": "rating_2.0", "impact": "impact"})
-        .drop(columns=["steamid", "n_rounds"])
-    )
-    rating_df["team_name"] = rating_df["team_name"].replace("all", "Both")
-
-    combined_stats = pd.merge(combined_stats, rating_df, on=["player_name", "team_name"], how="left").fillna(0)
-
-    # Return both the combined stats and kills dataframe
-    return {"combined_stats": combined_stats, "kills_df": kills_df}
+    # Return the combined stats, kills dataframe and round facts
+    return {"combined_stats": combined_stats, "kills_df": kills_df, "player_round_facts": player_round_facts}
 
 
 def get_game_events(demo_path, dataset_type, selected_columns=None):
@@ -143,18 +86,20 @@ def get_game_events(demo_path, dataset_type, selected_columns=None):
         return data[selected_columns]
     return data
 
-def parse_game_events(demo_path):
+def parse_game_events(demo_path, demo=None):
     """
     Parses game events (kills, damages, bomb events, grenades, smokes, and infernos)
     from a .dem file and returns structured DataFrames.
 
     Parameters:
         demo_path (str): Path to the demo file.
+        demo (Demo): An already parsed demo to reuse instead of parsing demo_path again (optional).
 
     Returns:
         dict: A dictionary containing DataFrames for game events.
     """
-    demo = Demo(demo_path)
+    if demo is None:
+        demo = Demo(demo_path)
 
     # Function to extract specific columns from a DataFrame if it exists
     def get_columns(df, columns):
@@ -198,7 +143,7 @@ def parse_game_events(demo_path):
     infernos_df = get_columns(demo.infernos, infernos_columns)
 
     # Combine all into a dictionary
-    return {
+    events = {
         "kills": kills_df,
         "damages": damages_df,
         "bomb_events": bomb_df,
@@ -206,3 +151,8 @@ def parse_game_events(demo_path):
         "smokes": smokes_df,
         "infernos": infernos_df
     }
+
+    # Tag every position with its callout zone; kills and damages read positions from the raw tables
+    header = getattr(demo, "header", None) or {}
+    zone_raster = build_zone_raster(header.get("map_name"), demo.kills)
+    return assign_zones(events, zone_raster, raw_events={"kills": demo.kills, "damages": demo.damages})
@@ -0,0 +1,400 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from export import EXPORT_FORMATS, match_tables, write_export
+from parse_cache import PARSE_CACHE_DIR, cache_path, cached_demo_ids, load_parsed
+from metrics import CACHE_REQUESTS, CONTENT_TYPE, REGISTRY
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Query parameters that are not column filters
+RESERVED_PARAMS = {"page", "page_size", "columns"}
+
+# Rendered responses kept for repeated queries
+RESPONSE_CACHE_SIZE = 256
+
+# Clients may reuse a response this long before revalidating with If-None-Match
+MAX_AGE_SECONDS = 30
+
+# Set to the API's public base URL, e.g. http://stats.example.com:8502, to have the Streamlit app link its
+# exports there; otherwise the app serves the API itself on 127.0.0.1, on EALYTICS_API_PORT when set
+API_URL_ENV = "EALYTICS_API_URL"
+API_PORT_ENV = "EALYTICS_API_PORT"
+
+
+class ParsedDemoStore:
+    """
+    Parsed demos read from the on-disk parse cache on first use.
+
+    Each demo is kept in memory with its cache file's modification time and reloaded when the file changes,
+    so the API serves the same data the Streamlit app parsed without parsing anything itself.
+    """
+
+    def __init__(self, cache_dir=PARSE_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def demo_ids(self):
+        return cached_demo_ids(self.cache_dir)
+
+    def version(self, demo_id):
+        """Modification time of a demo's cache file in nanoseconds, or None when it is not cached."""
+        try:
+            return os.stat(cache_path(demo_id, self.cache_dir)).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, demo_id):
+        """
+        Parsed data of a cached demo.
+
+        Parameters:
+            demo_id (str): Content-hash demo ID.
+
+        Returns:
+            dict: The parsed data, or None when the demo is not cached.
+        """
+        version = self.version(demo_id)
+        if version is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(demo_id)
+        if entry is not None and entry[0] == version:
+            CACHE_REQUESTS.inc(cache="api_store", result="hit")
+            return entry[1]
+        CACHE_REQUESTS.inc(cache="api_store", result="miss")
+
+        parsed_data = load_parsed(demo_id, self.cache_dir)  # Outside the lock, other demos stay readable
+        if parsed_data is not None:
+            with self._lock:
+                self._entries[demo_id] = (version, parsed_data)
+        return parsed_data
+
+
+class ResponseCache:
+    """Thread-safe LRU of rendered response bodies and their ETags."""
+
+    def __init__(self, max_size=RESPONSE_CACHE_SIZE):
+        self.max_size = max_size
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._responses:
+                return None
+            self._responses.move_to_end(key)
+            return self._responses[key]
+
+    def put(self, key, response):
+        with self._lock:
+            self._responses[key] = response
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_size:
+                self._responses.popitem(last=False)
+
+
+def match_summary(demo_id, parsed_data):
+    """
+    Describe one cached match: its file, map and the tables the API serves for it.
+    """
+    kills_df = parsed_data.get("kills_df")
+    map_name = kills_df["map_name"].iloc[0] if kills_df is not None and "map_name" in kills_df and len(kills_df) else None
+    return {
+        "demo_id": demo_id,
+        "file_name": parsed_data.get("file_name"),
+        "map_name": map_name,
+        "tables": ["combined_stats", "kills", "hotspots"] + [f"events/{name}" for name in parsed_data.get("game_events") or {}],
+    }
+
+
+def match_table(parsed_data, table):
+    """
+    Look up a served table of a match.
+
+    Parameters:
+        parsed_data (dict): Parsed data of the match.
+        table (str): 'combined_stats', 'kills', 'hotspots' or 'events/<event name>'.
+
+    Returns:
+        pd.DataFrame: The table, or None when the match has no such table.
+    """
+    if table == "combined_stats":
+        return parsed_data.get("combined_stats")
+    if table == "kills":
+        return parsed_data.get("kills_df")
+    if table == "hotspots":
+        return parsed_data.get("hotspots")
+    if table.startswith("events/"):
+        return (parsed_data.get("game_events") or {}).get(table[len("events/"):])
+    return None
+
+
+def query_table(dataframe, params):
+    """
+    Filter, project and paginate a table from query parameters.
+
+    Every non-reserved parameter is an equality filter on the column of the same name; repeating it
+    matches any of the values. 'columns' is a comma-separated projection, 'page' and 'page_size' paginate.
+
+    Parameters:
+        dataframe (pd.DataFrame): The table.
+        params (dict): Parsed query string, parameter -> list of values.
+
+    Returns:
+        tuple: (page DataFrame, dict with 'page', 'page_size', 'n_pages' and 'total_rows').
+
+    Raises:
+        ValueError: For unknown columns or malformed paging parameters.
+    """
+    for column, values in params.items():
+        if column in RESERVED_PARAMS:
+            continue
+        if column not in dataframe.columns:
+            raise ValueError(f"Unknown filter column '{column}'")
+        dataframe = dataframe[dataframe[column].astype(str).isin(values)]
+
+    if "columns" in params:
+        columns = [column for value in params["columns"] for column in value.split(",") if column]
+        unknown = [column for column in columns if column not in dataframe.columns]
+        if unknown:
+            raise ValueError(f"Unknown columns {unknown}")
+        dataframe = dataframe[columns]
+
+    try:
+        page_size = min(int(params.get("page_size", [DEFAULT_PAGE_SIZE])[0]), MAX_PAGE_SIZE)
+        page = int(params.get("page", [1])[0])
+    except ValueError:
+        raise ValueError("'page' and 'page_size' must be integers")
+    if page < 1 or page_size < 1:
+        raise ValueError("'page' and 'page_size' must be positive")
+
+    n_pages = max(1, -(-len(dataframe) // page_size))
+    page_df = dataframe.iloc[(page - 1) * page_size:page * page_size]
+    return page_df, {"page": page, "page_size": page_size, "n_pages": n_pages, "total_rows": len(dataframe)}
+
+
+def export_url(base_url, demo_ids, fmt="csv"):
+    """
+    Link to the streamed zip export of some matches.
+
+    Parameters:
+        base_url (str): The API's base URL.
+        demo_ids (list): Demo IDs to export.
+        fmt (str): 'csv' or 'parquet'.
+
+    Returns:
+        str: The /export URL.
+    """
+    return f"{base_url.rstrip('/')}/export?{urlencode([('format', fmt)] + [('demo_id', demo_id) for demo_id in demo_ids])}"
+
+
+class ApiError(Exception):
+    """An error answered with its HTTP status and a JSON message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """
+    Routes:
+        GET /matches
+        GET /matches/<demo_id>
+        GET /matches/<demo_id>/combined_stats
+        GET /matches/<demo_id>/kills
+        GET /matches/<demo_id>/events/<event name>
+        GET /export?format=csv|parquet&demo_id=<demo_id>... (zip archive, every cached match without demo_id)
+        GET /metrics (Prometheus text format)
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        params = parse_qs(url.query)
+        store = self.server.store
+
+        if parts == ["metrics"]:
+            self._send(200, REGISTRY.render().encode("utf-8"), content_type=CONTENT_TYPE)
+            return
+
+        try:
+            if parts == ["export"]:
+                self._send_export(params, store)
+                return
+            if not parts or parts[0] != "matches":
+                raise ApiError(404, f"Unknown path '{url.path}'")
+
+            # Responses are cached per path, query and cache file versions, so a re-parse invalidates them
+            demo_ids = store.demo_ids() if len(parts) == 1 else [parts[1]]
+            versions = tuple((demo_id, store.version(demo_id)) for demo_id in demo_ids)
+            cache_key = (url.path, tuple(sorted((key, tuple(values)) for key, values in params.items())), versions)
+            response = self.server.response_cache.get(cache_key)
+            CACHE_REQUESTS.inc(cache="api_response", result="miss" if response is None else "hit")
+            if response is None:
+                response = self._render(parts, params, store)
+                self.server.response_cache.put(cache_key, response)
+        except ApiError as e:
+            self._send(e.status, json.dumps({"error": str(e)}).encode("utf-8"))
+            return
+
+        body, etag = response
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self._send(304, b"", etag)
+        else:
+            self._send(200, body, etag)
+
+    def _render(self, parts, params, store):
+        if len(parts) == 1:
+            matches = [match_summary(demo_id, data) for demo_id in store.demo_ids() if (data := store.get(demo_id)) is not None]
+            body = json.dumps({"matches": matches}).encode("utf-8")
+        else:
+            demo_id = parts[1]
+            parsed_data = store.get(demo_id)
+            if parsed_data is None:
+                raise ApiError(404, f"Unknown match '{demo_id}'")
+            if len(parts) == 2:
+                body = json.dumps(match_summary(demo_id, parsed_data)).encode("utf-8")
+            else:
+                table = "/".join(parts[2:])
+                dataframe = match_table(parsed_data, table)
+                if dataframe is None:
+                    raise ApiError(404, f"Unknown table '{table}' for match '{demo_id}'")
+                try:
+                    page_df, meta = query_table(dataframe, params)
+                except ValueError as e:
+                    raise ApiError(400, str(e))
+                # Rows are serialized by pandas straight to JSON, NaN becomes null
+                header = json.dumps({"demo_id": demo_id, "table": table, **meta})[:-1]
+                body = f'{header}, "rows": {page_df.to_json(orient="records", date_format="iso")}}}'.encode("utf-8")
+        return body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+    def _send_export(self, params, store):
+        fmt = params.get("format", ["csv"])[0]
+        if fmt not in EXPORT_FORMATS:
+            raise ApiError(400, f"Unknown export format '{fmt}', expected one of {EXPORT_FORMATS}")
+        matches = {}
+        for demo_id in params.get("demo_id") or store.demo_ids():
+            matches[demo_id] = store.get(demo_id)
+            if matches[demo_id] is None:
+                raise ApiError(404, f"Unknown match '{demo_id}'")
+
+        # Written straight to the socket without a Content-Length, one table chunk at a time, so the
+        # archive is never held in memory; the HTTP/1.0 connection closing marks its end
+        self.send_response(200)
+        self.send_header("Content-Type", "application/zip")
+        self.send_header("Content-Disposition", f'attachment; filename="e-alytics_export_{fmt}.zip"')
+        self.end_headers()
+        write_export(match_tables(matches), self.wfile, fmt)
+
+    def _send(self, status, body, etag=None, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", f"max-age={MAX_AGE_SECONDS}")
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTP server answering each connection on a fixed-size worker pool instead of a new thread.
+    """
+
+    def __init__(self, server_address, store, workers=8, handler=ApiHandler):
+        super().__init__(server_address, handler)
+        self.store = store
+        self.response_cache = ResponseCache()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+def create_server(host="127.0.0.1", port=8502, cache_dir=PARSE_CACHE_DIR, workers=8):
+    """
+    Create the API server over the parse cache.
+
+    Parameters:
+        host (str): Interface to bind.
+        port (int): Port to bind, 0 picks a free one.
+        cache_dir (str): Parse cache folder written by the Streamlit app.
+        workers (int): Requests handled concurrently.
+
+    Returns:
+        PooledHTTPServer: The server, call serve_forever() to start it.
+    """
+    return PooledHTTPServer((host, port), ParsedDemoStore(cache_dir), workers)
+
+
+_api_server = None
+_api_server_lock = threading.Lock()
+
+
+def serve_api(port=0, host="127.0.0.1", cache_dir=PARSE_CACHE_DIR, workers=4):
+    """
+    Serve the API from a daemon thread, once per process; later calls return the running server.
+
+    Parameters:
+        port (int): Port to bind, 0 picks a free one.
+        host (str): Interface to bind.
+        cache_dir (str): Parse cache folder.
+        workers (int): Requests handled concurrently.
+
+    Returns:
+        PooledHTTPServer: The server.
+    """
+    global _api_server
+    with _api_server_lock:
+        if _api_server is None:
+            server = create_server(host, port, cache_dir, workers)
+            threading.Thread(target=server.serve_forever, name="api", daemon=True).start()
+            _api_server = server
+        return _api_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve parsed demo data as JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--cache-dir", default=PARSE_CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.cache_dir, args.workers)
+    print(f"Serving {args.cache_dir} on http://{args.host}:{server.server_port}/matches")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import bz2
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+
+# Upload types accepted by the sidebar uploader
+DEMO_UPLOAD_TYPES = ["dem", "gz", "bz2", "zip", "rar"]
+
+SCRATCH_DIR = os.path.join("cache", "scratch")
+
+# Stream in 1 MiB blocks so a multi-GB archive never sits in memory
+CHUNK_SIZE = 1024 * 1024
+
+# Demos already extracted from each archive of a scanned folder, kept in the scratch folder
+ARCHIVE_INDEX_NAME = "archives.json"
+
+
+def _new_hash():
+    # 64-bit BLAKE2b, rendered as a 16 character hex demo ID
+    return hashlib.blake2b(digest_size=8)
+
+
+def demo_fingerprint(fileobj):
+    """
+    Compute the content-hash demo ID of a demo stream.
+
+    Parameters:
+        fileobj (file-like): Demo opened for binary reading, read to the end in blocks.
+
+    Returns:
+        str: 16 character hex ID, identical for identical demo content.
+    """
+    digest = _new_hash()
+    for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _archive_members(fileobj, file_name):
+    """
+    Yield (demo file name, readable stream) for every demo inside an upload.
+
+    Parameters:
+        fileobj (file-like): The uploaded file opened for binary reading.
+        file_name (str): Name of the upload, its extension selects the format.
+
+    Yields:
+        tuple: (member file name, binary stream of the decompressed demo).
+    """
+    lower = file_name.lower()
+
+    if lower.endswith(".dem"):
+        yield os.path.basename(file_name), fileobj
+    elif lower.endswith(".gz"):
+        with gzip.GzipFile(fileobj=fileobj) as stream:
+            yield os.path.basename(file_name[:-3]), stream
+    elif lower.endswith(".bz2"):
+        with bz2.BZ2File(fileobj) as stream:
+            yield os.path.basename(file_name[:-4]), stream
+    elif lower.endswith(".zip"):
+        with zipfile.ZipFile(fileobj) as archive:
+            for member in archive.infolist():
+                if member.filename.lower().endswith(".dem"):
+                    with archive.open(member) as stream:
+                        yield os.path.basename(member.filename), stream
+    elif lower.endswith(".rar"):
+        try:
+            import rarfile
+        except ImportError as e:
+            raise ImportError("Reading .rar archives needs the 'rarfile' package and an unrar tool") from e
+        with rarfile.RarFile(fileobj) as archive:
+            for member in archive.infolist():
+                if member.filename.lower().endswith(".dem"):
+                    with archive.open(member) as stream:
+                        yield os.path.basename(member.filename), stream
+    else:
+        raise ValueError(f"Unsupported demo file type: {file_name}")
+
+
+def extract_demos(fileobj, file_name, scratch_dir=SCRATCH_DIR):
+    """
+    Stream every demo in an upload (plain .dem or .gz/.bz2/.zip/.rar archive) into the scratch folder.
+
+    Members are decompressed straight from the upload stream into a uniquely named partial file and
+    fingerprinted on the way, so each demo is read and written exactly once. The finished file is
+    renamed after the demo ID, so the same demo uploaded twice is stored once.
+
+    Parameters:
+        fileobj (file-like): The uploaded file opened for binary reading.
+        file_name (str): Name of the upload.
+        scratch_dir (str): Folder to write the demos to.
+
+    Returns:
+        list: (demo ID, demo file name, path in scratch_dir) for each demo found.
+    """
+    os.makedirs(scratch_dir, exist_ok=True)
+    demos = []
+    for member_name, stream in _archive_members(fileobj, file_name):
+        digest = _new_hash()
+        # Unique per extraction, so uploads with a member of the same name never share a partial file
+        with tempfile.NamedTemporaryFile("wb", dir=scratch_dir, suffix=".part", delete=False) as out:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                out.write(chunk)
+        partial_path = out.name
+
+        demo_id = digest.hexdigest()
+        demo_path = os.path.join(scratch_dir, f"{demo_id}.dem")
+        if os.path.exists(demo_path):
+            os.remove(partial_path)  # Same content already in scratch, possibly being parsed
+        else:
+            os.replace(partial_path, demo_path)
+        demos.append((demo_id, member_name, demo_path))
+    return demos
+
+
+def _load_archive_index(scratch_dir):
+    try:
+        with open(os.path.join(scratch_dir, ARCHIVE_INDEX_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_archive_index(index, scratch_dir):
+    os.makedirs(scratch_dir, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", dir=scratch_dir, suffix=".tmp", delete=False, encoding="utf-8") as tmp:
+        json.dump(index, tmp)
+    os.replace(tmp.name, os.path.join(scratch_dir, ARCHIVE_INDEX_NAME))
+
+
+def collect_demo_paths(folder, scratch_dir=SCRATCH_DIR):
+    """
+    Find every demo in a folder, extracting archives into the scratch folder.
+
+    Each archive's demo IDs are remembered under its path, size and modification time; an unchanged
+    archive whose demos are all still in the scratch folder is not extracted again.
+
+    Parameters:
+        folder (str): Folder to scan (not recursive).
+        scratch_dir (str): Folder archives are extracted to.
+
+    Returns:
+        list: (demo ID, demo file name, path) for each demo found, plain .dem files are used in place.
+    """
+    index = _load_archive_index(scratch_dir)
+    index_changed = False
+    demos = []
+    for entry in sorted(os.listdir(folder)):
+        path = os.path.join(folder, entry)
+        extension = entry.rsplit(".", 1)[-1].lower()
+        if not os.path.isfile(path) or extension not in DEMO_UPLOAD_TYPES:
+            continue
+        if extension != "dem":
+            stat = os.stat(path)
+            archive_key = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+            known = [(demo_id, name, os.path.join(scratch_dir, f"{demo_id}.dem")) for demo_id, name in index.get(archive_key, [])]
+            if known and all(os.path.exists(demo_path) for _, _, demo_path in known):
+                demos.extend(known)
+                continue
+        with open(path, "rb") as fileobj:
+            if extension == "dem":
+                demos.append((demo_fingerprint(fileobj), entry, path))
+            else:
+                extracted = extract_demos(fileobj, entry, scratch_dir)
+                index[archive_key] = [[demo_id, name] for demo_id, name, _ in extracted]
+                index_changed = True
+                demos.extend(extracted)
+    if index_changed:
+        _save_archive_index(index, scratch_dir)
+    return demos
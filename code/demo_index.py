@@ -0,0 +1,255 @@
+import os
+import re
+import struct
+
+import pandas as pd
+from demoparser2 import DemoParser
+
+# CS2 demo layout: 8 byte magic, int32 offset of the file-info frame, int32 offset of spawn groups,
+# then frames of (varint command, varint tick, varint size, payload)
+DEMO_MAGIC = b"PBDEMS2\x00"
+DEMO_PREAMBLE_SIZE = 16
+DEM_FILE_INFO = 2
+DEM_IS_COMPRESSED = 64
+
+# Field numbers of CDemoFileInfo / CGameInfo.CCSGameInfo in demo.proto; demoparser2 only reads the header
+FILE_INFO_PLAYBACK_TIME = 1
+FILE_INFO_PLAYBACK_TICKS = 2
+FILE_INFO_GAME_INFO = 4
+GAME_INFO_CS = 5
+CS_ROUND_START_TICKS = 1
+
+# Header fields shown in the catalogue
+HEADER_FIELDS = ["map_name", "server_name", "patch_version"]
+
+# Fields derived from the file-info frame
+FILE_INFO_FIELDS = ["tickrate", "duration_seconds", "n_rounds"]
+
+CATALOGUE_COLUMNS = ["file_name"] + HEADER_FIELDS + FILE_INFO_FIELDS + ["team1", "team2", "size_mb", "path"]
+
+
+def _read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _read_varint_stream(f):
+    result = shift = 0
+    while True:
+        byte = f.read(1)
+        if not byte:
+            raise EOFError("Unexpected end of demo file")
+        result |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return result
+        shift += 7
+
+
+def _protobuf_fields(data):
+    """
+    Decode a protobuf message into (field number, wire type, value) triples without a schema.
+    """
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 1:
+            value, pos = data[pos:pos + 8], pos + 8
+        elif wire_type == 2:
+            length, pos = _read_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        elif wire_type == 5:
+            value, pos = data[pos:pos + 4], pos + 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type}")
+        yield field, wire_type, value
+
+
+def _snappy_decompress(data):
+    """
+    Decompress a raw Snappy block (the format Source 2 uses for compressed demo frames).
+    """
+    length, pos = _read_varint(data, 0)
+    out = bytearray()
+    while pos < len(data):
+        tag = data[pos]
+        pos += 1
+        kind = tag & 3
+        if kind == 0:
+            size = tag >> 2
+            if size >= 60:
+                extra = size - 59
+                size = int.from_bytes(data[pos:pos + extra], "little")
+                pos += extra
+            size += 1
+            out += data[pos:pos + size]
+            pos += size
+            continue
+        if kind == 1:
+            size = ((tag >> 2) & 7) + 4
+            offset = ((tag >> 5) << 8) | data[pos]
+            pos += 1
+        elif kind == 2:
+            size = (tag >> 2) + 1
+            offset = int.from_bytes(data[pos:pos + 2], "little")
+            pos += 2
+        else:
+            size = (tag >> 2) + 1
+            offset = int.from_bytes(data[pos:pos + 4], "little")
+            pos += 4
+        start = len(out) - offset
+        for i in range(size):  # Copies may overlap their own output
+            out.append(out[start + i])
+    if len(out) != length:
+        raise ValueError("Corrupt compressed demo frame")
+    return bytes(out)
+
+
+def _read_frame(f):
+    """Read one demo frame at the file position as (command, decompressed payload)."""
+    command = _read_varint_stream(f)
+    _read_varint_stream(f)  # tick
+    size = _read_varint_stream(f)
+    payload = f.read(size)
+    if command & DEM_IS_COMPRESSED:
+        payload = _snappy_decompress(payload)
+    return command & ~DEM_IS_COMPRESSED, payload
+
+
+def _round_start_ticks(game_info):
+    """
+    Pull CCSGameInfo.round_start_ticks out of an encoded CGameInfo message.
+    """
+    ticks = []
+    for game_field, _, game_value in _protobuf_fields(game_info):
+        if game_field != GAME_INFO_CS:
+            continue
+        for cs_field, cs_wire, cs_value in _protobuf_fields(game_value):
+            if cs_field != CS_ROUND_START_TICKS:
+                continue
+            if cs_wire == 2:  # Packed repeated field
+                pos = 0
+                while pos < len(cs_value):
+                    tick, pos = _read_varint(cs_value, pos)
+                    ticks.append(tick)
+            else:
+                ticks.append(cs_value)
+    return ticks
+
+
+def teams_from_filename(file_name):
+    """
+    Guess the two teams from an HLTV-style file name, e.g. 'g2-vs-heroic-m1-ancient.dem'.
+
+    Clan names live in the entity stream, not the header, so this is the header-only fallback.
+
+    Parameters:
+        file_name (str): The name of the demo file.
+
+    Returns:
+        tuple: (team1, team2), or (None, None) when the name has no '-vs-'.
+    """
+    stem = os.path.basename(file_name).rsplit(".dem", 1)[0]
+    if "-vs-" not in stem:
+        return None, None
+    team1, rest = stem.split("-vs-", 1)
+    series = re.split(r"-m\d+(?:-|$)", rest)
+    team2 = series[0] if len(series) > 1 else rest.rsplit("-", 1)[0]
+    return team1, team2
+
+
+def read_file_info(demo_path):
+    """
+    Read playback time, playback ticks and round start ticks from a demo's file-info frame.
+
+    The frame sits at the offset stored in the preamble, so nothing else of the demo is decoded.
+
+    Parameters:
+        demo_path (str): Path to the demo file.
+
+    Returns:
+        dict: tickrate, duration_seconds and n_rounds, each None when the demo has no file info
+        (e.g. it is still being recorded).
+    """
+    playback_time = playback_ticks = None
+    round_start_ticks = []
+    with open(demo_path, "rb") as f:
+        f.seek(len(DEMO_MAGIC))
+        file_info_offset, _ = struct.unpack("<ii", f.read(8))
+        if file_info_offset > 0:
+            f.seek(file_info_offset)
+            command, payload = _read_frame(f)
+            if command == DEM_FILE_INFO:
+                for field, _, value in _protobuf_fields(payload):
+                    if field == FILE_INFO_PLAYBACK_TIME:
+                        playback_time = struct.unpack("<f", value)[0]
+                    elif field == FILE_INFO_PLAYBACK_TICKS:
+                        playback_ticks = value
+                    elif field == FILE_INFO_GAME_INFO:
+                        round_start_ticks = _round_start_ticks(value)
+
+    return {
+        "tickrate": round(playback_ticks / playback_time) if playback_time and playback_ticks else None,
+        "duration_seconds": playback_time,
+        "n_rounds": len(round_start_ticks) or None,
+    }
+
+
+def read_demo_metadata(demo_path):
+    """
+    Read a demo's metadata from its file header and file-info frames only, without touching the event stream.
+
+    Parameters:
+        demo_path (str): Path to the demo file.
+
+    Returns:
+        dict: file_name, map_name, server_name, patch_version, tickrate, duration_seconds, n_rounds,
+        team1, team2, size_mb and path.
+
+    Raises:
+        ValueError: If the file is not a CS2 (Source 2) demo or is cut off inside its preamble.
+    """
+    # demoparser2 panics instead of raising on files shorter than the preamble, so check it first
+    with open(demo_path, "rb") as f:
+        preamble = f.read(DEMO_PREAMBLE_SIZE)
+    if not preamble.startswith(DEMO_MAGIC):
+        raise ValueError(f"Not a CS2 demo: {demo_path}")
+    if len(preamble) < DEMO_PREAMBLE_SIZE:
+        raise ValueError(f"Truncated demo: {demo_path}")
+
+    header = DemoParser(demo_path).parse_header()
+    metadata = {"file_name": os.path.basename(demo_path), "path": demo_path}
+    metadata["size_mb"] = os.path.getsize(demo_path) / 2**20
+    metadata.update({field: header.get(field) or None for field in HEADER_FIELDS})
+    metadata.update(read_file_info(demo_path))
+    metadata["team1"], metadata["team2"] = teams_from_filename(demo_path)
+    return metadata
+
+
+def catalogue_demos(folder):
+    """
+    Build a metadata catalogue for every .dem file in a folder from headers only.
+
+    Parameters:
+        folder (str): Folder to scan (not recursive).
+
+    Returns:
+        pd.DataFrame: One row per readable demo with CATALOGUE_COLUMNS.
+    """
+    rows = []
+    for entry in sorted(os.listdir(folder)):
+        if not entry.lower().endswith(".dem"):
+            continue
+        try:
+            rows.append(read_demo_metadata(os.path.join(folder, entry)))
+        except Exception:
+            continue  # Truncated, corrupt or non-CS2 demo, leave it out of the catalogue
+    return pd.DataFrame(rows).reindex(columns=CATALOGUE_COLUMNS)
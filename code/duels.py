@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+
+# Team sides as named in the demo tables; every module takes them from here
+SIDES = ["CT", "TERRORIST"]
+
+# MR12 regulation halves, then MR3 overtime halves
+REGULATION_ROUNDS = 24
+HALF_ROUNDS = 12
+OVERTIME_HALF_ROUNDS = 3
+
+# First round of each regulation half
+PISTOL_ROUNDS = [1, HALF_ROUNDS + 1]
+
+OPENING_COLUMNS = ["round", "tick", "attacker_name", "attacker_team_name", "victim_name", "victim_team_name"]
+CLUTCH_COLUMNS = ["round", "tick", "player_name", "team_name", "opponents", "won"]
+
+
+def round_half(rounds):
+    """
+    Half number of each round (0 and 1 in regulation, 2, 3, ... for overtime halves), sides swap between halves.
+    """
+    rounds = np.asarray(rounds, dtype=np.int64)
+    overtime_half = 2 + (rounds - REGULATION_ROUNDS - 1) // OVERTIME_HALF_ROUNDS
+    return np.where(rounds <= REGULATION_ROUNDS, (rounds - 1) // HALF_ROUNDS, overtime_half)
+
+
+def _enemy_kills(kills_df):
+    """Kills between the two sides, sorted by (round, tick)."""
+    kills = kills_df.dropna(subset=["round", "victim_name"])
+    kills = kills[kills["victim_team_name"].isin(SIDES) & (kills["attacker_team_name"] != kills["victim_team_name"])]
+    return kills.sort_values(["round", "tick"], kind="stable")
+
+
+def opening_duels(kills_df):
+    """
+    The first kill of every round, won by its attacker and lost by its victim.
+
+    Parameters:
+        kills_df (pd.DataFrame): Kills DataFrame with 'round', 'tick' and attacker/victim name and side columns.
+
+    Returns:
+        pd.DataFrame: OPENING_COLUMNS, one row per round that had a kill.
+    """
+    kills = _enemy_kills(kills_df)
+    kills = kills[kills["attacker_team_name"].isin(SIDES)]
+    return kills.drop_duplicates(subset="round")[OPENING_COLUMNS].reset_index(drop=True)
+
+
+def _round_winners(rounds_df):
+    """Map round number -> winning side ('CT' / 'TERRORIST') from a demo's rounds table."""
+    if rounds_df is None or rounds_df.empty or not {"round", "winner"} <= set(rounds_df.columns):
+        return None
+    winners = rounds_df["winner"].astype(str).str.upper().replace({"T": "TERRORIST"})
+    return pd.Series(winners.to_numpy(), index=rounds_df["round"].to_numpy())
+
+
+def _kill_roster(kills):
+    """
+    Fallback roster from the kills alone: every player seen on a side in a half counts as present in each
+    round of that half that had a kill.
+    """
+    appearances = pd.concat([
+        kills[[f"{role}_name", f"{role}_team_name", "round"]].set_axis(["player_name", "team_name", "round"], axis=1)
+        for role in ["attacker", "victim"]
+    ]).dropna()
+    appearances = appearances[appearances["team_name"].isin(SIDES)]
+    appearances["half"] = round_half(appearances["round"])
+    half_roster = appearances[["half", "team_name", "player_name"]].drop_duplicates()
+    rounds = pd.DataFrame({"round": kills["round"].unique()})
+    rounds["half"] = round_half(rounds["round"])
+    return rounds.merge(half_roster, on="half")[["round", "team_name", "player_name"]]
+
+
+def detect_clutches(kills_df, rounds_df=None, roster_df=None):
+    """
+    Find 1vX clutch situations: the first moment in a round a side is down to its last player
+    while the other side still has someone alive.
+
+    Only that first side's clutch is kept. When the clutcher then brings the other side down to its
+    last player too, that 1v1 is part of the same clutch and is not counted for the other side.
+
+    Alive counts come from a per-round cumulative sum of each side's deaths over the tick-sorted
+    kills, taken from the players on each side in that round.
+
+    Parameters:
+        kills_df (pd.DataFrame): Kills DataFrame with 'round', 'tick' and attacker/victim name and side columns.
+        rounds_df (pd.DataFrame): The demo's rounds table with a 'winner' column (optional). Without it a
+            clutch counts as won when every opponent died.
+        roster_df (pd.DataFrame): Players present per round with 'round', 'player_name' and 'team_name',
+            e.g. from the ticks (optional). Without it a side's roster is every player seen on it in the
+            kills of the same half, which misses players who neither killed nor died.
+
+    Returns:
+        pd.DataFrame: CLUTCH_COLUMNS, at most one clutch per round. 'opponents' is the X in 1vX.
+    """
+    kills = _enemy_kills(kills_df)
+    if kills.empty:
+        return pd.DataFrame(columns=CLUTCH_COLUMNS)
+
+    if roster_df is not None and not roster_df.empty:
+        roster = roster_df[["round", "team_name", "player_name"]].dropna()
+        roster = roster[roster["team_name"].isin(SIDES)].drop_duplicates()
+    else:
+        roster = _kill_roster(kills)
+    roster = roster.astype({"round": np.int64})
+    roster_size = roster.groupby(["round", "team_name"]).size()
+
+    # Alive counts of both sides after every death
+    rounds = kills["round"].to_numpy(dtype=np.int64)
+    ct_death = (kills["victim_team_name"] == "CT").to_numpy()
+    ct_dead = pd.Series(ct_death).groupby(rounds).cumsum().to_numpy()
+    t_dead = pd.Series(~ct_death).groupby(rounds).cumsum().to_numpy()
+
+    def size_of(side):
+        # Roster size of side in the round of every kill
+        return roster_size.reindex(pd.MultiIndex.from_arrays([rounds, np.full(len(rounds), side)])).fillna(0).to_numpy()
+
+    alive = {"CT": size_of("CT") - ct_dead, "TERRORIST": size_of("TERRORIST") - t_dead}
+
+    # The side that just lost a player is down to one while the other side is not wiped out
+    victim_side = kills["victim_team_name"].to_numpy()
+    own_alive = np.where(ct_death, alive["CT"], alive["TERRORIST"])
+    other_alive = np.where(ct_death, alive["TERRORIST"], alive["CT"])
+    starts = pd.DataFrame({
+        "round": rounds, "tick": kills["tick"].to_numpy(), "team_name": victim_side, "opponents": other_alive.astype(int),
+    })[(own_alive == 1) & (other_alive >= 1)]
+    starts = starts.drop_duplicates(subset="round")  # The first side down to one player owns the round's clutch
+    if starts.empty:
+        return pd.DataFrame(columns=CLUTCH_COLUMNS)
+
+    # The clutcher is the one roster player of that side not dead by then
+    candidates = starts.merge(roster, on=["round", "team_name"])
+    deaths = kills[["round", "victim_name", "tick"]].rename(columns={"victim_name": "player_name", "tick": "death_tick"})
+    candidates = candidates.merge(deaths.drop_duplicates(subset=["round", "player_name"]), on=["round", "player_name"], how="left")
+    clutches = candidates[~(candidates["death_tick"] <= candidates["tick"])]
+    clutches = clutches[clutches.groupby("round")["player_name"].transform("size") == 1].copy()
+
+    winners = _round_winners(rounds_df)
+    if winners is not None:
+        clutches["won"] = clutches["round"].map(winners).to_numpy() == clutches["team_name"].to_numpy()
+    else:
+        # Opponents left alive at the end of the round, from the last death of the round
+        last = pd.DataFrame({"round": rounds, "CT": alive["CT"], "TERRORIST": alive["TERRORIST"]}).groupby("round").last()
+        opponent_side = np.where(clutches["team_name"] == SIDES[0], SIDES[1], SIDES[0])
+        left = last.reindex(clutches["round"]).to_numpy()[np.arange(len(clutches)), pd.Index(SIDES).get_indexer(opponent_side)]
+        clutches["won"] = left == 0
+    return clutches[CLUTCH_COLUMNS].reset_index(drop=True)
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+from demoparser2 import DemoParser
+from duels import PISTOL_ROUNDS, SIDES
+
+# Player props sampled at each snapshot tick
+ECONOMY_PROPS = ["balance", "current_equip_value", "armor_value", "team_name"]
+
+# Team equipment value at freeze end: below ECO_MAX is an eco, below FORCE_MAX a force buy, otherwise a full buy
+ECO_MAX = 10000
+FORCE_MAX = 20000
+
+BUY_TYPE_COLUMNS = ["round", "team_name", "start_balance", "equipment_value", "armor_value", "players", "buy_type"]
+
+
+def snapshot_ticks(rounds_df=None, parser=None):
+    """
+    Round-start and freeze-end ticks of every round.
+
+    Parameters:
+        rounds_df (pd.DataFrame): The demo's rounds table with 'round', 'start' and 'freeze_end' (optional).
+        parser (DemoParser): Parser to read round_start / round_freeze_end events from when rounds_df is missing.
+            Rounds read from the events keep the rounds table's numbers when it has 'round' and 'start',
+            otherwise they are numbered 1..n.
+
+    Returns:
+        pd.DataFrame: 'round', 'start_tick' and 'freeze_end_tick', one row per round.
+    """
+    if rounds_df is not None and not rounds_df.empty and {"round", "start", "freeze_end"} <= set(rounds_df.columns):
+        ticks = rounds_df[["round", "start", "freeze_end"]].set_axis(["round", "start_tick", "freeze_end_tick"], axis=1)
+        return ticks.dropna().astype("int64").reset_index(drop=True)
+
+    starts = parser.parse_event("round_start")["tick"].sort_values().to_numpy()
+    freeze_ends = parser.parse_event("round_freeze_end")["tick"].sort_values().to_numpy()
+
+    # Each freeze end belongs to the last round start before it; restarts without a freeze end are dropped
+    owner = np.searchsorted(starts, freeze_ends, side="right") - 1
+    valid = owner >= 0
+    owner, freeze_ends = owner[valid], freeze_ends[valid]
+    last = np.r_[owner[1:] != owner[:-1], True]  # Keep the final freeze end of each round start
+    ticks = pd.DataFrame({"start_tick": starts[owner[last]], "freeze_end_tick": freeze_ends[last]})
+    if rounds_df is not None and not rounds_df.empty and {"round", "start"} <= set(rounds_df.columns):
+        # Each snapshot belongs to the last round of the rounds table starting at or before it
+        table = rounds_df[["round", "start"]].dropna().sort_values("start")
+        row = np.searchsorted(table["start"].to_numpy(), ticks["start_tick"].to_numpy(), side="right") - 1
+        ticks = ticks[row >= 0].drop_duplicates(subset="start_tick")
+        ticks.insert(0, "round", table["round"].to_numpy()[row[row >= 0]].astype("int64"))
+        return ticks.drop_duplicates(subset="round", keep="last").reset_index(drop=True)
+    ticks.insert(0, "round", np.arange(1, len(ticks) + 1))
+    return ticks
+
+
+def classify_buys(snapshots):
+    """
+    Turn per-player snapshots into a per-round, per-side buy-type table.
+
+    Parameters:
+        snapshots (pd.DataFrame): 'round', 'team_name', 'start_balance' and 'equipment_value' per player,
+            and 'armor_value' when sampled.
+
+    Returns:
+        pd.DataFrame: BUY_TYPE_COLUMNS; buy_type is 'pistol', 'eco', 'force' or 'full'. armor_value is the
+        side's total armor at freeze end, missing when the snapshots have none.
+    """
+    if "armor_value" not in snapshots.columns:
+        snapshots = snapshots.assign(armor_value=np.nan)
+    teams = (
+        snapshots[snapshots["team_name"].isin(SIDES)]
+        .groupby(["round", "team_name"], as_index=False)
+        .agg(
+            start_balance=("start_balance", "sum"),
+            equipment_value=("equipment_value", "sum"),
+            armor_value=("armor_value", lambda armor: armor.sum(min_count=1)),
+            players=("equipment_value", "size"),
+        )
+    )
+    buy_type = np.select(
+        [teams["equipment_value"] < ECO_MAX, teams["equipment_value"] < FORCE_MAX], ["eco", "force"], "full"
+    )
+    # Pistol rounds are their own buy type whatever is spent
+    teams["buy_type"] = np.where(teams["round"].isin(PISTOL_ROUNDS), "pistol", buy_type)
+    return teams[BUY_TYPE_COLUMNS]
+
+
+def parse_economy(demo_path, rounds_df=None, parser=None):
+    """
+    Sample money, equipment value and armor only at round-start and freeze-end ticks and classify each side's buy.
+
+    Two ticks per round are decoded instead of the whole tick stream.
+
+    Parameters:
+        demo_path (str): Path to the demo file.
+        rounds_df (pd.DataFrame): The demo's rounds table, saves reading the round events again (optional).
+        parser (DemoParser): An existing parser for demo_path (optional).
+
+    Returns:
+        pd.DataFrame: The classify_buys table for the demo.
+    """
+    parser = parser or DemoParser(demo_path)
+    rounds = snapshot_ticks(rounds_df, parser)
+    if rounds.empty:
+        return pd.DataFrame(columns=BUY_TYPE_COLUMNS)
+
+    sampled = parser.parse_ticks(
+        ECONOMY_PROPS, ticks=np.concatenate([rounds["start_tick"], rounds["freeze_end_tick"]]).tolist()
+    )
+    player_key = "steamid" if "steamid" in sampled.columns else "name"
+
+    at_start = rounds[["round", "start_tick"]].merge(sampled, left_on="start_tick", right_on="tick")
+    at_freeze_end = rounds[["round", "freeze_end_tick"]].merge(sampled, left_on="freeze_end_tick", right_on="tick")
+    snapshots = at_freeze_end[["round", player_key, "team_name", "current_equip_value", "armor_value"]].merge(
+        at_start[["round", player_key, "balance"]], on=["round", player_key], how="left"
+    )
+    snapshots = snapshots.rename(columns={"balance": "start_balance", "current_equip_value": "equipment_value"})
+    return classify_buys(snapshots)
+
+
+def join_buy_types(kills_df, buy_types):
+    """
+    Add the attacker's and victim's side buy type for the round to every kill.
+
+    Parameters:
+        kills_df (pd.DataFrame): Kills with 'round', 'attacker_team_name' and 'victim_team_name'.
+        buy_types (pd.DataFrame): classify_buys output for the same demo.
+
+    Returns:
+        pd.DataFrame: A copy of kills_df with 'attacker_buy_type' and 'victim_buy_type'.
+    """
+    kills_df = kills_df.copy()
+    lookup = buy_types.set_index(["round", "team_name"])["buy_type"]
+    for role in ["attacker", "victim"]:
+        keys = pd.MultiIndex.from_arrays([kills_df["round"], kills_df[f"{role}_team_name"]])
+        kills_df[f"{role}_buy_type"] = lookup.reindex(keys).to_numpy()
+    return kills_df
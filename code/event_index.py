@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+ROUND_INDEX_COLUMNS = ["round", "start_tick", "end_tick"]
+
+
+def tick_column(event_df):
+    """
+    Name of the column an event table is ordered by: 'tick', or 'start_tick' for smokes and infernos.
+    """
+    return "tick" if "tick" in event_df.columns else "start_tick"
+
+
+def build_round_index(rounds_df=None, events=None):
+    """
+    Build the round -> tick-range table for one demo.
+
+    Uses the demo's rounds table when available (awpy 'start' and 'official_end'/'end' columns),
+    otherwise falls back to the first and last tick seen per round in the event tables.
+
+    Parameters:
+        rounds_df (pd.DataFrame): The demo's rounds table (optional).
+        events (dict): Game event DataFrames, used when rounds_df is missing (optional).
+
+    Returns:
+        pd.DataFrame: ROUND_INDEX_COLUMNS, one row per round, sorted by start_tick.
+    """
+    if rounds_df is not None and not rounds_df.empty and {"round", "start"} <= set(rounds_df.columns):
+        end_column = "official_end" if "official_end" in rounds_df.columns else "end"
+        round_index = pd.DataFrame({
+            "round": rounds_df["round"],
+            "start_tick": rounds_df["start"],
+            "end_tick": rounds_df[end_column],
+        })
+    else:
+        frames = []
+        for event_df in (events or {}).values():
+            if "round" in event_df.columns and not event_df.empty:
+                ticks = event_df[tick_column(event_df)]
+                frames.append(pd.DataFrame({"round": event_df["round"], "start_tick": ticks, "end_tick": ticks}))
+        if not frames:
+            return pd.DataFrame(columns=ROUND_INDEX_COLUMNS)
+        round_index = (
+            pd.concat(frames, ignore_index=True)
+            .groupby("round", as_index=False)
+            .agg(start_tick=("start_tick", "min"), end_tick=("end_tick", "max"))
+        )
+    return round_index.dropna().astype("int64").sort_values("start_tick", ignore_index=True)
+
+
+def rounds_of_ticks(ticks, round_index):
+    """
+    Round number of each tick via a binary search over the round start ticks.
+
+    Ticks before the first round belong to the first round.
+
+    Parameters:
+        ticks (array-like): Ticks to look up.
+        round_index (pd.DataFrame): build_round_index output.
+
+    Returns:
+        np.ndarray: Round numbers, same length as ticks.
+    """
+    starts = round_index["start_tick"].to_numpy()
+    positions = np.searchsorted(starts, np.asarray(ticks), side="right") - 1
+    return round_index["round"].to_numpy()[np.clip(positions, 0, len(starts) - 1)]
+
+
+def index_game_events(events, rounds_df=None):
+    """
+    Sort every event table by tick and tag tables without a round column with their round.
+
+    Parameters:
+        events (dict): Game event DataFrames from parse_game_events.
+        rounds_df (pd.DataFrame): The demo's rounds table (optional).
+
+    Returns:
+        tuple: (tick-sorted events, round index DataFrame).
+    """
+    round_index = build_round_index(rounds_df, events)
+    indexed = {}
+    for event_name, event_df in events.items():
+        event_df = event_df.sort_values(tick_column(event_df), kind="stable", ignore_index=True)
+        if "round" not in event_df.columns and not round_index.empty:
+            event_df["round"] = rounds_of_ticks(event_df[tick_column(event_df)], round_index)
+        indexed[event_name] = event_df
+    return indexed, round_index
+
+
+def events_in_ticks(event_df, start_tick, end_tick):
+    """
+    Slice a tick-sorted event table to the events in [start_tick, end_tick].
+
+    Parameters:
+        event_df (pd.DataFrame): Event table sorted by its tick column.
+        start_tick (int): First tick, inclusive.
+        end_tick (int): Last tick, inclusive.
+
+    Returns:
+        pd.DataFrame: The matching rows, found with two binary searches.
+    """
+    ticks = event_df[tick_column(event_df)].to_numpy()
+    lo = np.searchsorted(ticks, start_tick, side="left")
+    hi = np.searchsorted(ticks, end_tick, side="right")
+    return event_df.iloc[lo:hi]
+
+
+def events_in_rounds(event_df, round_index, first_round, last_round):
+    """
+    Slice a tick-sorted event table to a range of rounds.
+
+    Parameters:
+        event_df (pd.DataFrame): Event table sorted by its tick column.
+        round_index (pd.DataFrame): build_round_index output for the same demo.
+        first_round (int): First round, inclusive.
+        last_round (int): Last round, inclusive.
+
+    Returns:
+        pd.DataFrame: Events from the start of first_round to the end of last_round.
+    """
+    in_range = round_index[round_index["round"].between(first_round, last_round)]
+    if in_range.empty:
+        return event_df.iloc[0:0]
+    return events_in_ticks(event_df, in_range["start_tick"].min(), in_range["end_tick"].max())
+
+
+def events_near(event_df, tick, seconds, tickrate=64):
+    """
+    Slice a tick-sorted event table to the events within some seconds of a tick.
+
+    Parameters:
+        event_df (pd.DataFrame): Event table sorted by its tick column.
+        tick (int): Centre tick, e.g. a kill.
+        seconds (float): Window on each side.
+        tickrate (int): Demo tickrate.
+
+    Returns:
+        pd.DataFrame: Events in [tick - seconds, tick + seconds].
+    """
+    window = int(seconds * tickrate)
+    return events_in_ticks(event_df, tick - window, tick + window)
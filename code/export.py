@@ -0,0 +1,95 @@
+import io
+import os
+import tempfile
+import zipfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+EXPORT_FORMATS = ["csv", "parquet"]
+
+# Rows converted and written per block, so a table is never serialized all at once
+EXPORT_CHUNK_ROWS = 50_000
+
+# Per-match tables exported next to the game events
+MATCH_TABLES = ["combined_stats", "player_round_facts", "economy"]
+
+
+def match_tables(parsed_matches):
+    """
+    Yield every exportable table of the given matches, one at a time.
+
+    Parameters:
+        parsed_matches (dict): Parsed matches keyed by demo ID.
+
+    Yields:
+        tuple: (path inside the archive without extension, DataFrame), e.g. ('g2-vs-heroic-m1-ancient/kills', df).
+    """
+    for demo_id, match_data in parsed_matches.items():
+        folder = os.path.splitext(match_data.get("file_name") or str(demo_id))[0]
+        for event_name, event_df in (match_data.get("game_events") or {}).items():
+            yield f"{folder}/{event_name}", event_df
+        for table in MATCH_TABLES:
+            if match_data.get(table) is not None:
+                yield f"{folder}/{table}", match_data[table]
+
+
+def _write_csv(dataframe, member):
+    text = io.TextIOWrapper(member, encoding="utf-8", newline="")
+    dataframe.to_csv(text, index=False, chunksize=EXPORT_CHUNK_ROWS)
+    text.flush()
+    text.detach()  # Leave closing the member to the zip file
+
+
+def _write_parquet(dataframe, member):
+    schema = pa.Schema.from_pandas(dataframe, preserve_index=False)
+    with pq.ParquetWriter(member, schema) as writer:
+        for start in range(0, max(len(dataframe), 1), EXPORT_CHUNK_ROWS):
+            chunk = dataframe.iloc[start:start + EXPORT_CHUNK_ROWS]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def write_export(tables, fileobj, fmt="csv"):
+    """
+    Stream tables into a zip archive, each written straight into its compressed member.
+
+    Parameters:
+        tables (iterable): (name, DataFrame) pairs, e.g. from match_tables.
+        fileobj (file-like): Binary file the archive is written to.
+        fmt (str): 'csv' or 'parquet'.
+
+    Returns:
+        list: Names of the archive members written.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {EXPORT_FORMATS}.")
+
+    writer = _write_csv if fmt == "csv" else _write_parquet
+    names = []
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, dataframe in tables:
+            member_name = f"{name}.{fmt}"
+            with archive.open(member_name, "w", force_zip64=True) as member:
+                writer(dataframe, member)
+            names.append(member_name)
+    return names
+
+
+def export_archive(parsed_matches, fmt="csv"):
+    """
+    Export every table of the given matches into one zip archive in a temporary file.
+
+    Parameters:
+        parsed_matches (dict): Parsed matches keyed by demo ID.
+        fmt (str): 'csv' or 'parquet'.
+
+    Returns:
+        io.BufferedReader: The archive, rewound to the start; the file is deleted when it is closed.
+    """
+    archive = tempfile.TemporaryFile(suffix=".zip")
+    write_export(match_tables(parsed_matches), archive, fmt)
+    archive.flush()
+    # A plain reader over the file, which Streamlit's download_button accepts as data
+    reader = io.BufferedReader(archive.detach())
+    reader.seek(0)
+    return reader
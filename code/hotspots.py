@@ -0,0 +1,224 @@
+import numpy as np
+import pandas as pd
+
+from event_index import rounds_of_ticks
+from map_viz import HISTOGRAM_RANGE, HISTOGRAM_SOURCES
+
+# Seconds since the round start (freeze time included) at which each phase begins
+ROUND_PHASES = {"early": 0, "mid": 40, "late": 80}
+
+# Density grid cell in game units, and how far from a peak a position still belongs to its hotspot
+HOTSPOT_CELL_SIZE = 64.0
+HOTSPOT_RADIUS = 160.0
+
+# A peak needs this many positions in its 3x3 cell neighbourhood, and each group keeps its densest peaks
+HOTSPOT_MIN_COUNT = 3
+MAX_HOTSPOTS = 8
+
+HOTSPOT_GROUPS = ["map_name", "show_option", "side", "phase"]
+HOTSPOT_COLUMNS = HOTSPOT_GROUPS + ["hotspot", "X", "Y", "count", "share"]
+
+
+def round_phase(seconds):
+    """Phase name of each time since round start, per ROUND_PHASES."""
+    bounds = np.array(list(ROUND_PHASES.values()), dtype=float)
+    positions = np.searchsorted(bounds, np.asarray(seconds, dtype=float), side="right") - 1
+    return np.array(list(ROUND_PHASES))[np.clip(positions, 0, len(bounds) - 1)]
+
+
+def hotspot_positions(parsed_matches, tickrate=64):
+    """
+    Kill and death positions of every loaded match, tagged with map, side and round phase.
+
+    Parameters:
+        parsed_matches (dict): Parsed matches with 'kills_df' and, for round phases, 'round_index'.
+        tickrate (int): Demo tickrate used to turn ticks into seconds.
+
+    Returns:
+        pd.DataFrame: 'map_name', 'show_option', 'side', 'phase', 'X' and 'Y', one row per position.
+    """
+    frames = []
+    for match_data in parsed_matches.values():
+        kills_df = match_data["kills_df"]
+        round_index = match_data.get("round_index")
+        if kills_df.empty or "map_name" not in kills_df.columns:
+            continue
+
+        # Time since the start of the round each kill happened in
+        if round_index is not None and not round_index.empty:
+            starts = round_index.set_index("round")["start_tick"]
+            rounds = kills_df["round"] if "round" in kills_df.columns else rounds_of_ticks(kills_df["tick"], round_index)
+            start_ticks = starts.reindex(np.asarray(rounds)).to_numpy(dtype=float)
+            phase = round_phase((kills_df["tick"].to_numpy(dtype=float) - start_ticks) / tickrate)
+        else:
+            phase = np.full(len(kills_df), "early")
+
+        for show_option, (x_column, y_column, _, side_column) in HISTOGRAM_SOURCES.items():
+            if not {x_column, y_column, side_column} <= set(kills_df.columns):
+                continue
+            frames.append(pd.DataFrame({
+                "map_name": kills_df["map_name"].to_numpy(),
+                "show_option": show_option,
+                "side": kills_df[side_column].to_numpy(),
+                "phase": phase,
+                "X": kills_df[x_column].to_numpy(dtype=float),
+                "Y": kills_df[y_column].to_numpy(dtype=float),
+            }))
+
+    if not frames:
+        return pd.DataFrame(columns=HOTSPOT_GROUPS + ["X", "Y"])
+    return pd.concat(frames, ignore_index=True).dropna()
+
+
+def _neighbourhood(grids, reduce):
+    """Apply reduce (np.add or np.maximum) over the 3x3 neighbourhood of every cell of a stack of grids."""
+    padded = np.pad(grids, ((0, 0), (1, 1), (1, 1)))
+    ny, nx = grids.shape[1:]
+    result = padded[:, 0:ny, 0:nx].copy()
+    for dy in range(3):
+        for dx in range(3):
+            if dy or dx:
+                reduce(result, padded[:, dy:dy + ny, dx:dx + nx], out=result)
+    return result
+
+
+def detect_hotspots(positions, cell_size=HOTSPOT_CELL_SIZE, radius=HOTSPOT_RADIUS, min_count=HOTSPOT_MIN_COUNT,
+                    max_hotspots=MAX_HOTSPOTS, weights=None, group_sizes=None):
+    """
+    Grid-density clustering of positions into hotspots, every group at once.
+
+    Positions are binned into one stack of density grids (one grid per map, show option, side and phase),
+    smoothed with a 3x3 box sum, and the local maxima become hotspot peaks. Each position then joins
+    its nearest peak within radius, and a hotspot's centroid is the mean of its positions.
+
+    Parameters:
+        positions (pd.DataFrame): hotspot_positions output.
+        cell_size (float): Grid cell in game units.
+        radius (float): Largest distance from a peak's cell centre to a position of its hotspot.
+        min_count (int): Positions needed in a peak's 3x3 neighbourhood.
+        max_hotspots (int): Densest peaks kept per group.
+        weights (np.ndarray): Positions each row stands for, e.g. the counts of stored hotspots (optional).
+        group_sizes (pd.Series): Positions per HOTSPOT_GROUPS key the shares are taken of, when the rows
+            do not cover every position of their group (optional).
+
+    Returns:
+        pd.DataFrame: HOTSPOT_COLUMNS; 'share' is the fraction of the group's positions in the hotspot.
+    """
+    lo, hi = HISTOGRAM_RANGE
+    n = int(np.ceil((hi - lo) / cell_size))
+    cx = np.floor((positions["X"].to_numpy(dtype=float) - lo) / cell_size).astype(np.int64)
+    cy = np.floor((positions["Y"].to_numpy(dtype=float) - lo) / cell_size).astype(np.int64)
+    inside = (cx >= 0) & (cx < n) & (cy >= 0) & (cy < n)
+    weights = np.ones(len(positions)) if weights is None else np.asarray(weights, dtype=float)
+    positions, cx, cy, weights = positions[inside], cx[inside], cy[inside], weights[inside]
+    if positions.empty:
+        return pd.DataFrame(columns=HOTSPOT_COLUMNS)
+
+    groups = positions.groupby(HOTSPOT_GROUPS, sort=True)
+    group = groups.ngroup().to_numpy()
+    group_keys = list(groups.groups)
+    if group_sizes is None:
+        group_sizes = np.bincount(group, weights=weights, minlength=len(group_keys))
+    else:
+        group_sizes = group_sizes.reindex(pd.MultiIndex.from_tuples(group_keys, names=HOTSPOT_GROUPS)).to_numpy(dtype=float)
+
+    grids = np.bincount((group * n + cy) * n + cx, weights=weights, minlength=len(group_keys) * n * n).reshape(-1, n, n)
+    density = _neighbourhood(grids, np.add)
+
+    # Peaks: dense cells holding positions that are the maximum of their neighbourhood; of two equal
+    # neighbouring maxima only the first in row-major order is kept
+    peaks = (density == _neighbourhood(density, np.maximum)) & (density >= min_count) & (grids > 0)
+    padded = np.pad(peaks, ((0, 0), (1, 1), (1, 1)))
+    ny, nx = peaks.shape[1:]
+    for dy, dx in [(0, 0), (0, 1), (0, 2), (1, 0)]:  # Up-left, up, up-right and left neighbours
+        peaks &= ~padded[:, dy:dy + ny, dx:dx + nx]
+    peak_group, peak_y, peak_x = np.nonzero(peaks)
+
+    # Densest max_hotspots peaks per group, sorted by group then density
+    peak_density = density[peak_group, peak_y, peak_x]
+    order = np.lexsort((-peak_density, peak_group))
+    peak_group, peak_y, peak_x = peak_group[order], peak_y[order], peak_x[order]
+    rank = np.arange(len(peak_group)) - np.searchsorted(peak_group, peak_group)
+    keep = rank < max_hotspots
+    peak_group, peak_y, peak_x, rank = peak_group[keep], peak_y[keep], peak_x[keep], rank[keep]
+    if not len(peak_group):
+        return pd.DataFrame(columns=HOTSPOT_COLUMNS)
+    peak_cx = lo + (peak_x + 0.5) * cell_size
+    peak_cy = lo + (peak_y + 0.5) * cell_size
+
+    # Every position against every peak of its own group: expand (position, peak) pairs from the group ranges
+    peak_starts = np.searchsorted(peak_group, np.arange(len(group_keys)), side="left")
+    peak_ends = np.searchsorted(peak_group, np.arange(len(group_keys)), side="right")
+    counts = (peak_ends - peak_starts)[group]
+    pair_position = np.repeat(np.arange(len(group)), counts)
+    pair_peak = np.repeat(peak_starts[group], counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    x = positions["X"].to_numpy(dtype=float)
+    y = positions["Y"].to_numpy(dtype=float)
+    distance = np.hypot(x[pair_position] - peak_cx[pair_peak], y[pair_position] - peak_cy[pair_peak])
+
+    # Nearest peak within radius per position
+    near = distance <= radius
+    pair_position, pair_peak, distance = pair_position[near], pair_peak[near], distance[near]
+    order = np.lexsort((distance, pair_position))
+    nearest = np.ones(len(order), dtype=bool)
+    nearest[1:] = pair_position[order][1:] != pair_position[order][:-1]
+    members, member_peak = pair_position[order][nearest], pair_peak[order][nearest]
+
+    size = np.bincount(member_peak, weights=weights[members], minlength=len(peak_group))
+    centroid_x = np.bincount(member_peak, weights=x[members] * weights[members], minlength=len(peak_group))
+    centroid_y = np.bincount(member_peak, weights=y[members] * weights[members], minlength=len(peak_group))
+    found = size > 0
+
+    hotspots = pd.DataFrame([group_keys[g] for g in peak_group[found]], columns=HOTSPOT_GROUPS)
+    hotspots["hotspot"] = rank[found] + 1
+    hotspots["X"] = centroid_x[found] / size[found]
+    hotspots["Y"] = centroid_y[found] / size[found]
+    hotspots["count"] = size[found].round().astype(np.int64)
+    hotspots["share"] = size[found] / group_sizes[peak_group[found]]
+    return hotspots[HOTSPOT_COLUMNS].reset_index(drop=True)
+
+
+def match_hotspots(kills_df, round_index=None, tickrate=64):
+    """
+    Hotspots of one match, computed once at ingest and stored with its parsed data.
+
+    Parameters:
+        kills_df (pd.DataFrame): Kills of the match.
+        round_index (pd.DataFrame): Round tick ranges, for round phases (optional).
+        tickrate (int): Demo tickrate.
+
+    Returns:
+        pd.DataFrame: detect_hotspots output.
+    """
+    return detect_hotspots(hotspot_positions({"match": {"kills_df": kills_df, "round_index": round_index}}, tickrate))
+
+
+def merge_hotspots(parsed_matches):
+    """
+    Hotspots of several matches from their stored per-match hotspots.
+
+    Stored centroids are clustered again weighted by their counts, so no match's positions are read;
+    shares are taken of every position of the group, recovered per match as count / share.
+
+    Parameters:
+        parsed_matches (dict): Parsed matches with 'hotspots'.
+
+    Returns:
+        pd.DataFrame: HOTSPOT_COLUMNS.
+    """
+    frames = [match_data["hotspots"] for match_data in parsed_matches.values() if len(match_data["hotspots"])]
+    if not frames:
+        return pd.DataFrame(columns=HOTSPOT_COLUMNS)
+    if len(frames) == 1:
+        return frames[0]
+
+    # Positions per group of each match, then summed over the matches
+    group_sizes = pd.concat([
+        (frame["count"] / frame["share"]).groupby([frame[column] for column in HOTSPOT_GROUPS]).first()
+        for frame in frames
+    ])
+    group_sizes = group_sizes.groupby(level=list(range(len(HOTSPOT_GROUPS)))).sum()
+    group_sizes.index.names = HOTSPOT_GROUPS
+
+    stored = pd.concat(frames, ignore_index=True)
+    return detect_hotspots(stored, weights=stored["count"].to_numpy(), group_sizes=group_sizes)
@@ -0,0 +1,342 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pandas as pd
+from demoparser2 import DemoParser
+from awpy import Demo
+from Stats import parse_demo_file, parse_game_events
+from player_rounds import round_roster
+from map_viz import extract_map_name_from_filename, MapHistogram
+from event_index import index_game_events
+from economy import parse_economy, join_buy_types
+from hotspots import match_hotspots
+from parse_cache import PARSE_CACHE_DIR, save_parsed
+from search_index import demo_document, save_document
+from pipeline import Pipeline, Stage, StageStore
+from metrics import CACHE_REQUESTS, DEMO_PARSE_SECONDS, EVENT_TABLE_ROWS, PARSE_STAGE_SECONDS
+
+# Shared by every session so uploads from different tabs queue on the same workers.
+# Sized so every map of a best-of-five archive can parse at once on a typical machine.
+_executor = ThreadPoolExecutor(max_workers=min(5, os.cpu_count() or 2), thread_name_prefix="demo-ingest")
+
+# Process-wide parse jobs keyed by demo ID, so every session asking for the same demo shares one parse
+# and one result. Finished jobs beyond SHARED_JOBS_MAX are dropped oldest first; the disk cache has them.
+SHARED_JOBS_MAX = 16
+_shared_jobs = OrderedDict()
+_shared_jobs_lock = threading.Lock()
+
+
+
+class ParseCancelled(Exception):
+    """Raised inside a parse job when it was cancelled between stages."""
+
+
+# Raw awpy Demo tables kept by the 'events' stage, so later stages never need the demo parsed again.
+# The ticks are not kept, only their per-round roster ('round_roster'); storing and fingerprinting
+# every sampled tick would cost more than the stats need from them.
+DEMO_TABLES = ["header", "kills", "damages", "rounds", "smokes", "infernos", "bomb", "grenades"]
+
+# Pipeline outputs handed to the UI, the parse cache and the API
+PARSED_OUTPUTS = [
+    "header", "combined_stats", "kills_df", "player_round_facts",
+    "map_histogram", "economy", "game_events", "round_index", "hotspots",
+]
+
+
+class _JobStageStore(StageStore):
+    """
+    Stage outputs of a parse job, only saved while the job is not cancelled: a cancelled job may be
+    replaced by a new one for the same demo, which owns the demo's cache entries from then on.
+    """
+
+    def __init__(self, demo_id, cache_dir, cancel_event=None):
+        super().__init__(demo_id, cache_dir)
+        self.cancel_event = cancel_event
+
+    def save(self, stage, key, outputs, fingerprints):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise ParseCancelled(f"Parsing {self.demo_id} was cancelled during '{stage}'")
+        super().save(stage, key, outputs, fingerprints)
+
+
+def _demo_view(demo_tables):
+    """A stand-in for an awpy Demo over stored demo tables, for functions that take demo=..."""
+    deep = not _copy_on_write()  # The stages change their tables, the stored ones must stay as they were
+    return SimpleNamespace(**{
+        name: table.copy(deep=deep) if isinstance(table, pd.DataFrame) else table
+        for name, table in demo_tables.items()
+    })
+
+
+def _header_stage(demo_path):
+    return {"header": DemoParser(demo_path).parse_header()}
+
+
+def _events_stage(demo_path):
+    demo = Demo(demo_path)
+    demo_tables = {name: getattr(demo, name, None) for name in DEMO_TABLES}
+    return {"demo_tables": {**demo_tables, "round_roster": round_roster(getattr(demo, "ticks", None))}}
+
+
+def _stats_stage(demo_tables, header, file_name):
+    stats = parse_demo_file(None, demo=_demo_view(demo_tables))
+    # The header knows the real map, the file name is only a fallback
+    map_name = header.get("map_name") or extract_map_name_from_filename(file_name)
+    stats["kills_df"]["map_name"] = map_name
+    return {
+        "combined_stats": stats["combined_stats"],
+        "stats_kills": stats["kills_df"],
+        "player_round_facts": stats["player_round_facts"],
+    }
+
+
+def _economy_stage(demo_path, demo_tables, stats_kills):
+    # Money and equipment sampled at two ticks per round, joined onto the kills as buy types
+    economy = parse_economy(demo_path, demo_tables.get("rounds"))
+    return {"economy": economy, "kills_df": join_buy_types(stats_kills, economy)}
+
+
+def _map_histogram_stage(kills_df):
+    # Counted once here so map heatmaps over many demos only sum grids
+    return {"map_histogram": MapHistogram.from_kills(kills_df)}
+
+
+def _game_events_stage(demo_path, demo_tables):
+    # Tick-sorted tables plus a round -> tick-range index for searchsorted filtering
+    game_events, round_index = index_game_events(
+        parse_game_events(demo_path, demo=_demo_view(demo_tables)), demo_tables.get("rounds")
+    )
+    return {"game_events": game_events, "round_index": round_index}
+
+
+def _hotspots_stage(kills_df, round_index):
+    # Clustered once here so the UI and the API only merge stored centroids
+    return {"hotspots": match_hotspots(kills_df, round_index)}
+
+
+# The ingest DAG. A new derived table is a new Stage here: existing demos only run that stage,
+# every other stage is read back from the parse cache.
+INGEST_PIPELINE = Pipeline([
+    Stage("header", ["demo_path"], ["header"], _header_stage),
+    Stage("events", ["demo_path"], ["demo_tables"], _events_stage, version=2),
+    Stage("stats", ["demo_tables", "header", "file_name"], ["combined_stats", "stats_kills", "player_round_facts"], _stats_stage),
+    Stage("economy", ["demo_path", "demo_tables", "stats_kills"], ["economy", "kills_df"], _economy_stage, version=2),
+    Stage("map_histogram", ["kills_df"], ["map_histogram"], _map_histogram_stage),
+    Stage("game_events", ["demo_path", "demo_tables"], ["game_events", "round_index"], _game_events_stage),
+    Stage("hotspots", ["kills_df", "round_index"], ["hotspots"], _hotspots_stage),
+])
+
+# Parse stages in order, reported to the UI as (index + 1) / len(PARSE_STAGES)
+PARSE_STAGES = [stage.name for stage in INGEST_PIPELINE.stages]
+
+# The stage storing each parsed output, so the parse cache entry can point at it instead of a second copy
+OUTPUT_STAGES = {output: stage.name for stage in INGEST_PIPELINE.stages for output in stage.outputs}
+
+
+def parse_demo_in_stages(demo_path, file_name, on_progress=None, cancel_event=None, demo_id=None, cache_dir=PARSE_CACHE_DIR):
+    """
+    Run the ingest pipeline for a demo, reporting progress after each stage.
+
+    With a demo ID, stages whose inputs did not change are read back from the parse cache instead of run.
+
+    Parameters:
+        demo_path (str): Path to the demo file.
+        file_name (str): Original name of the uploaded file, used for the map name.
+        on_progress (callable): Called as on_progress(stage, fraction) when a stage finishes (optional).
+        cancel_event (threading.Event): Checked before each stage; when set the parse stops (optional).
+        demo_id (str): Content-hash demo ID, fingerprints the demo file and enables stage caching (optional).
+        cache_dir (str): Parse cache folder.
+
+    Returns:
+        dict: Parsed match data with PARSED_OUTPUTS.
+
+    Raises:
+        ParseCancelled: If cancel_event was set before the parse finished.
+    """
+    started = {}
+
+    def before_stage(stage):
+        if cancel_event is not None and cancel_event.is_set():
+            raise ParseCancelled(f"Parsing {file_name} was cancelled during '{stage}'")
+        started[stage] = time.perf_counter()
+
+    def after_stage(stage, ran):
+        PARSE_STAGE_SECONDS.observe(time.perf_counter() - started[stage], stage=stage, cached=str(not ran).lower())
+        if demo_id:
+            CACHE_REQUESTS.inc(cache="parse_stage", result="miss" if ran else "hit")
+        if on_progress is not None:
+            on_progress(stage, (PARSE_STAGES.index(stage) + 1) / len(PARSE_STAGES))
+
+    values, _ = INGEST_PIPELINE.run(
+        {"demo_path": demo_path, "file_name": file_name},
+        store=_JobStageStore(demo_id, cache_dir, cancel_event) if demo_id else None,
+        # The file's content hash stands in for its path, so a moved or renamed demo stays cached
+        source_fingerprints={"demo_path": demo_id} if demo_id else None,
+        before_stage=before_stage,
+        after_stage=after_stage,
+    )
+    for table, event_df in (values["game_events"] or {}).items():
+        EVENT_TABLE_ROWS.observe(len(event_df), table=table)
+    return {name: values[name] for name in PARSED_OUTPUTS}
+
+
+class ParseJob:
+    """
+    A demo parse running on the shared worker pool.
+
+    The UI polls 'status', 'stage' and 'progress' on each rerun, calls cancel() to abort,
+    and reads 'result' or 'error' once done() is True. With a demo ID, unchanged pipeline stages are
+    read from the on-disk parse cache, and an entry pointing at their stored outputs is written there for
+    the API server, along with the demo's search document.
+    """
+
+    def __init__(self, demo_path, file_name, demo_id=None, cache_dir=PARSE_CACHE_DIR, session=None):
+        self.demo_path = demo_path
+        self.file_name = file_name
+        self.demo_id = demo_id
+        self.cache_dir = cache_dir
+        self.status = "queued"
+        self.stage = None
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self._cancel_event = threading.Event()
+        self._future = None
+        self._sessions = {session: False}  # Session -> whether it cancelled
+        self._lock = threading.Lock()
+
+    def _report(self, stage, fraction):
+        self.stage = stage
+        self.progress = fraction
+
+    def _run(self):
+        self.status = "running"
+        start = time.perf_counter()
+        try:
+            self.result = parse_demo_in_stages(
+                self.demo_path, self.file_name, self._report, self._cancel_event,
+                demo_id=self.demo_id, cache_dir=self.cache_dir,
+            )
+            if self.demo_id:
+                if self._cancel_event.is_set():
+                    raise ParseCancelled(f"Parsing {self.file_name} was cancelled before it was stored")
+                try:
+                    cached = {**self.result, "file_name": self.file_name}
+                    stages = {name: OUTPUT_STAGES[name] for name in PARSED_OUTPUTS}
+                    save_parsed(self.demo_id, cached, self.cache_dir, stages=stages)
+                    save_document(demo_document(self.demo_id, cached, self.demo_path), self.cache_dir)
+                except OSError:
+                    pass  # A read-only or full disk only costs a re-parse next time
+            self.status = "done"
+        except ParseCancelled:
+            self.status = "cancelled"
+        except Exception as e:
+            self.error = e
+            self.status = "failed"
+        finally:
+            DEMO_PARSE_SECONDS.observe(time.perf_counter() - start, status=self.status)
+
+    def start(self, executor=None):
+        self._future = (executor or _executor).submit(self._run)
+        return self
+
+    def subscribe(self, session=None):
+        """
+        Register another session waiting on this job.
+
+        Returns:
+            ParseJob: The job, or None when every earlier session cancelled it and it is stopping.
+        """
+        with self._lock:
+            if self._cancel_event.is_set() and self.status != "done":
+                return None
+            self._sessions[session] = False
+        return self
+
+    def cancel(self, session=None):
+        """
+        Withdraw one session from the job; repeats and unknown sessions are ignored. Once every session
+        cancelled the job stops: a queued job never starts, a running one stops at the next stage.
+        """
+        with self._lock:
+            if self._sessions.get(session, True):
+                return
+            self._sessions[session] = True
+            if not all(self._sessions.values()):
+                return
+            # Set under the lock, so a concurrent subscribe() either counts or sees the job stopping
+            self._cancel_event.set()
+        if self._future is not None and self._future.cancel():
+            self.status = "cancelled"
+
+    def done(self):
+        return self.status in ("done", "failed", "cancelled")
+
+
+def submit_parse_job(demo_path, file_name, executor=None, demo_id=None, session=None):
+    """
+    Start parsing a demo in the background.
+
+    Parameters:
+        demo_path (str): Path to the demo file.
+        file_name (str): Original name of the uploaded file.
+        executor (Executor): Executor to run on, defaults to the shared ingest pool (optional).
+        demo_id (str): Content-hash demo ID; enables the on-disk parse cache and sharing the job
+            with every other session that submits the same demo (optional).
+        session (str): ID of the submitting session, the same one it later passes to cancel() (optional).
+
+    Returns:
+        ParseJob: The started job, or the already queued, running or finished job for demo_id.
+    """
+    if demo_id is None:
+        return ParseJob(demo_path, file_name, session=session).start(executor)
+
+    # Single flight: the first session starts the parse, later ones wait on the same job.
+    # A job every session cancelled is not joined, even while it is still winding down.
+    with _shared_jobs_lock:
+        job = _shared_jobs.get(demo_id)
+        if job is not None and job.status not in ("failed", "cancelled") and job.subscribe(session) is not None:
+            _shared_jobs.move_to_end(demo_id)
+            CACHE_REQUESTS.inc(cache="shared_job", result="hit")
+            return job
+        CACHE_REQUESTS.inc(cache="shared_job", result="miss")
+
+        job = ParseJob(demo_path, file_name, demo_id, session=session)
+        _shared_jobs[demo_id] = job
+        finished = [key for key, shared in _shared_jobs.items() if shared.done()]
+        for key in finished[:max(0, len(_shared_jobs) - SHARED_JOBS_MAX)]:
+            del _shared_jobs[key]
+    return job.start(executor)
+
+
+def _copy_on_write():
+    """Whether pandas copies on write: always from pandas 3, opt-in before."""
+    return int(pd.__version__.split(".")[0]) >= 3 or pd.get_option("mode.copy_on_write") is True
+
+
+def shared_view(parsed_data):
+    """
+    A session's view of a shared parse result, without copying any data under copy-on-write.
+
+    DataFrames (also inside dicts such as 'game_events') are shallow copies over the shared buffers;
+    under copy-on-write, changing a view copies the touched columns and leaves the shared result as it was.
+    Without it (pandas 2 defaults) the frames are deep copies, so a session never changes the shared result.
+
+    Parameters:
+        parsed_data (dict): A shared job's result.
+
+    Returns:
+        dict: The view.
+    """
+    view, deep = {}, not _copy_on_write()
+    for key, value in parsed_data.items():
+        if isinstance(value, pd.DataFrame):
+            value = value.copy(deep=deep)
+        elif isinstance(value, dict):
+            value = shared_view(value)
+        view[key] = value
+    return view
@@ -1,7 +1,11 @@
+import numpy as np
 import pandas as pd
-from awpy.plot import heatmap
+from awpy.plot import heatmap, plot
+from awpy.plot.utils import game_to_pixel_axis
 import matplotlib.pyplot as plt
 
+from spatial_index import SpatialGridIndex
+
 
 def extract_map_name_from_filename(file_name):
     """
@@ -25,9 +29,9 @@ import matplotlib.pyplot as plt
 from matplotlib.ticker import FuncFormatter, MaxNLocator
 from awpy.plot import heatmap
 
-def generate_map_visuals(parsed_matches, selected_map, show_option):
+def collect_map_points(parsed_matches, selected_map, show_option):
     """
-    Generate heatmaps for kills or deaths for a specific map.
+    Collect kill or death positions on a map across all loaded matches.
 
     Parameters:
         parsed_matches (dict): Parsed match data.
@@ -35,10 +39,12 @@ def generate_map_visuals(parsed_matches, selected_map, show_option):
         show_option (str): Either 'kills' or 'deaths'.
 
     Returns:
-        tuple: Matplotlib figures for Clan 1 and Clan 2.
+        pd.DataFrame: One row per position with X, Y, clan (1 or 2 within its match), clan_name and side.
     """
-    clan1_points = []
-    clan2_points = []
+    columns = {"kills": ["attacker_X", "attacker_Y"], "deaths": ["victim_X", "victim_Y"]}[show_option]
+    clan_column = "attacker_team_clan_name" if show_option == "kills" else "victim_team_clan_name"
+    side_column = "attacker_team_name" if show_option == "kills" else "victim_team_name"
+    frames = []
 
     for match_data in parsed_matches.values():
         kills_df = match_data["kills_df"]
@@ -50,26 +56,290 @@ def generate_map_visuals(parsed_matches, selected_map, show_option):
 
         # Extract clan names dynamically
         clans = kills_on_map["attacker_team_clan_name"].dropna().unique()
-        if len(clans) >= 2:
-            clan1, clan2 = clans[:2]
-        else:
+        if len(clans) < 2:
+            continue
+
+        for slot, clan in enumerate(clans[:2], start=1):
+            points = kills_on_map.loc[kills_on_map[clan_column] == clan, columns].dropna()
+            points.columns = ["X", "Y"]
+            side = kills_on_map.loc[points.index, side_column] if side_column in kills_on_map.columns else None
+            frames.append(points.assign(clan=slot, clan_name=clan, side=side))
+
+    if not frames:
+        return pd.DataFrame(columns=["X", "Y", "clan", "clan_name", "side"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def build_position_index(points):
+    """
+    Build a spatial grid index over collected map positions.
+
+    Parameters:
+        points (pd.DataFrame): Output of collect_map_points.
+
+    Returns:
+        SpatialGridIndex: Index whose query results are row positions into points.
+    """
+    return SpatialGridIndex(points["X"].to_numpy(dtype=float), points["Y"].to_numpy(dtype=float))
+
+
+# Fixed histogram grid shared by every demo, in game units, so per-demo counts can be summed.
+# Covers every active-duty map; 160 bins gives 64-unit cells.
+HISTOGRAM_RANGE = (-5120.0, 5120.0)
+HISTOGRAM_BINS = 160
+
+# Position, clan and side columns counted for each show option
+HISTOGRAM_SOURCES = {
+    "kills": ["attacker_X", "attacker_Y", "attacker_team_clan_name", "attacker_team_name"],
+    "deaths": ["victim_X", "victim_Y", "victim_team_clan_name", "victim_team_name"],
+}
+
+
+class MapHistogram:
+    """
+    Kill and death counts of one map on a fixed grid, keyed by (show_option, clan_name, side).
+
+    Built once per demo at ingest; histograms of the same map add cell by cell, so a season-level
+    heatmap costs one array sum per demo instead of re-collecting every kill position.
+    """
+
+    def __init__(self, map_name, counts=None):
+        self.map_name = map_name
+        self.counts = counts or {}
+
+    @classmethod
+    def from_kills(cls, kills_df, map_name=None):
+        """
+        Count kill and death positions of one demo.
+
+        Parameters:
+            kills_df (pd.DataFrame): Kills with the HISTOGRAM_SOURCES columns.
+            map_name (str): Map of the demo, defaults to kills_df's 'map_name' (optional).
+
+        Returns:
+            MapHistogram: Counts for every (show_option, clan, side) present in the kills.
+        """
+        if map_name is None:
+            map_name = kills_df["map_name"].iloc[0] if "map_name" in kills_df.columns and len(kills_df) else None
+        lo, hi = HISTOGRAM_RANGE
+        cell_size = (hi - lo) / HISTOGRAM_BINS
+        counts = {}
+
+        for show_option, columns in HISTOGRAM_SOURCES.items():
+            if not set(columns) <= set(kills_df.columns):
+                continue
+            x_column, y_column, clan_column, side_column = columns
+            positions = kills_df[columns].dropna()
+            cx = np.floor((positions[x_column].to_numpy(dtype=float) - lo) / cell_size).astype(np.int64)
+            cy = np.floor((positions[y_column].to_numpy(dtype=float) - lo) / cell_size).astype(np.int64)
+            inside = (cx >= 0) & (cx < HISTOGRAM_BINS) & (cy >= 0) & (cy < HISTOGRAM_BINS)
+            positions = positions[inside]
+            if positions.empty:
+                continue
+
+            # One bincount over (group, row, column) fills every clan/side grid at once
+            groups = positions.groupby([clan_column, side_column], sort=True)
+            codes = groups.ngroup().to_numpy()
+            cells = HISTOGRAM_BINS * HISTOGRAM_BINS
+            flat = codes * cells + cy[inside] * HISTOGRAM_BINS + cx[inside]
+            grids = np.bincount(flat, minlength=groups.ngroups * cells).reshape(-1, HISTOGRAM_BINS, HISTOGRAM_BINS)
+            for code, (clan, side) in enumerate(groups.groups):
+                counts[(show_option, clan, side)] = grids[code].astype(np.int32)
+
+        return cls(map_name, counts)
+
+    def merge(self, other):
+        """
+        Sum two histograms of the same map.
+
+        Parameters:
+            other (MapHistogram): Histogram to add.
+
+        Returns:
+            MapHistogram: A new histogram with the counts of both.
+        """
+        if other.map_name != self.map_name:
+            raise ValueError(f"Cannot merge histograms of {self.map_name} and {other.map_name}.")
+        counts = dict(self.counts)
+        for key, grid in other.counts.items():
+            counts[key] = counts[key] + grid if key in counts else grid
+        return MapHistogram(self.map_name, counts)
+
+    def clans(self):
+        """Clan names with counts, in the order they were first counted."""
+        return list(dict.fromkeys(clan for _, clan, _ in self.counts))
+
+    def grid(self, show_option, clan=None, side=None):
+        """
+        Counts for one show option, summed over the clans and sides not selected.
+
+        Parameters:
+            show_option (str): Either 'kills' or 'deaths'.
+            clan (str): Only this clan (optional).
+            side (str): Only this side, 'CT' or 'TERRORIST' (optional).
+
+        Returns:
+            np.ndarray: HISTOGRAM_BINS x HISTOGRAM_BINS counts, rows are Y cells and columns X cells.
+        """
+        total = np.zeros((HISTOGRAM_BINS, HISTOGRAM_BINS), dtype=np.int64)
+        for (option, grid_clan, grid_side), grid in self.counts.items():
+            if option == show_option and clan in (None, grid_clan) and side in (None, grid_side):
+                total += grid
+        return total
+
+
+def merge_map_histograms(parsed_matches, selected_map, show_option, side=None):
+    """
+    Sum the per-demo histograms of a map into one grid per clan slot.
+
+    Clan slots follow collect_map_points: the first two attacking clans of each match are clans 1 and 2.
+
+    Parameters:
+        parsed_matches (dict): Parsed match data with 'kills_df' and 'map_histogram' per match.
+        selected_map (str): Map name.
+        show_option (str): Either 'kills' or 'deaths'.
+        side (str): Only count this side, 'CT' or 'TERRORIST' (optional).
+
+    Returns:
+        tuple: (clan 1 grid, clan 2 grid, clan 1 name, clan 2 name); the names are None when no match had two clans.
+    """
+    grids = [np.zeros((HISTOGRAM_BINS, HISTOGRAM_BINS), dtype=np.int64) for _ in range(2)]
+    names = [None, None]
+
+    for match_data in parsed_matches.values():
+        histogram = match_data.get("map_histogram")
+        if histogram is None or histogram.map_name != selected_map:
+            continue
+        clans = match_data["kills_df"]["attacker_team_clan_name"].dropna().unique()
+        if len(clans) < 2:
             continue
+        for slot, clan in enumerate(clans[:2]):
+            grids[slot] += histogram.grid(show_option, clan=clan, side=side)
+            names[slot] = names[slot] or clan
+
+    return grids[0], grids[1], names[0], names[1]
+
 
-        # Collect points
-        if show_option == "kills":
-            clan1_points.extend(kills_on_map[kills_on_map["attacker_team_clan_name"] == clan1][["attacker_X", "attacker_Y"]].dropna().values.tolist())
-            clan2_points.extend(kills_on_map[kills_on_map["attacker_team_clan_name"] == clan2][["attacker_X", "attacker_Y"]].dropna().values.tolist())
-        elif show_option == "deaths":
-            clan1_points.extend(kills_on_map[kills_on_map["victim_team_clan_name"] == clan1][["victim_X", "victim_Y"]].dropna().values.tolist())
-            clan2_points.extend(kills_on_map[kills_on_map["victim_team_clan_name"] == clan2][["victim_X", "victim_Y"]].dropna().values.tolist())
+def _integer_formatter(x, _):
+    """Format color bar ticks as integers."""
+    return f"{int(x)}" if x.is_integer() else ""
+
+
+def _finish_heatmap(fig, ax, mappable, title):
+    """Add the title and an integer color bar to a heatmap figure."""
+    # Add title
+    ax.set_title(title, fontsize=16, pad=20)
+
+    # Adjust the color bar
+    fig.subplots_adjust(right=0.9)  # Space for legend
+    cbar = fig.colorbar(mappable, ax=ax, orientation='vertical', fraction=0.02, pad=0.03)
+
+    # Set clean integer tick labels with proper positions
+    cbar.locator = MaxNLocator(integer=True)
+    cbar.formatter = FuncFormatter(_integer_formatter)
+    cbar.update_ticks()
+
+    # Customize color bar ticks
+    cbar.ax.yaxis.set_tick_params(color='white')
+    plt.setp(cbar.ax.get_yticklabels(), color='white', fontsize=10)
+
+    return fig
+
+
+def plot_histogram(grid, map_name, title):
+    """
+    Draw a MapHistogram grid over the map's radar image.
+
+    Parameters:
+        grid (np.ndarray): Counts from MapHistogram.grid or merge_map_histograms.
+        map_name (str): Map name.
+        title (str): Figure title.
+
+    Returns:
+        matplotlib.figure.Figure: The heatmap figure.
+    """
+    fig, ax = plot(map_name)
+    edges = np.linspace(*HISTOGRAM_RANGE, HISTOGRAM_BINS + 1)
+    x_edges = [game_to_pixel_axis(map_name, edge, "x") for edge in edges]
+    y_edges = [game_to_pixel_axis(map_name, edge, "y") for edge in edges]
+    mesh = ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(grid, 0), cmap="coolwarm", alpha=0.7)
+    return _finish_heatmap(fig, ax, mesh, title)
+
+
+def plot_hotspots(hotspots, map_name, title):
+    """
+    Draw hotspot centroids over the map's radar image, sized by how many positions they hold.
+
+    Parameters:
+        hotspots (pd.DataFrame): detect_hotspots rows for one map.
+        map_name (str): Map name.
+        title (str): Figure title.
+
+    Returns:
+        matplotlib.figure.Figure: The hotspot figure.
+    """
+    fig, ax = plot(map_name)
+    side_colors = {"CT": "deepskyblue", "TERRORIST": "orange"}
+    for side, side_hotspots in hotspots.groupby("side"):
+        x = [game_to_pixel_axis(map_name, value, "x") for value in side_hotspots["X"]]
+        y = [game_to_pixel_axis(map_name, value, "y") for value in side_hotspots["Y"]]
+        ax.scatter(x, y, s=40 + 400 * side_hotspots["share"], c=side_colors.get(side, "white"),
+                   alpha=0.8, edgecolors="black", label=side)
+        for px, py, rank in zip(x, y, side_hotspots["hotspot"]):
+            ax.annotate(str(rank), (px, py), ha="center", va="center", fontsize=8)
+    ax.legend(loc="upper right")
+    ax.set_title(title, fontsize=16, pad=20)
+    return fig
+
+
+def generate_map_visuals(parsed_matches, selected_map, show_option, area=None, points=None, position_index=None, side=None):
+    """
+    Generate heatmaps for kills or deaths for a specific map.
+
+    Parameters:
+        parsed_matches (dict): Parsed match data.
+        selected_map (str): Map name.
+        show_option (str): Either 'kills' or 'deaths'.
+        area (tuple): Optional (x_min, y_min, x_max, y_max) rectangle to restrict the heatmaps to.
+        points (pd.DataFrame): Optional precomputed collect_map_points output.
+        position_index (SpatialGridIndex): Optional precomputed index over points.
+        side (str): Only plot this side, 'CT' or 'TERRORIST' (optional).
+
+    Returns:
+        tuple: Matplotlib figures for Clan 1 and Clan 2.
+    """
+    # Without an area filter the per-demo histograms are summed instead of re-collecting every position
+    map_matches = [
+        match_data for match_data in parsed_matches.values()
+        if (match_data["kills_df"]["map_name"] == selected_map).any()
+    ]
+    if area is None and points is None and map_matches and all("map_histogram" in m for m in map_matches):
+        clan1_grid, clan2_grid, clan1, clan2 = merge_map_histograms(parsed_matches, selected_map, show_option, side)
+        if clan1 is None or not clan1_grid.any() or not clan2_grid.any():
+            raise ValueError(f"No valid data to plot heatmap for {selected_map}.")
+        fig1 = plot_histogram(clan1_grid, selected_map, f"{clan1} Heatmap for {show_option.capitalize()} on {selected_map}")
+        fig2 = plot_histogram(clan2_grid, selected_map, f"{clan2} Heatmap for {show_option.capitalize()} on {selected_map}")
+        return fig1, fig2
+
+    if points is None:
+        points = collect_map_points(parsed_matches, selected_map, show_option)
+
+    if area is not None and len(points):
+        if position_index is None:
+            position_index = build_position_index(points)
+        points = points.iloc[position_index.query_rect(*area)]
+    if side is not None:
+        points = points[points["side"] == side]
+
+    clan1_points = points.loc[points["clan"] == 1, ["X", "Y"]].values.tolist()
+    clan2_points = points.loc[points["clan"] == 2, ["X", "Y"]].values.tolist()
 
     # Ensure points are valid
     if not clan1_points or not clan2_points:
         raise ValueError(f"No valid data to plot heatmap for {selected_map}.")
 
-    # Function to format ticks as integers
-    def integer_formatter(x, _):
-        return f"{int(x)}" if x.is_integer() else ""
+    clan1 = points.loc[points["clan"] == 1, "clan_name"].iloc[0]
+    clan2 = points.loc[points["clan"] == 2, "clan_name"].iloc[0]
 
     # Generate heatmaps with color bar and proper tick range
     def create_heatmap(points, map_name, title):
@@ -87,23 +357,7 @@ def generate_map_visuals(parsed_matches, selected_map, show_option):
         if fig is None or ax is None:
             raise ValueError(f"Heatmap function failed for map: {map_name}")
 
-        # Add title
-        ax.set_title(title, fontsize=16, pad=20)
-
-        # Adjust the color bar
-        fig.subplots_adjust(right=0.9)  # Space for legend
-        cbar = fig.colorbar(ax.collections[0], ax=ax, orientation='vertical', fraction=0.02, pad=0.03)
-
-        # Set clean integer tick labels with proper positions
-        cbar.locator = MaxNLocator(integer=True)
-        cbar.formatter = FuncFormatter(integer_formatter)
-        cbar.update_ticks()
-
-        # Customize color bar ticks
-        cbar.ax.yaxis.set_tick_params(color='white')
-        plt.setp(cbar.ax.get_yticklabels(), color='white', fontsize=10)
-
-        return fig
+        return _finish_heatmap(fig, ax, ax.collections[0], title)
 
     # Create heatmaps for both clans
     fig1 = create_heatmap(clan1_points, selected_map, f"{clan1} Heatmap for {show_option.capitalize()} on {selected_map}")
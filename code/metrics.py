@@ -0,0 +1,268 @@
+import bisect
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Set to a port to have the Streamlit app serve its metrics at http://127.0.0.1:<port>/metrics
+METRICS_PORT_ENV = "EALYTICS_METRICS_PORT"
+
+# Histogram buckets: seconds for quick renders and lookups, seconds for whole parse stages, and row counts
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PARSE_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0, 160.0)
+ROW_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Registry:
+    """The metrics of one process, rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        """
+        All metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: One HELP and TYPE header per metric followed by its samples.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, help, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric '{self.name}' takes labels {list(self.labelnames)}, got {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    """A monotonically increasing count per label set."""
+
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}_total", list(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    """
+    Observations counted into cumulative buckets per label set, plus their sum and count.
+
+    Percentiles are computed by the scraper, e.g. histogram_quantile(0.95, rate(<name>_bucket[5m])).
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS, registry=REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames, registry)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the seconds spent in a with block, also when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        with self._lock:
+            counts, _ = self._values.get(self._key(labels), ([0], 0.0))
+            return sum(counts)
+
+    def samples(self):
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in values:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", labels + [("le", _format_value(float(bound)))], cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class _ProcessMemory:
+    """Peak resident memory of the process, read at scrape time; every Streamlit session shares it."""
+
+    name = "process_max_resident_memory_bytes"
+    help = "Peak resident memory of the process in bytes."
+    type = "gauge"
+
+    def samples(self):
+        if resource is None:
+            return
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        yield self.name, [], peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+REGISTRY.register(_ProcessMemory())
+
+# Ingest
+PARSE_STAGE_SECONDS = Histogram(
+    "ealytics_parse_stage_seconds", "Time spent in each ingest pipeline stage, cached stages included.",
+    ["stage", "cached"], buckets=PARSE_BUCKETS,
+)
+DEMO_PARSE_SECONDS = Histogram(
+    "ealytics_demo_parse_seconds", "Time from a parse job starting to it finishing.", ["status"], buckets=PARSE_BUCKETS,
+)
+EVENT_TABLE_ROWS = Histogram(
+    "ealytics_event_table_rows", "Rows per parsed game event table.", ["table"], buckets=ROW_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "ealytics_cache_requests", "Cache lookups by cache and result (hit or miss).", ["cache", "result"],
+)
+
+# Dashboard
+RENDER_SECONDS = Histogram("ealytics_render_seconds", "Time spent building a dashboard visual.", ["function"])
+RERUN_SECONDS = Histogram("ealytics_rerun_seconds", "Time of one Streamlit script run.")
+
+
+def render():
+    """The process's metrics in the Prometheus text format."""
+    return REGISTRY.render()
+
+
+def write_metrics(path, registry=REGISTRY):
+    """
+    Dump the metrics to a file for the node exporter's textfile collector, or to inspect by hand.
+
+    Parameters:
+        path (str): File to write, replaced atomically.
+        registry (Registry): Metrics to write.
+
+    Returns:
+        str: The path.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", dir=folder, suffix=".tmp", delete=False, encoding="utf-8") as tmp:
+        tmp.write(registry.render())
+    os.replace(tmp.name, path)
+    return path
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Answers GET /metrics with the registry of the server."""
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the Streamlit log
+
+
+_metrics_server = None
+_metrics_server_lock = threading.Lock()
+
+
+def serve_metrics(port, host="127.0.0.1", registry=REGISTRY):
+    """
+    Serve /metrics from a daemon thread, once per process; later calls return the running server.
+
+    Parameters:
+        port (int): Port to bind, 0 picks a free one.
+        host (str): Interface to bind.
+        registry (Registry): Metrics to serve.
+
+    Returns:
+        ThreadingHTTPServer: The server.
+    """
+    global _metrics_server
+    with _metrics_server_lock:
+        if _metrics_server is None:
+            server = ThreadingHTTPServer((host, port), MetricsHandler)
+            server.daemon_threads = True
+            server.registry = registry
+            threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+            _metrics_server = server
+        return _metrics_server
@@ -0,0 +1,235 @@
+import os
+import pickle
+import shutil
+import tempfile
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+
+PARSE_CACHE_DIR = os.path.join("cache", "parsed")
+
+# Bump when the parsed data layout changes so stale entries are parsed again
+PARSE_CACHE_VERSION = 3
+
+
+# A DataFrame stored as its own Arrow IPC file is left in the entry as {ARROW_TABLE_KEY: file name}
+ARROW_TABLE_KEY = "__arrow_table__"
+
+# Each write puts its tables in a new folder named GENERATION_PREFIX + a random suffix; the newest
+# KEEP_GENERATIONS folders are kept so readers of the entry just replaced can still open its tables
+GENERATION_PREFIX = "g-"
+KEEP_GENERATIONS = 2
+
+# A value already stored by a pipeline stage is left in a parsed entry as {STAGE_OUTPUT_KEY: stage name}
+STAGE_OUTPUT_KEY = "__stage_output__"
+
+
+def cache_path(demo_id, cache_dir=PARSE_CACHE_DIR):
+    """
+    Path of a demo's parsed data in the cache.
+
+    Parameters:
+        demo_id (str): Content-hash demo ID from demo_fingerprint.
+        cache_dir (str): Cache folder.
+
+    Returns:
+        str: Path of the pickle file.
+    """
+    return os.path.join(cache_dir, f"{demo_id}.pkl")
+
+
+def tables_dir(demo_id, cache_dir=PARSE_CACHE_DIR):
+    """Folder holding a demo's Arrow table files."""
+    return os.path.join(cache_dir, demo_id)
+
+
+def _write_arrow(dataframe, path):
+    """Write a DataFrame as an uncompressed Arrow IPC file, so readers can memory-map it."""
+    table = pa.Table.from_pandas(dataframe)
+    folder = os.path.dirname(path)
+    with tempfile.NamedTemporaryFile("wb", dir=folder, suffix=".tmp", delete=False) as tmp:
+        with pa.ipc.new_file(tmp, table.schema) as writer:
+            writer.write_table(table)
+    # Readers that mapped the old file keep it until they let go
+    os.replace(tmp.name, path)
+
+
+def _read_arrow(path):
+    """
+    Memory-map an Arrow IPC file as a DataFrame.
+
+    Numeric columns without nulls are read-only views of the mapped file, nothing is copied or deserialized.
+    """
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def _store_tables(value, folder, prefix):
+    """Replace the DataFrames of a parsed-data value, also inside dicts, with Arrow table references."""
+    if isinstance(value, pd.DataFrame):
+        file_name = f"{prefix}.arrow"
+        try:
+            _write_arrow(value, os.path.join(folder, file_name))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            return value  # Mixed-type object columns stay pickled in the entry
+        return {ARROW_TABLE_KEY: file_name}
+    if isinstance(value, dict):
+        return {key: _store_tables(item, folder, f"{prefix}.{key}") for key, item in value.items()}
+    return value
+
+
+def _load_tables(value, folder):
+    """Inverse of _store_tables."""
+    if isinstance(value, dict) and ARROW_TABLE_KEY in value:
+        return _read_arrow(os.path.join(folder, value[ARROW_TABLE_KEY]))
+    if isinstance(value, dict):
+        return {key: _load_tables(item, folder) for key, item in value.items()}
+    return value
+
+
+def _remove_old_generations(folder, current):
+    """Delete table folders of older writes, keeping current and the newest others up to KEEP_GENERATIONS."""
+    generations = [entry for entry in os.listdir(folder) if entry.startswith(GENERATION_PREFIX) and entry != current]
+    generations.sort(key=lambda entry: os.stat(os.path.join(folder, entry)).st_mtime_ns, reverse=True)
+    for entry in generations[KEEP_GENERATIONS - 1:]:
+        shutil.rmtree(os.path.join(folder, entry), ignore_errors=True)
+
+
+def _write_entry(path, folder, values, extra):
+    """
+    Write a cache entry: tables of values as Arrow files in a new generation folder under folder,
+    the rest pickled into path, last. Tables of earlier entries are never overwritten in place.
+    """
+    generation = f"{GENERATION_PREFIX}{uuid.uuid4().hex}"
+    generation_folder = os.path.join(folder, generation)
+    os.makedirs(generation_folder)
+    data = {key: _store_tables(value, generation_folder, key) for key, value in values.items()}
+    entry = {"version": PARSE_CACHE_VERSION, **extra, "generation": generation, "data": data}
+    with tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(path), suffix=".tmp", delete=False) as tmp:
+        pickle.dump(entry, tmp, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp.name, path)
+    _remove_old_generations(folder, generation)
+    return path
+
+
+def _read_entry(path, folder):
+    """Read a cache entry written by _write_entry; None when missing, stale or incomplete."""
+    # A second attempt reads the newer entry when a concurrent write removed this one's tables
+    for _ in range(2):
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if entry.get("version") != PARSE_CACHE_VERSION:
+            return None
+        try:
+            return {**entry, "data": _load_tables(entry["data"], os.path.join(folder, entry["generation"]))}
+        except (OSError, pa.ArrowInvalid):
+            continue
+    return None  # A table file went missing
+
+
+def save_parsed(demo_id, parsed_data, cache_dir=PARSE_CACHE_DIR, stages=None):
+    """
+    Store a demo's parsed data, replacing any older entry atomically.
+
+    Every DataFrame is written as an Arrow IPC file under tables_dir and memory-mapped on load,
+    so handing a large demo to another session or process costs no deserialization. Everything
+    else (header, histograms, ...) is pickled into the entry file, which is written last. Each write
+    puts its tables in a folder of their own, so readers in other threads or processes see either
+    the old entry with its tables or the new one, never a partial write.
+
+    Values a pipeline stage already stored are only referenced, so a parsed demo's tables exist once on disk.
+
+    Parameters:
+        demo_id (str): Content-hash demo ID.
+        parsed_data (dict): parse_demo_in_stages output, plus 'file_name'.
+        cache_dir (str): Cache folder.
+        stages (dict): Name -> stage whose stored outputs (save_stage) hold that value (optional).
+
+    Returns:
+        str: Path of the written entry file.
+    """
+    stages = stages or {}
+    values = {key: {STAGE_OUTPUT_KEY: stages[key]} if key in stages else value for key, value in parsed_data.items()}
+    return _write_entry(cache_path(demo_id, cache_dir), tables_dir(demo_id, cache_dir), values, {"demo_id": demo_id})
+
+
+def load_parsed(demo_id, cache_dir=PARSE_CACHE_DIR):
+    """
+    Load a demo's parsed data from the cache, memory-mapping its tables.
+
+    Parameters:
+        demo_id (str): Content-hash demo ID.
+        cache_dir (str): Cache folder.
+
+    Returns:
+        dict: The parsed data, or None when the demo is not cached, was cached by an older layout
+        or lost a table file or stage output.
+    """
+    entry = _read_entry(cache_path(demo_id, cache_dir), tables_dir(demo_id, cache_dir))
+    if entry is None:
+        return None
+
+    parsed_data, stage_outputs = entry["data"], {}
+    for key, value in parsed_data.items():
+        if not (isinstance(value, dict) and STAGE_OUTPUT_KEY in value):
+            continue
+        stage = value[STAGE_OUTPUT_KEY]
+        if stage not in stage_outputs:
+            stored = load_stage(demo_id, stage, cache_dir)
+            stage_outputs[stage] = stored["data"] if stored is not None else {}
+        if key not in stage_outputs[stage]:
+            return None
+        parsed_data[key] = stage_outputs[stage][key]
+    return parsed_data
+
+
+def stages_dir(demo_id, cache_dir=PARSE_CACHE_DIR):
+    """Folder holding a demo's pipeline stage outputs."""
+    return os.path.join(tables_dir(demo_id, cache_dir), "stages")
+
+
+def save_stage(demo_id, stage, key, outputs, fingerprints, cache_dir=PARSE_CACHE_DIR):
+    """
+    Store the outputs of one ingest pipeline stage for a demo.
+
+    Parameters:
+        demo_id (str): Content-hash demo ID.
+        stage (str): Stage name.
+        key (str): Fingerprint of the stage's code version and inputs the outputs were computed from.
+        outputs (dict): Output name -> value.
+        fingerprints (dict): Output name -> content fingerprint.
+        cache_dir (str): Cache folder.
+    """
+    folder = os.path.join(stages_dir(demo_id, cache_dir), stage)
+    _write_entry(folder + ".pkl", folder, outputs, {"key": key, "fingerprints": fingerprints})
+
+
+def load_stage(demo_id, stage, cache_dir=PARSE_CACHE_DIR):
+    """
+    Load one stage's stored outputs for a demo.
+
+    Returns:
+        dict: 'key', 'fingerprints' and 'data' (the outputs), or None when the stage was never stored.
+    """
+    folder = os.path.join(stages_dir(demo_id, cache_dir), stage)
+    return _read_entry(folder + ".pkl", folder)
+
+
+def cached_demo_ids(cache_dir=PARSE_CACHE_DIR):
+    """
+    Demo IDs with parsed data in the cache.
+
+    Parameters:
+        cache_dir (str): Cache folder.
+
+    Returns:
+        list: Sorted demo IDs.
+    """
+    if not os.path.isdir(cache_dir):
+        return []
+    return sorted(entry[:-len(".pkl")] for entry in os.listdir(cache_dir) if entry.endswith(".pkl"))
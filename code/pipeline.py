@@ -0,0 +1,147 @@
+import hashlib
+import pickle
+
+import pandas as pd
+
+from parse_cache import PARSE_CACHE_DIR, load_stage, save_stage
+
+
+class Stage:
+    """
+    One named step of a pipeline: run(**inputs) returns a dict with every name in outputs.
+
+    Bump version when the stage's code changes so stored outputs are recomputed.
+    """
+
+    def __init__(self, name, inputs, outputs, run, version=1):
+        self.name = name
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.run = run
+        self.version = version
+
+
+def fingerprint(value):
+    """
+    Content fingerprint of a stage input or output.
+
+    DataFrames are hashed row by row with pandas, everything else through its pickle.
+
+    Parameters:
+        value: Any picklable value.
+
+    Returns:
+        str: 32 character hex digest, equal for equal content.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr([(str(column), str(dtype)) for column, dtype in value.dtypes.items()]).encode("utf-8"))
+        try:
+            digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        except TypeError:
+            digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))  # Unhashable cells, e.g. lists
+    elif isinstance(value, dict):
+        for key in sorted(value, key=str):
+            digest.update(f"{key}={fingerprint(value[key])};".encode("utf-8"))
+    elif value is None or isinstance(value, (str, int, float, bool)):
+        digest.update(repr(value).encode("utf-8"))
+    else:
+        digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+class StageStore:
+    """Stored stage outputs of one demo in the parse cache."""
+
+    def __init__(self, demo_id, cache_dir=PARSE_CACHE_DIR):
+        self.demo_id = demo_id
+        self.cache_dir = cache_dir
+
+    def load(self, stage):
+        return load_stage(self.demo_id, stage, self.cache_dir)
+
+    def save(self, stage, key, outputs, fingerprints):
+        save_stage(self.demo_id, stage, key, outputs, fingerprints, self.cache_dir)
+
+
+class Pipeline:
+    """
+    A small DAG of stages, run like make: a stage runs only when its key changes.
+
+    A stage's key hashes its name, version and the content fingerprints of its inputs. Stored outputs
+    whose key matches are reused; otherwise the stage runs and its outputs are fingerprinted by content,
+    so when a re-run produces the same outputs the stages after it stay cached.
+    """
+
+    def __init__(self, stages):
+        produced = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in produced:
+                    raise ValueError(f"Output '{output}' is produced by both '{produced[output]}' and '{stage.name}'")
+                produced[output] = stage.name
+        self.sources = sorted({name for stage in stages for name in stage.inputs} - set(produced))
+
+        # Topological order: repeatedly take the first declared stage whose inputs are all available
+        ordered, available, pending = [], set(self.sources), list(stages)
+        while pending:
+            ready = next((stage for stage in pending if set(stage.inputs) <= available), None)
+            if ready is None:
+                raise ValueError(f"Stages {[stage.name for stage in pending]} form a cycle")
+            ordered.append(ready)
+            available.update(ready.outputs)
+            pending.remove(ready)
+        self.stages = ordered
+
+    def stage_key(self, stage, fingerprints):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{stage.name}:{stage.version}".encode("utf-8"))
+        for name in stage.inputs:
+            digest.update(f"{name}={fingerprints[name]};".encode("utf-8"))
+        return digest.hexdigest()
+
+    def run(self, sources, store=None, source_fingerprints=None, before_stage=None, after_stage=None):
+        """
+        Run every stage whose key changed, reusing stored outputs for the rest.
+
+        Parameters:
+            sources (dict): Value of every name in self.sources.
+            store (StageStore): Where stage outputs are loaded from and saved to; without it every stage runs (optional).
+            source_fingerprints (dict): Known fingerprints of sources, e.g. a demo's content hash for its path (optional).
+            before_stage (callable): Called as before_stage(stage_name) before each stage; may raise to stop (optional).
+            after_stage (callable): Called as after_stage(stage_name, ran) after each stage (optional).
+
+        Returns:
+            tuple: (dict of every source and output, list of the stage names that ran).
+        """
+        missing = [name for name in self.sources if name not in sources]
+        if missing:
+            raise ValueError(f"Missing pipeline sources {missing}")
+
+        values = dict(sources)
+        fingerprints = {name: fingerprint(value) for name, value in sources.items()}
+        fingerprints.update(source_fingerprints or {})
+        ran = []
+
+        for stage in self.stages:
+            if before_stage is not None:
+                before_stage(stage.name)
+            key = self.stage_key(stage, fingerprints)
+            stored = store.load(stage.name) if store is not None else None
+
+            if stored is not None and stored["key"] == key and set(stage.outputs) <= set(stored["data"]):
+                outputs, output_fingerprints = stored["data"], stored["fingerprints"]
+            else:
+                outputs = stage.run(**{name: values[name] for name in stage.inputs})
+                output_fingerprints = {name: fingerprint(outputs[name]) for name in stage.outputs}
+                if store is not None:
+                    store.save(stage.name, key, {name: outputs[name] for name in stage.outputs}, output_fingerprints)
+                ran.append(stage.name)
+
+            for name in stage.outputs:
+                values[name] = outputs[name]
+                fingerprints[name] = output_fingerprints[name]
+            if after_stage is not None:
+                after_stage(stage.name, stage.name in ran)
+
+        return values, ran
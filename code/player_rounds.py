@@ -0,0 +1,308 @@
+import numpy as np
+import pandas as pd
+
+from trades import TRADE_SECONDS, detect_trades
+from duels import PISTOL_ROUNDS, SIDES, opening_duels, detect_clutches
+from utility import utility_kill_credits
+
+# Rating 2.0 / Impact coefficients (same values awpy.stats uses)
+IMPACT_KILLS_COEF = 2.13
+IMPACT_ASSISTS_COEF = 0.42
+IMPACT_INTERCEPT = -0.41
+RATING_KAST_COEF = 0.0073
+RATING_KILLS_COEF = 0.3591
+RATING_DEATHS_COEF = -0.5329
+RATING_IMPACT_COEF = 0.2372
+RATING_ADR_COEF = 0.0032
+RATING_INTERCEPT = 0.1587
+
+FACT_KEYS = ["player_name", "steamid", "clan_name", "team_name", "round"]
+FACT_COUNTS = [
+    "kills", "assists", "deaths", "damage", "trade_kills",
+    "opening_kills", "opening_deaths", "clutch_attempts", "clutch_wins",
+    "smoke_impact_kills", "fire_impact_kills",
+]
+
+COMBINED_STATS_COLUMNS = [
+    "player_name", "team_name", "clan_name", "kills", "assists", "deaths",
+    "n_rounds", "kast_percentage", "total_damage",
+    "average_damage_per_round", "impact", "rating_2.0", "trade_kills", "traded_deaths",
+    "opening_kills", "opening_deaths", "clutch_attempts", "clutch_wins",
+    "smoke_impact_kills", "fire_impact_kills",
+]
+
+
+def _player_lookup(frames):
+    """
+    Build the player table (name, steamid, clan) that the integer player codes index into.
+
+    Parameters:
+        frames (list): (DataFrame, column prefix) pairs to collect players from.
+
+    Returns:
+        pd.DataFrame: One row per player name with 'player_name', 'steamid' and 'clan_name'.
+    """
+    players = []
+    for df, prefix in frames:
+        columns = {
+            f"{prefix}_name": "player_name",
+            f"{prefix}_steamid": "steamid",
+            f"{prefix}_team_clan_name": "clan_name",
+        }
+        if prefix == "":
+            columns = {"name": "player_name", "steamid": "steamid", "team_clan_name": "clan_name"}
+        available = {src: dst for src, dst in columns.items() if src in df.columns}
+        if "player_name" not in available.values():
+            continue
+        rows = df[list(available)].rename(columns=available).dropna(subset=["player_name"])
+        players.append(rows.drop_duplicates(subset="player_name"))
+
+    players = pd.concat(players, ignore_index=True) if players else pd.DataFrame(columns=["player_name"])
+    players = players.drop_duplicates(subset="player_name").reset_index(drop=True)
+    return players.reindex(columns=["player_name", "steamid", "clan_name"])
+
+
+def _encode_role(df, name_col, side_col, players, weights=None):
+    """
+    Encode one role of an event table as integer (player, side, round) codes.
+
+    Parameters:
+        df (pd.DataFrame): Event table with a 'round' column.
+        name_col (str): Column holding the player name for the role.
+        side_col (str): Column holding the player's side ('CT' / 'TERRORIST').
+        players (pd.Index): Player names indexed by player code.
+        weights (np.ndarray): Per-row value to sum (optional, defaults to 1 per row).
+
+    Returns:
+        tuple: (player codes, side codes, rounds, weights) for the rows with a known player and side.
+    """
+    if df.empty or name_col not in df.columns or side_col not in df.columns:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty, empty
+
+    codes = players.get_indexer(df[name_col])
+    sides = pd.Index(SIDES).get_indexer(df[side_col])
+    rounds = pd.to_numeric(df["round"], errors="coerce").to_numpy(dtype=float)
+    if weights is None:
+        weights = np.ones(len(df), dtype=np.int64)
+
+    valid = (codes >= 0) & (sides >= 0) & ~np.isnan(rounds)
+    return codes[valid], sides[valid], rounds[valid].astype(np.int64), np.asarray(weights)[valid]
+
+
+def round_roster(ticks_df):
+    """
+    One row per player, side and round of a ticks table, so the roster costs one pass over the ticks.
+
+    Parameters:
+        ticks_df (pd.DataFrame): Ticks DataFrame with 'name', 'team_name' and 'round' (optional).
+
+    Returns:
+        pd.DataFrame: The distinct (name, team_name, round) rows with 'steamid' and 'team_clan_name' when present.
+    """
+    keys = ["name", "team_name", "round"]
+    if ticks_df is None or ticks_df.empty or not set(keys) <= set(ticks_df.columns):
+        return pd.DataFrame(columns=keys)
+    columns = keys + [column for column in ["steamid", "team_clan_name"] if column in ticks_df.columns]
+    return ticks_df[columns].drop_duplicates(subset=keys).reset_index(drop=True)
+
+
+def mark_traded_deaths(kills_df, tickrate=64, trade_seconds=TRADE_SECONDS):
+    """
+    Flag deaths that were traded, i.e. the killer died in the same round within the trade window.
+
+    Parameters:
+        kills_df (pd.DataFrame): Kills DataFrame with 'tick', 'round', 'attacker_name' and 'victim_name'.
+        tickrate (int): Server tick rate used to convert the window to ticks.
+        trade_seconds (float): Length of the trade window in seconds.
+
+    Returns:
+        pd.Series: Boolean Series aligned with kills_df, True where the victim was traded.
+    """
+    return detect_trades(kills_df, tickrate, trade_seconds)["is_traded"].astype(bool)
+
+
+def build_player_round_facts(kills_df, damages_df=None, ticks_df=None, tickrate=64, trade_seconds=TRADE_SECONDS,
+                             rounds_df=None, utility_pairs=None):
+    """
+    Build the per-(player, round, side) fact table that KAST, ADR, Impact and Rating 2.0 are derived from.
+
+    Parameters:
+        kills_df (pd.DataFrame): Kills DataFrame from the parsed demo.
+        damages_df (pd.DataFrame): Damages DataFrame from the parsed demo (optional).
+        ticks_df (pd.DataFrame): Ticks DataFrame, or its round_roster, used to find every player in a round (optional).
+            Without it the roster is built from players that appear in kills and damages.
+        tickrate (int): Server tick rate, used for the trade window.
+        trade_seconds (float): Trade window in seconds for the 'T' in KAST and trade kills.
+        rounds_df (pd.DataFrame): The demo's rounds table, its winners decide clutches (optional).
+        utility_pairs (pd.DataFrame): utility.utility_at_kills output for kills_df, credits throwers
+            with enemy deaths near their active smokes and fires (optional).
+
+    Returns:
+        pd.DataFrame: One row per player per round with kills, assists, deaths, damage, trade_kills,
+        opening_kills, opening_deaths, clutch_attempts, clutch_wins, smoke_impact_kills,
+        fire_impact_kills, survived, traded and kast columns.
+    """
+    damages_df = damages_df if damages_df is not None else pd.DataFrame()
+    roster = round_roster(ticks_df)
+
+    players = _player_lookup(
+        [(kills_df, "attacker"), (kills_df, "victim"), (kills_df, "assister"), (damages_df, "attacker"), (roster, "")]
+    )
+    names = pd.Index(players["player_name"])
+
+    # Reuse the trade columns when the kills were already run through detect_trades
+    trades = kills_df if "is_traded" in kills_df.columns else detect_trades(kills_df, tickrate, trade_seconds)
+    traded = trades["is_traded"].to_numpy(dtype=bool)
+    trade_kills = trades["trade_of"].notna().to_numpy()
+    openings = opening_duels(kills_df)
+    clutches = detect_clutches(kills_df, rounds_df, roster.rename(columns={"name": "player_name"}))
+    credits = utility_kill_credits(kills_df, utility_pairs) if utility_pairs is not None and len(utility_pairs) else pd.DataFrame()
+    credit_kinds = credits["kind"] if not credits.empty else pd.Series(dtype=object)
+    damage_col = "dmg_health_real" if "dmg_health_real" in damages_df.columns else "dmg_health"
+
+    # Every metric is one role of one event table, encoded to integer codes
+    roles = {
+        "kills": _encode_role(kills_df, "attacker_name", "attacker_team_name", names),
+        "assists": _encode_role(kills_df, "assister_name", "assister_team_name", names),
+        "deaths": _encode_role(kills_df, "victim_name", "victim_team_name", names),
+        "traded": _encode_role(kills_df, "victim_name", "victim_team_name", names, weights=traded.astype(np.int64)),
+        "trade_kills": _encode_role(kills_df, "attacker_name", "attacker_team_name", names,
+                                    weights=trade_kills.astype(np.int64)),
+        "opening_kills": _encode_role(openings, "attacker_name", "attacker_team_name", names),
+        "opening_deaths": _encode_role(openings, "victim_name", "victim_team_name", names),
+        "clutch_attempts": _encode_role(clutches, "player_name", "team_name", names),
+        "clutch_wins": _encode_role(clutches, "player_name", "team_name", names,
+                                    weights=clutches["won"].to_numpy(dtype=np.int64)),
+        "smoke_impact_kills": _encode_role(credits[credit_kinds == "smoke"], "thrower_name", "thrower_team_name", names),
+        "fire_impact_kills": _encode_role(credits[credit_kinds == "inferno"], "thrower_name", "thrower_team_name", names),
+        "damage": _encode_role(
+            damages_df, "attacker_name", "attacker_team_name", names,
+            weights=damages_df[damage_col].fillna(0).to_numpy() if damage_col in damages_df.columns else None,
+        ),
+        "roster": _encode_role(roster, "name", "team_name", names, weights=np.zeros(len(roster), dtype=np.int64)),
+    }
+
+    # One (player, side, round) key per event, then a single unique + bincount pass for all metrics
+    n_round_slots = int(max([r.max() for _, _, r, _ in roles.values() if len(r)], default=0)) + 1
+    keys = {metric: (codes * len(SIDES) + sides) * n_round_slots + rounds for metric, (codes, sides, rounds, _) in roles.items()}
+    unique_keys, inverse = np.unique(np.concatenate(list(keys.values())), return_inverse=True)
+
+    facts = pd.DataFrame({
+        "player_code": unique_keys // n_round_slots // len(SIDES),
+        "team_name": np.array(SIDES)[(unique_keys // n_round_slots) % len(SIDES)],
+        "round": (unique_keys % n_round_slots).astype(int),
+    })
+    offset = 0
+    for metric, (codes, _, _, weights) in roles.items():
+        segment = inverse[offset:offset + len(codes)]
+        offset += len(codes)
+        if metric != "roster":
+            facts[metric] = np.bincount(segment, weights=weights, minlength=len(unique_keys)).astype(int)
+
+    player_info = players.iloc[facts["player_code"].to_numpy()].reset_index(drop=True)
+    facts = pd.concat([player_info, facts.drop(columns="player_code")], axis=1)
+
+    facts["survived"] = facts["deaths"] == 0
+    facts["traded"] = facts["traded"] > 0
+    facts["kast"] = (facts["kills"] > 0) | (facts["assists"] > 0) | facts["survived"] | facts["traded"]
+
+    columns = FACT_KEYS + FACT_COUNTS + ["traded", "survived", "kast"]
+    return facts[columns].sort_values(["round", "team_name", "player_name"]).reset_index(drop=True)
+
+
+def filter_player_rounds(facts, round_range=None, pistol_only=False, map_names=None):
+    """
+    Slice the fact table to a subset of rounds and maps.
+
+    Parameters:
+        facts (pd.DataFrame): Fact table from build_player_round_facts.
+        round_range (tuple): Inclusive (first, last) round numbers to keep (optional).
+        pistol_only (bool): Keep only pistol rounds.
+        map_names (list): Map names to keep, requires a 'map_name' column (optional).
+
+    Returns:
+        pd.DataFrame: The filtered fact table.
+    """
+    mask = np.ones(len(facts), dtype=bool)
+    if round_range is not None:
+        mask &= facts["round"].between(round_range[0], round_range[1]).to_numpy()
+    if pistol_only:
+        mask &= facts["round"].isin(PISTOL_ROUNDS).to_numpy()
+    if map_names and "map_name" in facts.columns:
+        mask &= facts["map_name"].isin(map_names).to_numpy()
+    return facts[mask]
+
+
+def aggregate_player_stats(facts):
+    """
+    Aggregate a (possibly filtered) fact table into per-player stats for each side and 'Both'.
+
+    Parameters:
+        facts (pd.DataFrame): Fact table from build_player_round_facts.
+
+    Returns:
+        pd.DataFrame: Player stats with kills, assists, deaths, KAST, ADR, Impact and Rating 2.0.
+    """
+    keys = ["player_name", "clan_name"]
+    agg = {
+        "kills": ("kills", "sum"),
+        "assists": ("assists", "sum"),
+        "deaths": ("deaths", "sum"),
+        "kast_rounds": ("kast", "sum"),
+        "n_rounds": ("round", "count"),
+        "total_damage": ("damage", "sum"),
+        "trade_kills": ("trade_kills", "sum"),
+        "traded_deaths": ("traded", "sum"),
+        "opening_kills": ("opening_kills", "sum"),
+        "opening_deaths": ("opening_deaths", "sum"),
+        "clutch_attempts": ("clutch_attempts", "sum"),
+        "clutch_wins": ("clutch_wins", "sum"),
+        "smoke_impact_kills": ("smoke_impact_kills", "sum"),
+        "fire_impact_kills": ("fire_impact_kills", "sum"),
+    }
+    per_side = facts.groupby(keys + ["team_name"]).agg(**agg).reset_index()
+    both = facts.groupby(keys).agg(**agg).reset_index().assign(team_name="Both")
+    stats = pd.concat([per_side, both], ignore_index=True)
+
+    n_rounds = stats["n_rounds"].where(stats["n_rounds"] > 0)
+    kpr = stats["kills"] / n_rounds
+    apr = stats["assists"] / n_rounds
+    dpr = stats["deaths"] / n_rounds
+
+    stats["traded_deaths"] = stats["traded_deaths"].astype(int)
+    stats["kast_percentage"] = stats["kast_rounds"] * 100 / n_rounds
+    stats["average_damage_per_round"] = stats["total_damage"] / n_rounds
+    stats["impact"] = IMPACT_KILLS_COEF * kpr + IMPACT_ASSISTS_COEF * apr + IMPACT_INTERCEPT
+    stats["rating_2.0"] = (
+        RATING_KAST_COEF * stats["kast_percentage"]
+        + RATING_KILLS_COEF * kpr
+        + RATING_DEATHS_COEF * dpr
+        + RATING_IMPACT_COEF * stats["impact"]
+        + RATING_ADR_COEF * stats["average_damage_per_round"]
+        + RATING_INTERCEPT
+    )
+
+    stats = stats.fillna(0)[COMBINED_STATS_COLUMNS]
+    return stats.sort_values(by=["team_name", "player_name"]).reset_index(drop=True)
+
+
+def compute_combined_stats(kills_df, damages_df=None, ticks_df=None, tickrate=64, rounds_df=None, utility_pairs=None):
+    """
+    Compute the 'combined_stats' table for a demo in a single grouped pass over kills and damages.
+
+    Parameters:
+        kills_df (pd.DataFrame): Kills DataFrame from the parsed demo.
+        damages_df (pd.DataFrame): Damages DataFrame from the parsed demo (optional).
+        ticks_df (pd.DataFrame): Ticks DataFrame, or its round_roster, for the per-round roster (optional).
+        tickrate (int): Server tick rate.
+        rounds_df (pd.DataFrame): The demo's rounds table, used for clutch outcomes (optional).
+        utility_pairs (pd.DataFrame): Active smokes and fires near each kill, for utility impact (optional).
+
+    Returns:
+        tuple: ('combined_stats' DataFrame, per-player-per-round fact table).
+    """
+    facts = build_player_round_facts(
+        kills_df, damages_df, ticks_df, tickrate=tickrate, rounds_df=rounds_df, utility_pairs=utility_pairs
+    )
+    return aggregate_player_stats(facts), facts
@@ -0,0 +1,201 @@
+import bisect
+import json
+import os
+import re
+import tempfile
+import threading
+
+import pandas as pd
+
+from demo_index import teams_from_filename
+from parse_cache import PARSE_CACHE_DIR
+
+# One searchable document per parsed demo, stored in the parse cache folder it describes
+SEARCH_DOCUMENTS_NAME = "search_documents.json"
+TOURNAMENT_MATCHES_FILE = os.path.join("cache", "tournament_matches.csv")
+
+# Fields a query can be restricted to, e.g. 'player:m0nesy map:nuke'
+SEARCH_FIELDS = ["player", "steamid", "team", "map", "tournament"]
+
+# Words dropped from team names so 'Team Spirit' and 'Spirit' or 'G2 Esports' and 'G2' are the same team
+TEAM_NAME_FILLERS = {"team", "esports", "esport", "gaming", "club", "clan"}
+
+_documents_lock = threading.Lock()
+
+
+def normalize(text):
+    """Lowercase alphanumeric tokens of a name, e.g. 'Natus Vincere' -> ['natus', 'vincere']."""
+    return re.findall(r"[a-z0-9]+", str(text).lower())
+
+
+def team_key(name):
+    """Key two spellings of the same team share, e.g. 'Team Spirit' -> 'spirit'."""
+    tokens = normalize(name)
+    return "".join(token for token in tokens if token not in TEAM_NAME_FILLERS) or "".join(tokens)
+
+
+def demo_document(demo_id, parsed_data, demo_path=None):
+    """
+    Describe a parsed demo by the names it can be searched for.
+
+    Parameters:
+        demo_id (str): Content-hash demo ID.
+        parsed_data (dict): Parsed data with 'kills_df', 'combined_stats' and 'file_name'.
+        demo_path (str): Path of the demo file, so the search can load it again (optional).
+
+    Returns:
+        dict: 'demo_id', 'file_name', 'demo_path', 'map_name', 'teams', 'players' and 'steamids'.
+    """
+    kills_df = parsed_data.get("kills_df")
+    kills_df = kills_df if kills_df is not None else pd.DataFrame()
+    stats = parsed_data.get("combined_stats")
+    stats = stats if stats is not None else pd.DataFrame()
+    file_name = parsed_data.get("file_name") or demo_id
+
+    def values(frame, columns):
+        found = pd.concat([frame[column] for column in columns if column in frame.columns] or [pd.Series(dtype=object)])
+        return sorted({str(value) for value in found.dropna()})
+
+    teams = values(kills_df, ["attacker_team_clan_name", "victim_team_clan_name"]) + values(stats, ["clan_name"])
+    if not teams:
+        teams = [team for team in teams_from_filename(file_name) if team]
+    map_name = kills_df["map_name"].iloc[0] if "map_name" in kills_df.columns and len(kills_df) else None
+
+    return {
+        "demo_id": demo_id,
+        "file_name": file_name,
+        "demo_path": demo_path,
+        "map_name": map_name,
+        "teams": sorted(set(teams)),
+        "players": sorted(set(values(kills_df, ["attacker_name", "victim_name"]) + values(stats, ["player_name"]))),
+        "steamids": values(kills_df, ["attacker_steamid", "victim_steamid"]),
+    }
+
+
+def load_documents(cache_dir=PARSE_CACHE_DIR):
+    """
+    Read the stored search documents.
+
+    Parameters:
+        cache_dir (str): Parse cache folder.
+
+    Returns:
+        dict: Demo ID -> demo_document, empty when nothing was indexed yet.
+    """
+    try:
+        with open(os.path.join(cache_dir, SEARCH_DOCUMENTS_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_document(document, cache_dir=PARSE_CACHE_DIR):
+    """
+    Add or replace one demo's search document; ingest calls this after every parse.
+
+    Parameters:
+        document (dict): demo_document output.
+        cache_dir (str): Parse cache folder.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    with _documents_lock:
+        documents = load_documents(cache_dir)
+        documents[document["demo_id"]] = document
+        with tempfile.NamedTemporaryFile("w", dir=cache_dir, suffix=".tmp", delete=False, encoding="utf-8") as tmp:
+            json.dump(documents, tmp)
+        os.replace(tmp.name, os.path.join(cache_dir, SEARCH_DOCUMENTS_NAME))
+
+
+def tournaments_by_teams(matches_df):
+    """
+    Tournaments of tournament_matches.csv keyed by the pair of teams that played in them.
+
+    Parameters:
+        matches_df (pd.DataFrame): Matches with 'Tournament', 'Team 1' and 'Team 2'.
+
+    Returns:
+        dict: frozenset of two team_key values -> set of tournament names.
+    """
+    tournaments = {}
+    for tournament, team1, team2 in matches_df[["Tournament", "Team 1", "Team 2"]].itertuples(index=False):
+        tournaments.setdefault(frozenset([team_key(team1), team_key(team2)]), set()).add(tournament)
+    return tournaments
+
+
+class SearchIndex:
+    """
+    Inverted index from name tokens to demo IDs.
+
+    Every token is posted under its field ('player:m0nesy', 'map:nuke', ...) and under 'any:', so a query
+    term matches either one field or all of them. The vocabulary is kept sorted so each term is also a prefix search:
+    two binary searches give the run of tokens starting with it.
+    """
+
+    def __init__(self, documents, matches_df=None):
+        self.documents = documents
+        self.postings = {}
+        tournaments = tournaments_by_teams(matches_df) if matches_df is not None else {}
+        for demo_id, document in documents.items():
+            for field, value in self._fields(document, tournaments):
+                for token in normalize(value):
+                    self.postings.setdefault(f"{field}:{token}", set()).add(demo_id)
+                    self.postings.setdefault(f"any:{token}", set()).add(demo_id)
+        self.vocabulary = sorted(self.postings)
+
+    @staticmethod
+    def _fields(document, tournaments):
+        yield from (("player", player) for player in document.get("players", []))
+        yield from (("steamid", steamid) for steamid in document.get("steamids", []))
+        yield from (("team", team) for team in document.get("teams", []))
+        if document.get("map_name"):
+            yield "map", document["map_name"]  # Tokenized as 'de' and 'nuke'
+        teams = frozenset(team_key(team) for team in document.get("teams", []))
+        for tournament in tournaments.get(teams, []):
+            yield "tournament", tournament
+
+    def _lookup(self, term):
+        """Demo IDs of every token starting with term."""
+        lo = bisect.bisect_left(self.vocabulary, term)
+        hi = bisect.bisect_left(self.vocabulary, term + "\uffff")
+        found = set()
+        for token in self.vocabulary[lo:hi]:
+            found |= self.postings[token]
+        return found
+
+    def search(self, query):
+        """
+        Demos matching every term of a query.
+
+        Parameters:
+            query (str): Space-separated terms, optionally 'field:' prefixed with a SEARCH_FIELDS name,
+                e.g. 'player:m0nesy map:nuke' or 'spirit shanghai'.
+
+        Returns:
+            list: Matching demo IDs, sorted by file name.
+        """
+        matches = None
+        for term in query.split():
+            field, _, value = term.rpartition(":")
+            field = field.lower() if field.lower() in SEARCH_FIELDS else ""
+            tokens = normalize(value if field else term)
+            for token in tokens:
+                found = self._lookup(f"{field or 'any'}:{token}")
+                matches = found if matches is None else matches & found
+        if not matches:
+            return []
+        return sorted(matches, key=lambda demo_id: self.documents[demo_id].get("file_name") or demo_id)
+
+
+def load_search_index(cache_dir=PARSE_CACHE_DIR, matches_file=TOURNAMENT_MATCHES_FILE):
+    """
+    Build the search index over every indexed demo, joined to the tournament match list.
+
+    Parameters:
+        cache_dir (str): Parse cache folder holding the documents written at ingest.
+        matches_file (str): tournament_matches.csv, skipped when missing.
+
+    Returns:
+        SearchIndex: The index.
+    """
+    matches_df = pd.read_csv(matches_file) if os.path.exists(matches_file) else None
+    return SearchIndex(load_documents(cache_dir), matches_df)
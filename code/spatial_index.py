@@ -0,0 +1,141 @@
+import numpy as np
+
+
+class SpatialGridIndex:
+    """
+    Uniform grid over 2D positions for fast rectangle, polygon and nearest-neighbour queries.
+
+    Points are bucketed by grid cell and stored sorted by cell ID. A rectangle query
+    therefore reads one contiguous slice per grid row it covers instead of scanning every point.
+    Query results are row positions into the arrays the index was built from.
+    """
+
+    def __init__(self, x, y, cell_size=128.0):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        rows = np.flatnonzero(~(np.isnan(x) | np.isnan(y)))
+
+        self.cell_size = float(cell_size)
+        self.x_min = x[rows].min() if len(rows) else 0.0
+        self.y_min = y[rows].min() if len(rows) else 0.0
+        self.nx = int((x[rows].max() - self.x_min) // cell_size) + 1 if len(rows) else 1
+        self.ny = int((y[rows].max() - self.y_min) // cell_size) + 1 if len(rows) else 1
+
+        cells = self._cell_ids(x[rows], y[rows])
+        order = np.argsort(cells, kind="stable")
+        self.rows = rows[order]
+        self.x = x[self.rows]
+        self.y = y[self.rows]
+        # starts[c]:starts[c + 1] is the slice of points in cell c
+        self.starts = np.searchsorted(cells[order], np.arange(self.nx * self.ny + 1))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _cell_xy(self, x, y):
+        ix = np.clip(((np.asarray(x) - self.x_min) // self.cell_size).astype(int), 0, self.nx - 1)
+        iy = np.clip(((np.asarray(y) - self.y_min) // self.cell_size).astype(int), 0, self.ny - 1)
+        return ix, iy
+
+    def _cell_ids(self, x, y):
+        ix, iy = self._cell_xy(x, y)
+        return iy * self.nx + ix
+
+    def _candidates(self, x_min, y_min, x_max, y_max):
+        """Positions (into the sorted arrays) of every point in the cells overlapping a rectangle."""
+        (ix0, ix1), (iy0, iy1) = [np.sort(pair) for pair in self._cell_xy([x_min, x_max], [y_min, y_max])]
+        row_starts = np.arange(iy0, iy1 + 1) * self.nx
+        lo = self.starts[row_starts + ix0]
+        hi = self.starts[row_starts + ix1 + 1]
+        if not len(lo):
+            return np.array([], dtype=int)
+        return np.concatenate([np.arange(a, b) for a, b in zip(lo, hi)])
+
+    def query_rect(self, x_min, y_min, x_max, y_max):
+        """
+        Find the points inside a rectangle (edges included).
+
+        Parameters:
+            x_min, y_min, x_max, y_max (float): Rectangle bounds in game units.
+
+        Returns:
+            np.ndarray: Row positions of the matching points, ascending.
+        """
+        if not len(self) or x_max < self.x_min or y_max < self.y_min:
+            return np.array([], dtype=int)
+        candidates = self._candidates(x_min, y_min, x_max, y_max)
+        cx, cy = self.x[candidates], self.y[candidates]
+        inside = (cx >= x_min) & (cx <= x_max) & (cy >= y_min) & (cy <= y_max)
+        return np.sort(self.rows[candidates[inside]])
+
+    def query_polygon(self, vertices):
+        """
+        Find the points inside a polygon using the even-odd rule.
+
+        Parameters:
+            vertices (array-like): (n, 2) polygon vertices in order.
+
+        Returns:
+            np.ndarray: Row positions of the matching points, ascending.
+        """
+        vertices = np.asarray(vertices, dtype=float)
+        if not len(self):
+            return np.array([], dtype=int)
+        candidates = self._candidates(*vertices.min(axis=0), *vertices.max(axis=0))
+        inside = points_in_polygon(self.x[candidates], self.y[candidates], vertices)
+        return np.sort(self.rows[candidates[inside]])
+
+    def nearest(self, x, y, k=1):
+        """
+        Find the k points closest to (x, y), searching outward ring by ring of grid cells.
+
+        Parameters:
+            x, y (float): Query position.
+            k (int): Number of neighbours.
+
+        Returns:
+            tuple: (row positions, distances), nearest first.
+        """
+        k = min(k, len(self))
+        if k == 0:
+            return np.array([], dtype=int), np.array([])
+
+        ix, iy = self._cell_xy(x, y)
+        radius = 0
+        while True:
+            half = (radius + 0.5) * self.cell_size
+            center_x = self.x_min + (ix + 0.5) * self.cell_size
+            center_y = self.y_min + (iy + 0.5) * self.cell_size
+            candidates = self._candidates(center_x - half, center_y - half, center_x + half, center_y + half)
+            if len(candidates) >= k:
+                distances = np.hypot(self.x[candidates] - x, self.y[candidates] - y)
+                best = np.argsort(distances, kind="stable")[:k]
+                # Anything beyond the searched square could still be closer than the kth hit.
+                # A query outside the grid sits outside its (clipped) centre cell, shrinking the margin.
+                outside = max(abs(x - center_x), abs(y - center_y)) - self.cell_size / 2
+                covered = radius * self.cell_size - max(outside, 0.0)
+                if distances[best[-1]] <= covered or len(candidates) == len(self):
+                    return self.rows[candidates[best]], distances[best]
+            radius += 1
+
+
+def points_in_polygon(x, y, vertices):
+    """
+    Vectorized even-odd point-in-polygon test.
+
+    Parameters:
+        x, y (np.ndarray): Point coordinates.
+        vertices (np.ndarray): (n, 2) polygon vertices in order.
+
+    Returns:
+        np.ndarray: Boolean mask, True for points inside the polygon.
+    """
+    x = np.asarray(x, dtype=float)[:, None]
+    y = np.asarray(y, dtype=float)[:, None]
+    x1, y1 = vertices[:, 0], vertices[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+
+    crosses = (y1 > y) != (y2 > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    return np.count_nonzero(crosses & (x < x_cross), axis=1) % 2 == 1
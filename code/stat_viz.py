@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
@@ -11,36 +12,205 @@ def generate_kill_details(group):
         )
     return "<br>".join(details)
 
+HEAD_TO_HEAD_COLUMNS = [
+    "attacker_team_clan_name", "victim_team_clan_name",
+    "attacker_name", "victim_name", "weapon", "dmg_health", "headshot"
+]
+
+
+class HeadToHead:
+    """
+    Sparse head-to-head kill counts on integer player keys.
+
+    Only attacker/victim pairs that actually met are stored, as sorted pair keys with
+    their kill counts, so memory scales with the number of duels rather than players squared.
+    Dense matrices are built for a selected submatrix only, and kill details are
+    formatted on demand for the cells that need them.
+    """
+
+    def __init__(self, kills_df):
+        for col in HEAD_TO_HEAD_COLUMNS:
+            if col not in kills_df.columns:
+                raise ValueError(f"Missing required column: {col} in kills_df")
+
+        # Filter out team kills or self-kills
+        kills = kills_df.loc[
+            kills_df["attacker_team_clan_name"] != kills_df["victim_team_clan_name"], HEAD_TO_HEAD_COLUMNS
+        ]
+        self.clan_names = kills["attacker_team_clan_name"].unique()
+
+        # One integer key per player name, shared by attackers and victims
+        codes, self.players = pd.factorize(pd.concat([kills["attacker_name"], kills["victim_name"]]), sort=True)
+        attacker_codes, victim_codes = codes[:len(kills)], codes[len(kills):]
+        self.n_players = len(self.players)
+
+        # Kills sorted by (attacker, victim) pair, so each pair owns one contiguous slice
+        pair_keys = attacker_codes.astype(np.int64) * self.n_players + victim_codes
+        order = np.argsort(pair_keys, kind="stable")
+        self.kills = kills.iloc[order].reset_index(drop=True)
+        self.pair_keys, self.pair_starts, self.pair_counts = np.unique(
+            pair_keys[order], return_index=True, return_counts=True
+        )
+        self.pair_attackers = self.pair_keys // max(self.n_players, 1)
+        self.pair_victims = self.pair_keys % max(self.n_players, 1)
+
+        # Clan of each pair's attacker, taken from its first kill
+        self.pair_clans = self.kills["attacker_team_clan_name"].to_numpy()[self.pair_starts]
+
+    def team_players(self, team_name):
+        """
+        Players that got kills for a clan, and the players they killed.
+
+        Parameters:
+            team_name (str): Attacker clan name.
+
+        Returns:
+            tuple: (attacker names, victim names), both sorted.
+        """
+        in_team = self.pair_clans == team_name
+        attackers = self.players[np.unique(self.pair_attackers[in_team])]
+        victims = self.players[np.unique(self.pair_victims[in_team])]
+        return list(attackers), list(victims)
+
+    def _select_pairs(self, attackers, victims, team_name=None):
+        """Row, column and pair positions of the stored pairs that fall inside a submatrix."""
+        row_of = np.full(self.n_players, -1)
+        col_of = np.full(self.n_players, -1)
+        row_of[self.players.get_indexer(attackers)] = np.arange(len(attackers))
+        col_of[self.players.get_indexer(victims)] = np.arange(len(victims))
+
+        rows, cols = row_of[self.pair_attackers], col_of[self.pair_victims]
+        selected = (rows >= 0) & (cols >= 0)
+        if team_name is not None:
+            selected &= self.pair_clans == team_name
+        return rows[selected], cols[selected], np.flatnonzero(selected)
+
+    def matrix(self, attackers, victims, team_name=None):
+        """
+        Dense kill counts for a selected submatrix.
+
+        Parameters:
+            attackers (list): Attacker names for the rows.
+            victims (list): Victim names for the columns.
+            team_name (str): Only count kills by this clan (optional).
+
+        Returns:
+            pd.DataFrame: attacker_name x victim_name kill counts.
+        """
+        rows, cols, pairs = self._select_pairs(attackers, victims, team_name)
+        counts = np.zeros((len(attackers), len(victims)))
+        counts[rows, cols] = self.pair_counts[pairs]
+        return pd.DataFrame(
+            counts,
+            index=pd.Index(attackers, name="attacker_name"),
+            columns=pd.Index(victims, name="victim_name"),
+        )
+
+    def pair_kills(self, attacker, victim):
+        """
+        Every kill of one attacker on one victim.
+
+        Parameters:
+            attacker (str): Attacker name.
+            victim (str): Victim name.
+
+        Returns:
+            pd.DataFrame: The pair's kills, empty if they never met.
+        """
+        codes = self.players.get_indexer([attacker, victim])
+        if (codes < 0).any():
+            return self.kills.iloc[0:0]
+        pair = np.searchsorted(self.pair_keys, codes[0] * self.n_players + codes[1])
+        if pair == len(self.pair_keys) or self.pair_keys[pair] != codes[0] * self.n_players + codes[1]:
+            return self.kills.iloc[0:0]
+        start = self.pair_starts[pair]
+        return self.kills.iloc[start:start + self.pair_counts[pair]]
+
+    def hover_matrix(self, heatmap_data, team_name=None):
+        """
+        Kill detail strings for the non-empty cells of a submatrix, formatted only now.
+
+        Parameters:
+            heatmap_data (pd.DataFrame): A matrix() result.
+            team_name (str): The clan the matrix was built for (optional).
+
+        Returns:
+            pd.DataFrame: Same shape as heatmap_data, empty strings where there were no kills.
+        """
+        rows, cols, pairs = self._select_pairs(list(heatmap_data.index), list(heatmap_data.columns), team_name)
+        starts, counts = self.pair_starts[pairs], self.pair_counts[pairs]
+
+        # Format every selected kill in one vectorized pass, numbered within its pair
+        kill_rows = np.repeat(starts, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        kills = self.kills.iloc[kill_rows]
+        lines = (
+            "<b>Kill " + (kill_rows - np.repeat(starts, counts) + 1).astype(str) + ":</b> Weapon: "
+            + kills["weapon"].astype(str).to_numpy(dtype=object) + ", Damage: "
+            + kills["dmg_health"].astype(str).to_numpy(dtype=object) + ", Headshot: "
+            + kills["headshot"].astype(str).to_numpy(dtype=object)
+        ).tolist()
+
+        hover = np.full(heatmap_data.shape, "", dtype=object)
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        hover[rows, cols] = ["<br>".join(lines[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+        return pd.DataFrame(hover, index=heatmap_data.index, columns=heatmap_data.columns)
+
+    def summary_matrix(self, heatmap_data, team_name=None):
+        """
+        Short per-cell summaries (top weapon and headshot rate) for the non-empty cells of a submatrix.
+
+        Much smaller than hover_matrix, for figures that fetch the full kill list on demand instead.
+
+        Parameters:
+            heatmap_data (pd.DataFrame): A matrix() result.
+            team_name (str): The clan the matrix was built for (optional).
+
+        Returns:
+            pd.DataFrame: Same shape as heatmap_data, e.g. 'AK-47, 50% HS', empty strings where there were no kills.
+        """
+        rows, cols, pairs = self._select_pairs(list(heatmap_data.index), list(heatmap_data.columns), team_name)
+        starts, counts = self.pair_starts[pairs], self.pair_counts[pairs]
+        kill_rows = np.repeat(starts, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        kills = self.kills.iloc[kill_rows]
+        pair_of_kill = np.repeat(np.arange(len(pairs)), counts)
+
+        # Most used weapon per pair; on a tie, the one the pair's earliest kill was made with
+        weapon_codes, weapons = pd.factorize(kills["weapon"], use_na_sentinel=False)
+        weapon_counts = np.zeros((len(pairs), max(len(weapons), 1)), dtype=np.int64)
+        np.add.at(weapon_counts, (pair_of_kill, weapon_codes), 1)
+        first_use = np.full(weapon_counts.shape, len(kills), dtype=np.int64)
+        np.minimum.at(first_use, (pair_of_kill, weapon_codes), np.arange(len(kills)))
+        top = (weapon_counts * (len(kills) + 1) - first_use).argmax(axis=1)
+        top_weapons = np.asarray(weapons, dtype=object)[top] if len(weapons) else []
+
+        is_headshot = kills["headshot"].astype(object).fillna(False).to_numpy(dtype=float)
+        headshots = np.bincount(pair_of_kill, weights=is_headshot, minlength=len(pairs))
+        headshot_rates = np.round(100 * headshots / np.maximum(counts, 1)).astype(int)
+
+        summary = np.full(heatmap_data.shape, "", dtype=object)
+        summary[rows, cols] = [f"{weapon}, {rate}% HS" for weapon, rate in zip(top_weapons, headshot_rates)]
+        return pd.DataFrame(summary, index=heatmap_data.index, columns=heatmap_data.columns)
+
+
 # Function to process kills data for heatmaps
-def process_kills_data(kills_df):
-    required_columns = [
-        "attacker_team_clan_name", "victim_team_clan_name",
-        "attacker_name", "victim_name", "weapon", "dmg_health", "headshot"
-    ]
-    for col in required_columns:
-        if col not in kills_df.columns:
-            raise ValueError(f"Missing required column: {col} in kills_df")
-
-    # Filter out team kills or self-kills
-    filtered_kills_df = kills_df[
-        kills_df["attacker_team_clan_name"] != kills_df["victim_team_clan_name"]
-    ]
+def process_kills_data(kills_df, head_to_head=None, players=None, compact=False):
+    if head_to_head is None:
+        head_to_head = HeadToHead(kills_df)
 
     def process_team_data(team_name):
-        team_kills = filtered_kills_df[filtered_kills_df["attacker_team_clan_name"] == team_name]
-        head_to_head = (
-            team_kills.groupby(["attacker_name", "victim_name"])
-            .agg(
-                kills=("attacker_name", "count"),
-                details=("weapon", lambda x: generate_kill_details(team_kills.loc[x.index])),
-            )
-            .reset_index()
-        )
-        heatmap_data = head_to_head.pivot(index="attacker_name", columns="victim_name", values="kills").fillna(0)
-        hover_data = head_to_head.pivot(index="attacker_name", columns="victim_name", values="details").fillna("")
+        attackers, victims = head_to_head.team_players(team_name)
+        if players:
+            # Only the selected players' rows and columns are ever materialized
+            attackers = [name for name in attackers if name in players]
+            victims = [name for name in victims if name in players]
+        heatmap_data = head_to_head.matrix(attackers, victims, team_name)
+        if compact:
+            hover_data = head_to_head.summary_matrix(heatmap_data, team_name)
+        else:
+            hover_data = head_to_head.hover_matrix(heatmap_data, team_name)
         return heatmap_data, hover_data
 
-    clan_names = filtered_kills_df["attacker_team_clan_name"].unique()
+    clan_names = head_to_head.clan_names
     if len(clan_names) < 2:
         raise ValueError("Expected at least 2 clans in the data. Check the input data.")
 
@@ -51,40 +221,66 @@ def process_kills_data(kills_df):
 
 
 # Function to combine heatmap data from multiple matches
-def combine_heatmaps(kills_data_list):
+def combine_heatmaps(kills_data_list, players=None):
     combined_kills_df = pd.concat(kills_data_list, ignore_index=True)
-    return process_kills_data(combined_kills_df)
-
+    return process_kills_data(combined_kills_df, players=players)
 
-# Function to create visuals for Streamlit
-def create_heatmap_visuals(team1_data, team2_data, team1_name, team2_name):
-    team1_heatmap_data, team1_hover_data = team1_data
-    team2_heatmap_data, team2_hover_data = team2_data
 
-    st.header(f"{team1_name} Heatmap")
-    fig1 = px.imshow(
-        team1_heatmap_data,
+# Figures are cached between reruns, keyed on their (small) input frames
+@st.cache_data(show_spinner=False, max_entries=32)
+def build_head_to_head_figure(heatmap_data, hover_data, title, color_scale, details_label="Details"):
+    fig = px.imshow(
+        heatmap_data,
         labels=dict(x="Victim", y="Attacker", color="Kills"),
-        title=f"{team1_name} Head-to-Head Kills",
+        title=title,
         text_auto=True,
-        color_continuous_scale="Blues",
+        color_continuous_scale=color_scale,
     )
-    fig1.update_traces(
-        hovertemplate="<b>Attacker:</b> %{y}<br><b>Victim:</b> %{x}<br><b>Kills:</b> %{z}<br><b>Details:</b><br>%{customdata}",
-        customdata=team1_hover_data.values,
+    fig.update_traces(
+        hovertemplate=f"<b>Attacker:</b> %{{y}}<br><b>Victim:</b> %{{x}}<br><b>Kills:</b> %{{z}}<br><b>{details_label}:</b><br>%{{customdata}}",
+        customdata=hover_data.values,
     )
-    st.plotly_chart(fig1)
+    return fig
 
-    st.header(f"{team2_name} Heatmap")
-    fig2 = px.imshow(
-        team2_heatmap_data,
-        labels=dict(x="Victim", y="Attacker", color="Kills"),
-        title=f"{team2_name} Head-to-Head Kills",
-        text_auto=True,
-        color_continuous_scale="Reds",
-    )
-    fig2.update_traces(
-        hovertemplate="<b>Attacker:</b> %{y}<br><b>Victim:</b> %{x}<br><b>Kills:</b> %{z}<br><b>Details:</b><br>%{customdata}",
-        customdata=team2_hover_data.values,
-    )
-    st.plotly_chart(fig2)
+
+def show_pair_kills(head_to_head, heatmap_data, key):
+    """
+    Fetch and show the full kill list for one head-to-head cell on demand.
+
+    Parameters:
+        head_to_head (HeadToHead): Sparse head-to-head table the heatmap was built from.
+        heatmap_data (pd.DataFrame): The rendered matrix, its axes populate the pickers.
+        key (str): Unique widget key prefix.
+    """
+    with st.expander("Kill list for a cell"):
+        col_attacker, col_victim = st.columns(2)
+        attacker = col_attacker.selectbox("Attacker", list(heatmap_data.index), key=f"{key}_attacker")
+        victim = col_victim.selectbox("Victim", list(heatmap_data.columns), key=f"{key}_victim")
+        if attacker is not None and victim is not None:
+            st.dataframe(head_to_head.pair_kills(attacker, victim)[["weapon", "dmg_health", "headshot"]])
+
+
+# Function to create visuals for Streamlit
+def create_heatmap_visuals(team1_data, team2_data, team1_name, team2_name, head_to_head=None):
+    """
+    Render both teams' head-to-head heatmaps.
+
+    Parameters:
+        team1_data (tuple): (heatmap data, hover data) for team 1.
+        team2_data (tuple): (heatmap data, hover data) for team 2.
+        team1_name (str): Team 1 display name.
+        team2_name (str): Team 2 display name.
+        head_to_head (HeadToHead): Pass when the hover data are compact summaries, to add on-demand kill lists.
+    """
+    details_label = "Summary" if head_to_head is not None else "Details"
+    for team_name, (heatmap_data, hover_data), color_scale in [
+        (team1_name, team1_data, "Blues"),
+        (team2_name, team2_data, "Reds"),
+    ]:
+        st.header(f"{team_name} Heatmap")
+        fig = build_head_to_head_figure(
+            heatmap_data, hover_data, f"{team_name} Head-to-Head Kills", color_scale, details_label
+        )
+        st.plotly_chart(fig)
+        if head_to_head is not None:
+            show_pair_kills(head_to_head, heatmap_data, key=f"{team_name}_{color_scale}_pair")
@@ -0,0 +1,216 @@
+"""
+Benchmark of the single-pass stats engine against the awpy.stats flow it replaced.
+
+Run from the project root:
+    python code/stats_benchmark.py --rounds 480
+
+The previous parse_demo_file built combined_stats from kills/deaths groupbys, an outer merge, a 'Both'
+concat and awpy.stats.kast, adr and rating merged on top. That flow is rerun here as it was, with the
+installed awpy.stats functions, over Polars copies of the same synthetic kills, damages and ticks
+(24 rounds per demo, so 480 rounds is roughly 20 demos concatenated).
+
+Each flow runs in its own process. Memory is how far the process's resident set peaks above where it
+stood before the flow ran, which also counts Polars' native allocations that tracemalloc cannot see.
+Reading and resetting the peak uses /proc, so the benchmark runs on Linux only.
+"""
+import argparse
+import gc
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import polars as pl
+from awpy.demo import Demo
+from awpy.stats import adr, kast, rating
+
+from player_rounds import compute_combined_stats
+
+PLAYERS = [f"player_{i}" for i in range(10)]
+
+# awpy.stats sides and the combined_stats team_name they were renamed to
+AWPY_SIDES = {"ct": "CT", "t": "TERRORIST", "all": "Both"}
+
+
+def make_synthetic_demo(n_rounds, kills_per_round=7, damages_per_round=60, ticks_per_round=16, seed=0):
+    """
+    Build synthetic kills, damages and ticks DataFrames with the awpy column layout.
+
+    Parameters:
+        n_rounds (int): Number of rounds to generate.
+        kills_per_round (int): Kills per round.
+        damages_per_round (int): Damage events per round.
+        ticks_per_round (int): Sampled ticks per player per round.
+        seed (int): Random seed.
+
+    Returns:
+        tuple: (kills_df, damages_df, ticks_df)
+    """
+    rng = np.random.default_rng(seed)
+    side = lambda idx, rounds: np.where((idx < 5) ^ (rounds > 12), "CT", "TERRORIST")
+
+    def events(n):
+        rounds = np.repeat(np.arange(1, n_rounds + 1), n)
+        attacker = rng.integers(0, 10, len(rounds))
+        victim = (attacker + rng.integers(1, 5, len(rounds))) % 10
+        return pd.DataFrame({
+            "tick": rounds * 10_000 + np.sort(rng.integers(0, 9_000, len(rounds))),
+            "round": rounds,
+            "attacker_name": np.array(PLAYERS)[attacker],
+            "attacker_steamid": attacker,
+            "attacker_team_name": side(attacker, rounds),
+            "attacker_team_clan_name": np.where(attacker < 5, "ClanA", "ClanB"),
+            "victim_name": np.array(PLAYERS)[victim],
+            "victim_steamid": victim,
+            "victim_team_name": side(victim, rounds),
+            "victim_team_clan_name": np.where(victim < 5, "ClanA", "ClanB"),
+        })
+
+    kills_df = events(kills_per_round)
+    assisted = rng.random(len(kills_df)) < 0.3
+    kills_df["assister_name"] = np.where(assisted, kills_df["attacker_name"], None)
+    kills_df["assister_steamid"] = np.where(assisted, kills_df["attacker_steamid"], None)
+    kills_df["assister_team_name"] = np.where(assisted, kills_df["attacker_team_name"], None)
+    damages_df = events(damages_per_round)
+    damages_df["dmg_health_real"] = rng.integers(1, 100, len(damages_df))
+
+    rounds = np.repeat(np.arange(1, n_rounds + 1), ticks_per_round * len(PLAYERS))
+    player = np.tile(np.arange(len(PLAYERS)), n_rounds * ticks_per_round)
+    ticks_df = pd.DataFrame({
+        "tick": rounds * 10_000 + np.tile(np.repeat(np.arange(ticks_per_round) * 500, len(PLAYERS)), n_rounds),
+        "round": rounds,
+        "name": np.array(PLAYERS)[player],
+        "steamid": player,
+        "team_name": side(player, rounds),
+        "team_clan_name": np.where(player < 5, "ClanA", "ClanB"),
+        "health": rng.integers(0, 101, len(rounds)),
+    })
+    return kills_df, damages_df, ticks_df
+
+
+def awpy_demo(kills_df, damages_df, ticks_df, tickrate=64):
+    """
+    A stand-in for an awpy Demo over Polars copies of the synthetic tables, as awpy.stats reads them.
+    """
+    def sides(column):
+        return column.map({"CT": "ct", "TERRORIST": "t"})
+
+    kills = pl.from_pandas(pd.DataFrame({
+        "tick": kills_df["tick"], "round_num": kills_df["round"],
+        **{f"{role}_{field}": kills_df[f"{role}_{field}"] for role in ["attacker", "victim", "assister"] for field in ["name", "steamid"]},
+        "attacker_side": sides(kills_df["attacker_team_name"]),
+        "victim_side": sides(kills_df["victim_team_name"]),
+        "assister_side": sides(kills_df["assister_team_name"]),
+    }).astype({"assister_steamid": "Int64"}))
+    damages = pl.from_pandas(pd.DataFrame({
+        "attacker_name": damages_df["attacker_name"], "attacker_steamid": damages_df["attacker_steamid"],
+        "attacker_side": sides(damages_df["attacker_team_name"]), "victim_side": sides(damages_df["victim_team_name"]),
+        "dmg_health_real": damages_df["dmg_health_real"],
+    }))
+    ticks = pl.from_pandas(pd.DataFrame({
+        "tick": ticks_df["tick"], "round_num": ticks_df["round"], "name": ticks_df["name"],
+        "steamid": ticks_df["steamid"], "side": sides(ticks_df["team_name"]), "health": ticks_df["health"],
+    }))
+    demo = SimpleNamespace(
+        tickrate=tickrate, kills=kills, damages=damages, ticks=ticks,
+        rounds=pl.DataFrame({"round_num": np.unique(ticks_df["round"])}),
+    )
+    demo.player_round_totals = Demo.player_round_totals.func(demo)
+    return demo
+
+
+def previous_combined_stats(kills_df, demo):
+    """
+    The previous parse_demo_file flow: per-role groupbys, outer merge, 'Both' concat and the
+    awpy.stats KAST, ADR and Rating tables merged on, each followed by fillna.
+    """
+    player_stats = (
+        kills_df.groupby(["attacker_name", "attacker_team_name", "attacker_team_clan_name"])
+        .agg(kills=("attacker_name", "count"), assists=("assister_name", "count"))
+        .reset_index()
+        .rename(columns={"attacker_name": "player_name", "attacker_team_name": "team_name",
+                         "attacker_team_clan_name": "clan_name"})
+    )
+    deaths_stats = (
+        kills_df.groupby(["victim_name", "victim_team_name", "victim_team_clan_name"])
+        .agg(deaths=("victim_name", "count"))
+        .reset_index()
+        .rename(columns={"victim_name": "player_name", "victim_team_name": "team_name",
+                         "victim_team_clan_name": "clan_name"})
+    )
+    final_stats = pd.merge(player_stats, deaths_stats, on=["player_name", "team_name", "clan_name"], how="outer").fillna(0)
+    both_stats = (
+        final_stats.groupby(["player_name", "clan_name"])
+        .agg(kills=("kills", "sum"), assists=("assists", "sum"), deaths=("deaths", "sum"))
+        .reset_index()
+        .assign(team_name="Both")
+    )
+    combined_stats = pd.concat([final_stats, both_stats], ignore_index=True)
+
+    def awpy_table(table, columns, drop):
+        table = table.to_pandas().rename(columns={"name": "player_name", "side": "team_name", **columns})
+        table["team_name"] = table["team_name"].map(AWPY_SIDES)
+        return table.drop(columns=drop)
+
+    tables = [
+        (kast(demo), {"kast": "kast_percentage"}, ["steamid"]),
+        (adr(demo), {"dmg": "total_damage", "adr": "average_damage_per_round"}, ["steamid", "n_rounds"]),
+    ]
+    try:
+        tables.append((rating(demo), {"rating": "rating_2.0"}, ["steamid", "n_rounds"]))
+    except pl.exceptions.DuplicateError:
+        # awpy 2.0.0's impact() joins two tables with a 'side' column and newer Polars rejects it;
+        # rating() has already recomputed kast() and adr() by then, which is nearly all of its cost
+        print("awpy.stats.rating failed in impact(); its kast() and adr() passes are still timed")
+    for table, columns, drop in tables:
+        combined_stats = pd.merge(combined_stats, awpy_table(table, columns, drop), on=["player_name", "team_name"], how="left").fillna(0)
+    return combined_stats
+
+
+def _memory_kib(field):
+    """A VmRSS / VmHWM line of /proc/self/status in KiB."""
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field + ":"))
+
+
+def _run(flow, n_rounds):
+    kills_df, damages_df, ticks_df = make_synthetic_demo(n_rounds)
+    args = (kills_df, awpy_demo(kills_df, damages_df, ticks_df)) if flow == "previous" else (kills_df, damages_df, ticks_df)
+    func = previous_combined_stats if flow == "previous" else compute_combined_stats
+
+    # Reset the peak to the current resident set, so building the inputs does not hide the flow's peak
+    gc.collect()
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    rss_before = _memory_kib("VmRSS")
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    return elapsed, (_memory_kib("VmHWM") - rss_before) / 1024
+
+
+def measure(flow, n_rounds):
+    """
+    Run one flow in a fresh process and return (seconds, peak resident memory growth in MiB).
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_run, flow, n_rounds).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=480)
+    args = parser.parse_args()
+
+    kills_df, damages_df, ticks_df = make_synthetic_demo(args.rounds)
+    print(f"{len(kills_df):,} kills, {len(damages_df):,} damages, {len(ticks_df):,} ticks")
+
+    for name, flow in [("awpy.stats flow", "previous"), ("single-pass engine", "engine")]:
+        elapsed, peak = measure(flow, args.rounds)
+        print(f"{name:>20}: {elapsed * 1000:8.1f} ms  peak +{peak:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+# Seconds after a death in which killing the killer counts as a trade
+TRADE_SECONDS = 3.0
+
+TRADE_COLUMNS = ["is_traded", "trade_of", "time_to_trade"]
+
+
+def detect_trades(kills_df, tickrate=64, trade_seconds=TRADE_SECONDS):
+    """
+    Find traded deaths with one sorted-window join: a death is traded when its killer dies
+    in the same round within the trade window.
+
+    Each kill is matched to the killer's next death with merge_asof (by round and name,
+    forward, bounded by the window), so the cost is a sort plus one linear merge.
+
+    Parameters:
+        kills_df (pd.DataFrame): Kills DataFrame with 'tick', 'round', 'attacker_name' and 'victim_name'.
+        tickrate (int): Server tick rate used to convert the window to ticks.
+        trade_seconds (float): Length of the trade window in seconds.
+
+    Returns:
+        pd.DataFrame: A copy of kills_df with TRADE_COLUMNS added:
+            'is_traded' (the victim of this kill was avenged),
+            'trade_of' (on a trading kill, the index label of the kill it avenged, latest one if several),
+            'time_to_trade' (seconds from this death to its trade).
+    """
+    trades = kills_df.copy()
+    trades["is_traded"] = False
+    trades["trade_of"] = pd.Series(pd.NA, index=trades.index, dtype="Int64")
+    trades["time_to_trade"] = np.nan
+    if kills_df.empty:
+        return trades
+
+    deaths = kills_df[["tick", "round", "attacker_name"]].copy()
+    deaths["row"] = np.arange(len(kills_df))
+    deaths = deaths[deaths["attacker_name"].notna()].sort_values("tick", kind="stable")
+
+    # The killer's own death, keyed by the same (round, name) pair
+    revenge = kills_df[["tick", "round", "victim_name"]].rename(
+        columns={"tick": "trade_tick", "victim_name": "attacker_name"}
+    )
+    revenge["trade_row"] = np.arange(len(kills_df))
+    revenge = revenge.dropna(subset=["attacker_name"]).sort_values("trade_tick", kind="stable")
+
+    matched = pd.merge_asof(
+        deaths,
+        revenge,
+        left_on="tick",
+        right_on="trade_tick",
+        by=["round", "attacker_name"],
+        direction="forward",
+        tolerance=int(tickrate * trade_seconds),
+    )
+    matched = matched[matched["trade_tick"].notna()]
+
+    rows = matched["row"].to_numpy()
+    trade_rows = matched["trade_row"].to_numpy(dtype=np.int64)
+    trades.iloc[rows, trades.columns.get_loc("is_traded")] = True
+    trades.iloc[rows, trades.columns.get_loc("time_to_trade")] = (
+        (matched["trade_tick"] - matched["tick"]).to_numpy() / tickrate
+    )
+    # matched is tick-sorted, so when one kill avenges several deaths the latest death is written last
+    trade_of = np.full(len(kills_df), -1, dtype=np.int64)
+    trade_of[trade_rows] = rows
+    avenged = trade_of >= 0
+    trades["trade_of"] = pd.array(
+        np.where(avenged, kills_df.index.to_numpy()[np.maximum(trade_of, 0)], 0), dtype="Int64"
+    )
+    trades.loc[~avenged, "trade_of"] = pd.NA
+    return trades
+
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+# Distance in game units within which a smoke or fire counts as 'nearby' (a smoke is roughly 144 units across)
+NEARBY_RADIUS = 250.0
+
+UTILITY_PAIR_COLUMNS = [
+    "kill_row", "utility_row", "kind", "thrower_name", "thrower_team_clan_name", "round", "distance",
+]
+
+
+class UtilityIntervalIndex:
+    """
+    Sorted-sweep index over smoke and fire lifetimes.
+
+    Intervals are sorted by start tick and the longest lifetime is remembered, so every interval
+    active at tick t starts in [t - longest, t]. That window is two binary searches, and only
+    its members are checked for end tick and distance, instead of every kill against every grenade.
+    """
+
+    def __init__(self, utility_df):
+        utility_df = utility_df.dropna(subset=["start_tick", "end_tick", "X", "Y"])
+        self.utility = utility_df.sort_values("start_tick", kind="stable").reset_index(drop=True)
+        self.start = self.utility["start_tick"].to_numpy(dtype=np.int64)
+        self.end = self.utility["end_tick"].to_numpy(dtype=np.int64)
+        self.x = self.utility["X"].to_numpy(dtype=float)
+        self.y = self.utility["Y"].to_numpy(dtype=float)
+        self.longest = int((self.end - self.start).max()) if len(self.utility) else 0
+
+    def active_pairs(self, ticks, x, y, radius=NEARBY_RADIUS):
+        """
+        Every (query, interval) pair where the interval is active at the query tick and within radius.
+
+        Parameters:
+            ticks (array-like): Query ticks, e.g. kill ticks.
+            x, y (array-like): Query positions; NaN positions match nothing.
+            radius (float): Maximum distance in game units.
+
+        Returns:
+            tuple: (query positions, interval rows into self.utility, distances).
+        """
+        ticks = np.asarray(ticks, dtype=np.int64)
+        lo = np.searchsorted(self.start, ticks - self.longest, side="left")
+        hi = np.searchsorted(self.start, ticks, side="right")
+
+        # Expand each query's candidate window into flat (query, interval) arrays
+        counts = hi - lo
+        queries = np.repeat(np.arange(len(ticks)), counts)
+        rows = np.repeat(lo, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        distances = np.hypot(self.x[rows] - np.asarray(x, dtype=float)[queries], self.y[rows] - np.asarray(y, dtype=float)[queries])
+        keep = (self.end[rows] >= ticks[queries]) & (distances <= radius)
+        return queries[keep], rows[keep], distances[keep]
+
+
+def combine_utility(smokes_df, infernos_df):
+    """
+    Stack smokes and infernos into one table with a 'kind' column.
+
+    Parameters:
+        smokes_df (pd.DataFrame): Smokes with start_tick, end_tick, X, Y and thrower columns.
+        infernos_df (pd.DataFrame): Infernos with the same columns.
+
+    Returns:
+        pd.DataFrame: The utility lifetimes of both kinds.
+    """
+    frames = [
+        df.assign(kind=kind) for df, kind in [(smokes_df, "smoke"), (infernos_df, "inferno")]
+        if df is not None and not df.empty
+    ]
+    if not frames:
+        return pd.DataFrame(columns=["start_tick", "end_tick", "X", "Y", "kind"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def utility_at_kills(kills_df, utility_df, radius=NEARBY_RADIUS):
+    """
+    Find the smokes and fires that were burning near each kill's victim when the kill happened.
+
+    Parameters:
+        kills_df (pd.DataFrame): Kills with 'tick', 'victim_X' and 'victim_Y'.
+        utility_df (pd.DataFrame): combine_utility output.
+        radius (float): Maximum distance in game units.
+
+    Returns:
+        pd.DataFrame: UTILITY_PAIR_COLUMNS, one row per (kill, active nearby utility);
+        'kill_row' is the kill's position in kills_df.
+    """
+    if kills_df.empty or utility_df.empty or "victim_X" not in kills_df.columns:
+        return pd.DataFrame(columns=UTILITY_PAIR_COLUMNS)
+
+    index = UtilityIntervalIndex(utility_df)
+    kill_rows, utility_rows, distances = index.active_pairs(
+        kills_df["tick"].to_numpy(), kills_df["victim_X"].to_numpy(dtype=float), kills_df["victim_Y"].to_numpy(dtype=float), radius
+    )
+    utility = index.utility.iloc[utility_rows].reset_index(drop=True)
+    pairs = pd.DataFrame({"kill_row": kill_rows, "utility_row": utility_rows, "distance": distances})
+    for column in ["kind", "thrower_name", "thrower_team_clan_name"]:
+        pairs[column] = utility[column].to_numpy() if column in utility.columns else None
+    pairs["round"] = kills_df["round"].to_numpy()[kill_rows] if "round" in kills_df.columns else None
+    return pairs[UTILITY_PAIR_COLUMNS]
+
+
+def add_utility_context(kills_df, pairs):
+    """
+    Add per-kill utility context columns: how many smokes and fires were active near the victim.
+
+    Parameters:
+        kills_df (pd.DataFrame): The kills the pairs were computed for.
+        pairs (pd.DataFrame): utility_at_kills output.
+
+    Returns:
+        pd.DataFrame: A copy of kills_df with 'smokes_nearby' and 'infernos_nearby'.
+    """
+    kills_df = kills_df.copy()
+    for kind, column in [("smoke", "smokes_nearby"), ("inferno", "infernos_nearby")]:
+        rows = pairs.loc[pairs["kind"] == kind, "kill_row"].to_numpy(dtype=np.int64)
+        kills_df[column] = np.bincount(rows, minlength=len(kills_df))
+    return kills_df
+
+
+def utility_kill_credits(kills_df, pairs):
+    """
+    Credit each thrower with the enemy deaths that happened near their active smokes and fires.
+
+    Parameters:
+        kills_df (pd.DataFrame): Kills with 'victim_team_clan_name' and 'victim_team_name'.
+        pairs (pd.DataFrame): utility_at_kills output.
+
+    Returns:
+        pd.DataFrame: One row per credited (kill, utility) pair with 'thrower_name', 'thrower_team_name'
+        (the thrower's side, the victim's opponents), 'round' and 'kind'.
+    """
+    victims = kills_df.iloc[pairs["kill_row"].to_numpy(dtype=np.int64)]
+    enemy = (victims["victim_team_clan_name"].to_numpy() != pairs["thrower_team_clan_name"].to_numpy())
+    credits = pairs[enemy].copy()
+    # A kill near two of the same player's smokes is still one kill for them
+    keep = ~credits.duplicated(subset=["kill_row", "thrower_name", "kind"]).to_numpy()
+    enemy_rows = np.flatnonzero(enemy)[keep]
+    credits = credits[keep]
+    victim_side = victims["victim_team_name"].to_numpy()[enemy_rows] if "victim_team_name" in victims.columns else None
+    opponents = {"CT": "TERRORIST", "TERRORIST": "CT"}
+    credits["thrower_team_name"] = pd.Series(victim_side).map(opponents).to_numpy() if victim_side is not None else None
+    return credits.reset_index(drop=True)
@@ -0,0 +1,211 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from spatial_index import points_in_polygon
+
+# Optional hand-drawn zones, one JSON file per map: {"A Site": [[x, y], ...], ...}
+ZONES_DIR = os.path.join("cache", "zones")
+
+# Nav-mesh place names that read better as callouts
+PLACE_ALIASES = {"BombsiteA": "A Site", "BombsiteB": "B Site"}
+
+# Columns tagged with a zone per game event table: (x column, y column, zone column)
+ZONE_COLUMNS = {
+    "kills": [("attacker_X", "attacker_Y", "attacker_zone"), ("victim_X", "victim_Y", "victim_zone")],
+    "damages": [("attacker_X", "attacker_Y", "attacker_zone"), ("victim_X", "victim_Y", "victim_zone")],
+    "bomb_events": [("X", "Y", "zone")],
+    "grenades": [("X", "Y", "zone")],
+    "smokes": [("X", "Y", "zone")],
+    "infernos": [("X", "Y", "zone")],
+}
+
+
+class ZoneRaster:
+    """
+    Precomputed raster of zone codes over a map, so tagging a point is one array lookup.
+
+    The polygon geometry (or place-name voting) is paid once when the raster is built;
+    lookups then only floor coordinates to a cell and index the raster.
+    """
+
+    def __init__(self, codes, names, x_min, y_min, cell_size):
+        self.codes = codes  # (ny, nx) int16, -1 where no zone is known
+        self.names = list(names)
+        self.x_min = float(x_min)
+        self.y_min = float(y_min)
+        self.cell_size = float(cell_size)
+
+    @classmethod
+    def from_polygons(cls, zones, cell_size=32.0):
+        """
+        Rasterize named polygons. Where zones overlap, the one listed first wins.
+
+        Parameters:
+            zones (dict): Zone name -> (n, 2) polygon vertices in game units.
+            cell_size (float): Raster resolution in game units.
+
+        Returns:
+            ZoneRaster: The rasterized zones.
+        """
+        names = list(zones)
+        vertices = [np.asarray(zones[name], dtype=float) for name in names]
+        corners = np.vstack(vertices)
+        x_min, y_min = corners.min(axis=0)
+        nx, ny = ((corners.max(axis=0) - (x_min, y_min)) // cell_size).astype(int) + 1
+
+        # Test every cell centre against each polygon's bounding box of cells only
+        codes = np.full((ny, nx), -1, dtype=np.int16)
+        for code in reversed(range(len(names))):
+            ix0, iy0 = ((vertices[code].min(axis=0) - (x_min, y_min)) // cell_size).astype(int)
+            ix1, iy1 = ((vertices[code].max(axis=0) - (x_min, y_min)) // cell_size).astype(int)
+            cx, cy = np.meshgrid(np.arange(ix0, ix1 + 1), np.arange(iy0, iy1 + 1))
+            inside = points_in_polygon(
+                x_min + (cx.ravel() + 0.5) * cell_size, y_min + (cy.ravel() + 0.5) * cell_size, vertices[code]
+            )
+            codes[cy.ravel()[inside], cx.ravel()[inside]] = code
+        return cls(codes, names, x_min, y_min, cell_size)
+
+    @classmethod
+    def from_places(cls, x, y, places, cell_size=64.0, fill_passes=2):
+        """
+        Learn a raster from positions labelled with their nav-mesh place name (e.g. attacker_last_place_name).
+
+        Each cell takes the most common place seen inside it; empty cells next to labelled
+        ones are filled from their neighbours so nearby utility still gets a zone.
+
+        Parameters:
+            x, y (array-like): Positions in game units.
+            places (array-like): Place name of each position, missing or empty names are ignored.
+            cell_size (float): Raster resolution in game units.
+            fill_passes (int): How many cells outward to grow zones into unlabelled cells.
+
+        Returns:
+            ZoneRaster: The learned zones.
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        places = pd.Series(places, dtype=object).replace("", None)
+        known = ~(np.isnan(x) | np.isnan(y) | places.isna().to_numpy())
+        if not known.any():
+            return cls(np.full((1, 1), -1, dtype=np.int16), [], 0.0, 0.0, cell_size)
+
+        x, y = x[known], y[known]
+        labels, names = pd.factorize(places[known].map(lambda place: PLACE_ALIASES.get(place, place)))
+        x_min, y_min = x.min(), y.min()
+        ix = ((x - x_min) // cell_size).astype(int)
+        iy = ((y - y_min) // cell_size).astype(int)
+        nx, ny = ix.max() + 1, iy.max() + 1
+
+        # Majority vote per cell from a (cell, label) count table
+        votes = np.bincount((iy * nx + ix) * len(names) + labels, minlength=nx * ny * len(names))
+        votes = votes.reshape(nx * ny, len(names))
+        codes = np.where(votes.any(axis=1), votes.argmax(axis=1), -1).astype(np.int16).reshape(ny, nx)
+
+        for _ in range(fill_passes):
+            padded = np.pad(codes, 1, constant_values=-1)
+            for neighbour in (padded[:-2, 1:-1], padded[2:, 1:-1], padded[1:-1, :-2], padded[1:-1, 2:]):
+                codes = np.where(codes < 0, neighbour, codes)
+        return cls(codes, list(names), x_min, y_min, cell_size)
+
+    def lookup(self, x, y):
+        """
+        Zone name of every position.
+
+        Parameters:
+            x, y (array-like): Positions in game units.
+
+        Returns:
+            np.ndarray: Object array of zone names, None outside every zone or for missing positions.
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        with np.errstate(invalid="ignore"):
+            ix = np.floor((x - self.x_min) / self.cell_size)
+            iy = np.floor((y - self.y_min) / self.cell_size)
+        ny, nx = self.codes.shape
+        inside = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+
+        codes = np.full(len(x), -1, dtype=np.int16)
+        codes[inside] = self.codes[iy[inside].astype(int), ix[inside].astype(int)]
+        # Code -1 indexes the trailing None
+        return np.array(self.names + [None], dtype=object)[codes]
+
+
+def load_zone_polygons(map_name, zones_dir=ZONES_DIR):
+    """
+    Load hand-drawn zone polygons for a map, if a definition file exists.
+
+    Parameters:
+        map_name (str): Map name, e.g. 'de_ancient'.
+        zones_dir (str): Folder holding '<map_name>.json' files.
+
+    Returns:
+        dict: Zone name -> polygon vertices, or None when the map has no definition file.
+    """
+    path = os.path.join(zones_dir, f"{map_name}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def build_zone_raster(map_name, kills_df=None, zones_dir=ZONES_DIR):
+    """
+    Build the zone raster for a map from its polygon file, or learn it from the kill place names.
+
+    Parameters:
+        map_name (str): Map name, e.g. 'de_ancient'.
+        kills_df (pd.DataFrame): Kills with attacker/victim X, Y and last_place_name columns (optional).
+        zones_dir (str): Folder holding polygon definition files.
+
+    Returns:
+        ZoneRaster: The zone raster, or None when there is nothing to build it from.
+    """
+    polygons = load_zone_polygons(map_name, zones_dir) if map_name else None
+    if polygons:
+        return ZoneRaster.from_polygons(polygons)
+    if kills_df is None or kills_df.empty:
+        return None
+
+    x, y, places = [], [], []
+    for role in ["attacker", "victim"]:
+        columns = [f"{role}_X", f"{role}_Y", f"{role}_last_place_name"]
+        if all(column in kills_df.columns for column in columns):
+            x.append(kills_df[columns[0]].to_numpy(dtype=float))
+            y.append(kills_df[columns[1]].to_numpy(dtype=float))
+            places.append(kills_df[columns[2]].to_numpy(dtype=object))
+    if not x:
+        return None
+    return ZoneRaster.from_places(np.concatenate(x), np.concatenate(y), np.concatenate(places))
+
+
+def assign_zones(events, zone_raster, raw_events=None):
+    """
+    Add zone columns to parsed game event tables.
+
+    Parameters:
+        events (dict): Game event DataFrames keyed as in ZONE_COLUMNS (from parse_game_events).
+        zone_raster (ZoneRaster): Raster to look positions up in, None leaves every zone empty.
+        raw_events (dict): Unfiltered event DataFrames to read positions from when the
+            parsed tables do not carry them (optional, must share row order).
+
+    Returns:
+        dict: The same tables with zone columns added.
+    """
+    for event_type, position_columns in ZONE_COLUMNS.items():
+        df = events.get(event_type)
+        if df is None:
+            continue
+        source = raw_events.get(event_type) if raw_events else None
+        df = df.copy()
+        for x_column, y_column, zone_column in position_columns:
+            frame = df if x_column in df.columns else source
+            if zone_raster is None or frame is None or x_column not in frame.columns or len(frame) != len(df):
+                df[zone_column] = None
+                continue
+            df[zone_column] = zone_raster.lookup(frame[x_column].to_numpy(dtype=float), frame[y_column].to_numpy(dtype=float))
+        events[event_type] = df
+    return events
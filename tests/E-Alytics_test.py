@@ -15,7 +15,7 @@ sys.path.insert(0, project_root)  # Add project root afterward
 print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm updated paths
 
 # Import functions after adjusting PYTHONPATH
-from code.E_alytics import combine_game_events, download_csv_button
+from code.E_alytics import combine_game_events, combine_player_round_facts, download_csv_button, filter_events, event_page, combine_economy
 
 # Mock data for testing
 @pytest.fixture
@@ -62,6 +62,71 @@ def test_combine_game_events(mock_parsed_matches):
     assert "bomb_events" in combined_events and combined_events["bomb_events"].empty
 
 
+def test_combine_game_events_round_range():
+    """Test a round range is sliced per match through each match's round index."""
+    round_index = pd.DataFrame({"round": [1, 2, 3], "start_tick": [0, 100, 200], "end_tick": [99, 199, 299]})
+    kills = pd.DataFrame({"tick": [10, 150, 250], "attacker_name": ["Player1", "Player2", "Player3"]})
+    parsed_matches = {
+        "match1": {"game_events": {"kills": kills}, "round_index": round_index},
+        "match2": {"game_events": {"kills": kills}, "round_index": round_index},
+    }
+
+    combined_events = combine_game_events(parsed_matches, round_range=(2, 3))
+    assert combined_events["kills"]["attacker_name"].tolist() == ["Player2", "Player3"] * 2
+
+
+def test_filter_events_and_page():
+    """Test player and column filters and page slicing of an event table."""
+    kills = pd.DataFrame({
+        "tick": range(250),
+        "attacker_name": ["Player1", "Player2"] * 125,
+        "victim_name": ["Player3"] * 249 + ["Player1"],
+    })
+
+    filtered = filter_events(kills, player="Player1", columns=["tick", "attacker_name"])
+    assert len(filtered) == 126 and list(filtered.columns) == ["tick", "attacker_name"]
+    assert filter_events(kills).equals(kills)
+
+    page_df, page, n_pages = event_page(kills, 3, 100)
+    assert (page, n_pages, len(page_df)) == (3, 3, 50)
+    assert page_df["tick"].iloc[0] == 200
+
+    # Out of range pages are clamped
+    assert event_page(kills, 9, 100)[1] == 3
+    assert event_page(kills.iloc[0:0], 1, 100)[1:] == (1, 1)
+
+
+def test_combine_player_round_facts():
+    """Test combining per-round facts across matches and tagging them with the map."""
+    parsed_matches = {
+        "match1": {
+            "kills_df": pd.DataFrame({"map_name": ["de_ancient"]}),
+            "player_round_facts": pd.DataFrame({"player_name": ["Player1"], "round": [1]}),
+        },
+        "match2": {
+            "kills_df": pd.DataFrame({"map_name": ["de_nuke"]}),
+            "player_round_facts": pd.DataFrame({"player_name": ["Player1", "Player2"], "round": [1, 1]}),
+        },
+    }
+    facts = combine_player_round_facts(parsed_matches)
+
+    assert len(facts) == 3
+    assert facts["map_name"].tolist() == ["de_ancient", "de_nuke", "de_nuke"]
+    assert combine_player_round_facts({}).empty
+
+
+def test_combine_economy():
+    """Test buy-type tables are stacked and tagged with their demo."""
+    parsed_matches = {
+        "id1": {"file_name": "a.dem", "economy": pd.DataFrame({"round": [1], "buy_type": ["pistol"]})},
+        "id2": {"file_name": "b.dem", "economy": pd.DataFrame({"round": [1, 2], "buy_type": ["pistol", "eco"]})},
+        "id3": {"file_name": "c.dem"},
+    }
+    economy = combine_economy(parsed_matches)
+    assert economy["file_name"].tolist() == ["a.dem", "b.dem", "b.dem"]
+    assert combine_economy({}).empty
+
+
 def test_download_csv_button(monkeypatch):
     """Test Streamlit download button functionality."""
     mock_df = pd.DataFrame({"Column1": [1, 2], "Column2": [3, 4]})
@@ -0,0 +1,177 @@
+import sys
+import os
+import json
+import io
+import threading
+import urllib.request
+import zipfile
+import urllib.error
+
+# Add project root and code folder to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+code_folder = os.path.join(project_root, "code")
+sys.path.insert(0, code_folder)  # Add 'code' directory first
+sys.path.insert(0, project_root)  # Add project root afterward
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm updated paths
+
+import pandas as pd
+import pytest
+from code.parse_cache import save_parsed, load_parsed, cached_demo_ids
+from code.api_server import create_server, export_url, query_table
+
+
+@pytest.fixture
+def parsed_data():
+    return {
+        "file_name": "g2-vs-heroic-m1-ancient.dem",
+        "combined_stats": pd.DataFrame({"player_name": ["a", "b"], "kills": [20, 11]}),
+        "kills_df": pd.DataFrame({
+            "round": [1, 1, 2, 3],
+            "attacker_name": ["a", "b", "a", None],
+            "map_name": ["de_ancient"] * 4,
+        }),
+        "game_events": {"smokes": pd.DataFrame({"start_tick": [10, 20], "thrower_name": ["a", "b"]})},
+    }
+
+
+@pytest.fixture
+def api(tmp_path, parsed_data):
+    save_parsed("abc123", parsed_data, str(tmp_path))
+    server = create_server(port=0, cache_dir=str(tmp_path), workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", tmp_path
+    server.shutdown()
+    server.server_close()
+
+
+def get(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def test_parse_cache_round_trip(tmp_path, parsed_data):
+    """Test parsed data survives the cache and missing demos load as None."""
+    save_parsed("abc123", parsed_data, str(tmp_path))
+    assert cached_demo_ids(str(tmp_path)) == ["abc123"]
+    assert load_parsed("abc123", str(tmp_path))["kills_df"].equals(parsed_data["kills_df"])
+    assert load_parsed("missing", str(tmp_path)) is None
+
+
+def test_parse_cache_memory_maps_tables(tmp_path, parsed_data):
+    """Test frames are stored as Arrow files and loaded as read-only views, nested tables included."""
+    save_parsed("abc123", parsed_data, str(tmp_path))
+    (generation,) = os.listdir(tmp_path / "abc123")
+    assert sorted(os.listdir(tmp_path / "abc123" / generation)) == [
+        "combined_stats.arrow", "game_events.smokes.arrow", "kills_df.arrow",
+    ]
+
+    loaded = load_parsed("abc123", str(tmp_path))
+    assert loaded["file_name"] == "g2-vs-heroic-m1-ancient.dem"
+    assert loaded["game_events"]["smokes"].equals(parsed_data["game_events"]["smokes"])
+    assert not loaded["kills_df"]["round"].to_numpy().flags.writeable  # A view of the mapped file
+
+    # Losing a table file means the demo is parsed again
+    os.remove(tmp_path / "abc123" / generation / "kills_df.arrow")
+    assert load_parsed("abc123", str(tmp_path)) is None
+
+
+def test_parse_cache_rewrite_keeps_loaded_tables(tmp_path, parsed_data):
+    """Test rewriting an entry leaves tables already loaded from it intact, and old generations are pruned."""
+    save_parsed("abc123", parsed_data, str(tmp_path))
+    old = load_parsed("abc123", str(tmp_path))
+
+    new_kills = parsed_data["kills_df"].assign(round=[4, 4, 5, 6])
+    for _ in range(3):
+        save_parsed("abc123", {**parsed_data, "kills_df": new_kills}, str(tmp_path))
+
+    assert old["kills_df"].equals(parsed_data["kills_df"])
+    assert load_parsed("abc123", str(tmp_path))["kills_df"].equals(new_kills)
+    assert len(os.listdir(tmp_path / "abc123")) == 2
+
+
+def test_query_table_filters_and_pages(parsed_data):
+    """Test column filters, projection and pagination."""
+    page, meta = query_table(parsed_data["kills_df"], {"attacker_name": ["a"], "columns": ["round"], "page_size": ["1"], "page": ["2"]})
+    assert page.to_dict("records") == [{"round": 2}]
+    assert meta == {"page": 2, "page_size": 1, "n_pages": 2, "total_rows": 2}
+
+    with pytest.raises(ValueError):
+        query_table(parsed_data["kills_df"], {"weapon": ["ak47"]})
+
+
+def test_api_serves_tables_with_etags(api):
+    """Test the match list, table pages, 304 revalidation and errors."""
+    base, _ = api
+    status, _, body = get(f"{base}/matches")
+    matches = json.loads(body)["matches"]
+    assert status == 200
+    assert matches[0]["demo_id"] == "abc123" and matches[0]["map_name"] == "de_ancient"
+    assert "events/smokes" in matches[0]["tables"]
+
+    status, headers, body = get(f"{base}/matches/abc123/kills?round=1&page_size=1")
+    payload = json.loads(body)
+    assert status == 200
+    assert payload["total_rows"] == 2 and payload["n_pages"] == 2
+    assert payload["rows"] == [{"round": 1, "attacker_name": "a", "map_name": "de_ancient"}]
+
+    status, _, body = get(f"{base}/matches/abc123/kills?round=1&page_size=1", {"If-None-Match": headers["ETag"]})
+    assert status == 304 and body == b""
+
+    status, _, body = get(f"{base}/matches/abc123/events/smokes?thrower_name=b")
+    assert json.loads(body)["rows"] == [{"start_tick": 20, "thrower_name": "b"}]
+
+    assert get(f"{base}/matches/missing/kills")[0] == 404
+    assert get(f"{base}/matches/abc123/events/unknown")[0] == 404
+    assert get(f"{base}/matches/abc123/kills?page=zero")[0] == 400
+
+
+def test_api_reloads_after_reparse(api, parsed_data):
+    """Test a rewritten cache entry changes the response and its ETag."""
+    base, cache_dir = api
+    _, headers, _ = get(f"{base}/matches/abc123/combined_stats")
+
+    parsed_data["combined_stats"] = parsed_data["combined_stats"].assign(kills=[21, 11])
+    save_parsed("abc123", parsed_data, str(cache_dir))
+    os.utime(os.path.join(cache_dir, "abc123.pkl"), ns=(0, 10**18))  # Coarse file system clocks
+
+    status, new_headers, body = get(f"{base}/matches/abc123/combined_stats", {"If-None-Match": headers["ETag"]})
+    assert status == 200 and new_headers["ETag"] != headers["ETag"]
+    assert json.loads(body)["rows"][0]["kills"] == 21
+
+
+def test_metrics_endpoint(api):
+    """Test /metrics serves cache counters in the Prometheus text format."""
+    base_url, _ = api
+    get(f"{base_url}/matches/abc123")
+    get(f"{base_url}/matches/abc123")
+
+    status, headers, body = get(f"{base_url}/metrics")
+    assert status == 200 and headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    text = body.decode("utf-8")
+    assert "# TYPE ealytics_cache_requests counter" in text
+    assert 'ealytics_cache_requests_total{cache="api_response",result="hit"}' in text
+
+
+def test_export_streams_archive(api, parsed_data):
+    """Test /export streams a zip of every table without a Content-Length, and rejects bad requests."""
+    base, _ = api
+    status, headers, body = get(export_url(base, ["abc123"], "parquet"))
+    assert status == 200 and headers["Content-Type"] == "application/zip"
+    assert headers["Content-Length"] is None
+    archive = zipfile.ZipFile(io.BytesIO(body))
+    assert sorted(archive.namelist()) == ["g2-vs-heroic-m1-ancient/combined_stats.parquet", "g2-vs-heroic-m1-ancient/smokes.parquet"]
+    smokes = pd.read_parquet(io.BytesIO(archive.read("g2-vs-heroic-m1-ancient/smokes.parquet")))
+    pd.testing.assert_frame_equal(smokes, parsed_data["game_events"]["smokes"])
+
+    # Without demo IDs every cached match is exported
+    status, _, body = get(f"{base}/export")
+    assert status == 200 and len(zipfile.ZipFile(io.BytesIO(body)).namelist()) == 2
+
+    assert get(export_url(base, ["abc123"], "xlsx"))[0] == 400
+    assert get(export_url(base, ["missing"]))[0] == 404
@@ -0,0 +1,94 @@
+import sys
+import os
+
+# Add the project root directory to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)  # Add to the beginning of sys.path
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm project root is added
+
+import bz2
+import gzip
+import io
+import zipfile
+import pytest
+import code.demo_archive as demo_archive
+from code.demo_archive import extract_demos, collect_demo_paths, demo_fingerprint
+
+DEMO_BYTES = b"PBDEMS2\x00" + bytes(range(256)) * 64
+
+
+def test_extract_demos_plain_and_compressed(tmp_path):
+    """Test .dem, .gz and .bz2 uploads are streamed into the scratch folder."""
+    scratch = tmp_path / "scratch"
+
+    uploads = {
+        "g2-vs-heroic-m1-ancient.dem": DEMO_BYTES,
+        "g2-vs-heroic-m2-nuke.dem.gz": gzip.compress(DEMO_BYTES),
+        "g2-vs-heroic-m3-mirage.dem.bz2": bz2.compress(DEMO_BYTES),
+    }
+    for file_name, data in uploads.items():
+        demos = extract_demos(io.BytesIO(data), file_name, str(scratch))
+        assert len(demos) == 1
+        demo_id, demo_name, demo_path = demos[0]
+        assert demo_name.endswith(".dem")
+        assert demo_id == demo_fingerprint(io.BytesIO(DEMO_BYTES))
+        with open(demo_path, "rb") as f:
+            assert f.read() == DEMO_BYTES
+
+
+def test_extract_demos_zip_series(tmp_path):
+    """Test every .dem in a multi-map zip is extracted and other members are skipped."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("series/g2-vs-heroic-m1-ancient.dem", DEMO_BYTES)
+        archive.writestr("series/g2-vs-heroic-m2-nuke.dem", DEMO_BYTES)
+        archive.writestr("series/readme.txt", b"not a demo")
+    buffer.seek(0)
+
+    demos = extract_demos(buffer, "g2-vs-heroic.zip", str(tmp_path))
+    assert [name for _, name, _ in demos] == ["g2-vs-heroic-m1-ancient.dem", "g2-vs-heroic-m2-nuke.dem"]
+
+    # Identical maps share one ID and one scratch file
+    assert demos[0][0] == demos[1][0] and demos[0][2] == demos[1][2]
+
+    with pytest.raises(ValueError, match="Unsupported demo file type"):
+        extract_demos(io.BytesIO(b""), "notes.txt", str(tmp_path))
+
+
+def test_collect_demo_paths(tmp_path, monkeypatch):
+    """Test scanning a folder uses plain demos in place and extracts archives."""
+    (tmp_path / "g2-vs-heroic-m1-ancient.dem").write_bytes(DEMO_BYTES)
+    (tmp_path / "g2-vs-heroic-m2-nuke.dem.gz").write_bytes(gzip.compress(DEMO_BYTES))
+    (tmp_path / "tournaments.csv").write_text("Event Name\n")
+
+    demos = collect_demo_paths(str(tmp_path), str(tmp_path / "scratch"))
+    assert [name for _, name, _ in demos] == ["g2-vs-heroic-m1-ancient.dem", "g2-vs-heroic-m2-nuke.dem"]
+    assert demos[0][2] == str(tmp_path / "g2-vs-heroic-m1-ancient.dem")
+
+    # A second scan reuses the extracted demo instead of decompressing the archive again
+    extracted, real_extract = [], demo_archive.extract_demos
+    monkeypatch.setattr(demo_archive, "extract_demos", lambda *args: extracted.append(args) or real_extract(*args))
+    assert collect_demo_paths(str(tmp_path), str(tmp_path / "scratch")) == demos
+    assert extracted == []
+
+    # Once the extracted demo is gone, the archive is extracted again
+    os.remove(demos[1][2])
+    assert collect_demo_paths(str(tmp_path), str(tmp_path / "scratch")) == demos
+    assert len(extracted) == 1 and os.path.exists(demos[1][2])
+
+
+def test_extract_demos_same_member_name(tmp_path):
+    """Test two uploads with a member of the same name are both extracted, without leftover partial files."""
+    first = extract_demos(io.BytesIO(gzip.compress(DEMO_BYTES)), "final.dem.gz", str(tmp_path))
+    second = extract_demos(io.BytesIO(gzip.compress(DEMO_BYTES + b"\x01")), "final.dem.gz", str(tmp_path))
+    assert first[0][1] == second[0][1] == "final.dem" and first[0][0] != second[0][0]
+    assert sorted(os.listdir(tmp_path)) == sorted([f"{first[0][0]}.dem", f"{second[0][0]}.dem"])
+
+
+def test_demo_fingerprint():
+    """Test the demo ID depends on content only."""
+    first = demo_fingerprint(io.BytesIO(DEMO_BYTES))
+    assert len(first) == 16
+    assert first == demo_fingerprint(io.BytesIO(DEMO_BYTES))
+    assert first != demo_fingerprint(io.BytesIO(DEMO_BYTES + b"\x00"))
@@ -0,0 +1,104 @@
+import sys
+import os
+
+# Add the project root directory to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)  # Add to the beginning of sys.path
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm project root is added
+
+import struct
+import pytest
+from code.demo_index import read_demo_metadata, catalogue_demos, teams_from_filename, CATALOGUE_COLUMNS
+
+
+def varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def field(number, value):
+    """Encode one protobuf field: int -> varint, bytes/str -> length delimited, float -> fixed32."""
+    if isinstance(value, float):
+        return varint(number << 3 | 5) + struct.pack("<f", value)
+    if isinstance(value, int):
+        return varint(number << 3) + varint(value)
+    if isinstance(value, str):
+        value = value.encode()
+    return varint(number << 3 | 2) + varint(len(value)) + value
+
+
+def frame(command, payload, compressed=False):
+    if compressed:
+        # Raw Snappy block made of a single literal
+        payload = varint(len(payload)) + bytes([(len(payload) - 1) << 2]) + payload
+        command |= 64
+    return varint(command) + varint(0) + varint(len(payload)) + payload
+
+
+def write_demo(path, map_name="de_ancient", compressed_info=True, file_info=True):
+    """Write a demo with a CDemoFileHeader frame, an event stream stand-in and a CDemoFileInfo frame."""
+    header = field(3, "Valve CS2 Server") + field(5, map_name) + field(13, 10000)
+    round_ticks = b"".join(varint(t) for t in [100, 6500, 13000])
+    info = field(1, 1800.0) + field(2, 115200) + field(4, field(5, field(1, round_ticks)))
+
+    body = frame(1, header) + b"\x00" * 64
+    file_info_offset = 16 + len(body) if file_info else 0
+    trailer = frame(2, info, compressed_info) if file_info else b""
+    path.write_bytes(b"PBDEMS2\x00" + struct.pack("<ii", file_info_offset, 0) + body + trailer)
+
+
+def test_read_demo_metadata(tmp_path):
+    """Test metadata is read from the header and file-info frames."""
+    demo_path = tmp_path / "g2-vs-heroic-m1-ancient.dem"
+    write_demo(demo_path)
+
+    metadata = read_demo_metadata(str(demo_path))
+    assert metadata["map_name"] == "de_ancient"
+    assert metadata["server_name"] == "Valve CS2 Server"
+    assert metadata["tickrate"] == 64
+    assert metadata["duration_seconds"] == 1800.0
+    assert metadata["n_rounds"] == 3
+    assert (metadata["team1"], metadata["team2"]) == ("g2", "heroic")
+    assert metadata["file_name"] == "g2-vs-heroic-m1-ancient.dem"
+
+    # A demo still being recorded has no file info yet
+    write_demo(demo_path, file_info=False)
+    metadata = read_demo_metadata(str(demo_path))
+    assert metadata["map_name"] == "de_ancient"
+    assert (metadata["tickrate"], metadata["duration_seconds"], metadata["n_rounds"]) == (None, None, None)
+
+    not_a_demo = tmp_path / "bad.dem"
+    not_a_demo.write_bytes(b"HL2DEMO\x00" + b"\x00" * 32)
+    with pytest.raises(ValueError, match="Not a CS2 demo"):
+        read_demo_metadata(str(not_a_demo))
+
+
+def test_catalogue_demos(tmp_path):
+    """Test the catalogue lists readable demos and skips broken ones."""
+    write_demo(tmp_path / "g2-vs-heroic-m1-ancient.dem", compressed_info=False)
+    write_demo(tmp_path / "faze-vs-the-mongolz-m2-ancient.dem")
+    (tmp_path / "truncated.dem").write_bytes(b"PBDEMS2\x00")
+    (tmp_path / "cut-off.dem").write_bytes(b"PBDEMS2\x00" + struct.pack("<ii", 0, 0) + b"\x01\x00\x50abc")
+    (tmp_path / "notes.txt").write_text("skip me")
+
+    catalogue = catalogue_demos(str(tmp_path))
+    assert list(catalogue.columns) == CATALOGUE_COLUMNS
+    assert catalogue["file_name"].tolist() == ["faze-vs-the-mongolz-m2-ancient.dem", "g2-vs-heroic-m1-ancient.dem"]
+    assert (catalogue["map_name"] == "de_ancient").all()
+    assert catalogue.loc[0, "team2"] == "the-mongolz"
+    assert catalogue["n_rounds"].tolist() == [3, 3]
+
+
+def test_teams_from_filename():
+    """Test team names are guessed from HLTV-style file names."""
+    assert teams_from_filename("navi-vs-faze-m3-inferno.dem") == ("navi", "faze")
+    assert teams_from_filename("navi-vs-faze-inferno.dem") == ("navi", "faze")
+    assert teams_from_filename("unknown.dem") == (None, None)
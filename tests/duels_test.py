@@ -0,0 +1,62 @@
+import sys
+import os
+
+# Add the project root directory to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)  # Add to the beginning of sys.path
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm project root is added
+
+import pytest
+import pandas as pd
+from code.duels import opening_duels, detect_clutches, round_half
+
+
+@pytest.fixture
+def mock_kills_df():
+    """Fixture for two 3v3 rounds, each won by a 1v3 clutch."""
+    rows = [
+        (1, 100, "B1", "TERRORIST", "A1", "CT"),
+        (1, 200, "B1", "TERRORIST", "A2", "CT"),
+        (1, 300, "A3", "CT", "B1", "TERRORIST"),
+        (1, 400, "A3", "CT", "B2", "TERRORIST"),
+        (1, 500, "A3", "CT", "B3", "TERRORIST"),
+        (2, 1100, "A1", "CT", "B1", "TERRORIST"),
+        (2, 1200, "A1", "CT", "B2", "TERRORIST"),
+        (2, 1300, "B3", "TERRORIST", "A1", "CT"),
+        (2, 1400, "B3", "TERRORIST", "A2", "CT"),
+        (2, 1500, "B3", "TERRORIST", "A3", "CT"),
+    ]
+    columns = ["round", "tick", "attacker_name", "attacker_team_name", "victim_name", "victim_team_name"]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def test_opening_duels(mock_kills_df):
+    """Test the first kill of each round is the opening duel."""
+    openings = opening_duels(mock_kills_df.sample(frac=1, random_state=0))
+    assert openings[["round", "attacker_name", "victim_name"]].values.tolist() == [[1, "B1", "A1"], [2, "A1", "B1"]]
+
+
+def test_detect_clutches(mock_kills_df):
+    """Test clutch detection from alive counts, with and without round winners."""
+    clutches = detect_clutches(mock_kills_df)
+    assert clutches[["round", "player_name", "team_name", "opponents", "won"]].values.tolist() == [
+        [1, "A3", "CT", 3, True],
+        [2, "B3", "TERRORIST", 3, True],
+    ]
+
+    # B3 left alone against A3 in round 1 is part of A3's clutch, not a clutch of its own
+    assert clutches["round"].is_unique
+
+    # Round winners override the elimination fallback, e.g. a clutcher killed after the bomb went off
+    rounds_df = pd.DataFrame({"round": [1, 2], "winner": ["ct", "t"]})
+    assert detect_clutches(mock_kills_df, rounds_df)["won"].tolist() == [True, True]
+    rounds_df = pd.DataFrame({"round": [1, 2], "winner": ["ct", "ct"]})
+    assert detect_clutches(mock_kills_df, rounds_df)["won"].tolist() == [True, False]
+
+    assert detect_clutches(mock_kills_df.iloc[0:0]).empty
+
+
+def test_round_half():
+    """Test MR12 halves and MR3 overtime halves."""
+    assert round_half([1, 12, 13, 24, 25, 27, 28, 31]).tolist() == [0, 0, 1, 1, 2, 2, 3, 4]
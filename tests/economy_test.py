@@ -0,0 +1,82 @@
+import sys
+import os
+
+# Add project root and code folder to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+code_folder = os.path.join(project_root, "code")
+sys.path.insert(0, code_folder)  # Add 'code' directory first
+sys.path.insert(0, project_root)  # Add project root afterward
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm updated paths
+
+import pandas as pd
+from code.economy import snapshot_ticks, classify_buys, parse_economy, join_buy_types
+
+
+class FakeParser:
+    """Stand-in for DemoParser that records which ticks were requested."""
+
+    def __init__(self):
+        self.requested_ticks = None
+
+    def parse_event(self, event_name):
+        ticks = {"round_start": [10, 500, 1000, 1500], "round_freeze_end": [100, 600, 1100]}
+        return pd.DataFrame({"tick": ticks[event_name]})
+
+    def parse_ticks(self, props, ticks):
+        self.requested_ticks = ticks
+        rows = []
+        for tick in ticks:
+            round_number = {10: 1, 100: 1, 500: 2, 600: 2, 1000: 3, 1100: 3}[tick]
+            for steamid, side in [(1, "CT"), (2, "CT"), (3, "TERRORIST"), (4, "TERRORIST")]:
+                equip = {1: 800, 2: 4000 if side == "CT" else 1000, 3: 9000}[round_number]
+                rows.append({"tick": tick, "steamid": steamid, "name": f"p{steamid}", "team_name": side,
+                             "balance": 800 * round_number, "current_equip_value": equip, "armor_value": 100})
+        return pd.DataFrame(rows)
+
+
+def test_snapshot_ticks():
+    """Test round ticks come from the rounds table, or from the round events."""
+    rounds_df = pd.DataFrame({"round": [1, 2], "start": [10, 500], "freeze_end": [100, 600], "end": [400, 900]})
+    assert snapshot_ticks(rounds_df).values.tolist() == [[1, 10, 100], [2, 500, 600]]
+
+    # The last round start never froze out, so it has no snapshot
+    assert snapshot_ticks(parser=FakeParser()).values.tolist() == [[1, 10, 100], [2, 500, 600], [3, 1000, 1100]]
+
+    # Without freeze ends in the rounds table, the events keep its round numbers (here a half-time restart)
+    rounds_df = pd.DataFrame({"round": [12, 13, 14], "start": [10, 500, 1000]})
+    assert snapshot_ticks(rounds_df, FakeParser()).values.tolist() == [[12, 10, 100], [13, 500, 600], [14, 1000, 1100]]
+
+
+def test_parse_economy():
+    """Test only round-start and freeze-end ticks are sampled and buys are classified per side."""
+    parser = FakeParser()
+    buy_types = parse_economy("unused.dem", parser=parser)
+
+    assert sorted(parser.requested_ticks) == [10, 100, 500, 600, 1000, 1100]
+    assert buy_types[["round", "team_name", "buy_type"]].values.tolist() == [
+        [1, "CT", "pistol"], [1, "TERRORIST", "pistol"],
+        [2, "CT", "eco"], [2, "TERRORIST", "eco"],
+        [3, "CT", "force"], [3, "TERRORIST", "force"],
+    ]
+    assert buy_types.loc[2, "start_balance"] == 3200
+    assert buy_types["armor_value"].tolist() == [200] * 6
+
+
+def test_classify_buys_and_join():
+    """Test buy thresholds and the join onto kills."""
+    snapshots = pd.DataFrame({
+        "round": [2] * 4 + [3] * 2,
+        "team_name": ["CT", "CT", "TERRORIST", "TERRORIST", "CT", "TERRORIST"],
+        "start_balance": [0] * 6,
+        "equipment_value": [12000, 9000, 2000, 3000, 25000, 12000],
+    })
+    buy_types = classify_buys(snapshots)
+    assert buy_types["buy_type"].tolist() == ["full", "eco", "full", "force"]
+    assert buy_types["armor_value"].isna().all()
+
+    kills_df = pd.DataFrame({"round": [2, 3, 4], "attacker_team_name": ["CT", "TERRORIST", "CT"], "victim_team_name": ["TERRORIST", "CT", "TERRORIST"]})
+    kills_df = join_buy_types(kills_df, buy_types)
+    assert kills_df["attacker_buy_type"].tolist()[:2] == ["full", "force"]
+    assert kills_df["victim_buy_type"].tolist()[:2] == ["eco", "full"]
+    assert pd.isna(kills_df["attacker_buy_type"].iloc[2])
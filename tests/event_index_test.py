@@ -0,0 +1,51 @@
+import sys
+import os
+
+# Add the project root directory to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)  # Add to the beginning of sys.path
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm project root is added
+
+import pandas as pd
+from code.event_index import (
+    build_round_index,
+    index_game_events,
+    events_in_rounds,
+    events_near,
+    rounds_of_ticks,
+)
+
+ROUNDS = pd.DataFrame({"round": [1, 2, 3], "start": [0, 1000, 2000], "official_end": [999, 1999, 2999], "end": [900, 1900, 2900]})
+
+
+def test_build_round_index():
+    """Test the round table comes from the demo rounds, or from event ticks as a fallback."""
+    round_index = build_round_index(ROUNDS)
+    assert round_index.values.tolist() == [[1, 0, 999], [2, 1000, 1999], [3, 2000, 2999]]
+
+    smokes = pd.DataFrame({"start_tick": [1500, 1200, 2100], "round": [2, 2, 3]})
+    fallback = build_round_index(None, {"smokes": smokes})
+    assert fallback.values.tolist() == [[2, 1200, 1500], [3, 2100, 2100]]
+    assert build_round_index().empty
+
+    assert rounds_of_ticks([-5, 0, 1500, 5000], round_index).tolist() == [1, 1, 2, 3]
+
+
+def test_index_game_events():
+    """Test tables are tick-sorted, tagged with rounds and sliced by binary search."""
+    kills = pd.DataFrame({"tick": [2500, 10, 1500, 1000], "attacker_name": ["D", "A", "C", "B"]})
+    smokes = pd.DataFrame({"start_tick": [2100, 500], "round": [3, 1]})
+    events, round_index = index_game_events({"kills": kills, "smokes": smokes}, ROUNDS)
+
+    assert events["kills"]["attacker_name"].tolist() == ["A", "B", "C", "D"]
+    assert events["kills"]["round"].tolist() == [1, 2, 2, 3]
+    assert events["smokes"]["start_tick"].tolist() == [500, 2100]
+
+    assert events_in_rounds(events["kills"], round_index, 2, 2)["attacker_name"].tolist() == ["B", "C"]
+    assert events_in_rounds(events["kills"], round_index, 2, 3)["attacker_name"].tolist() == ["B", "C", "D"]
+    assert events_in_rounds(events["kills"], round_index, 7, 9).empty
+    assert events_in_rounds(events["smokes"], round_index, 3, 3)["round"].tolist() == [3]
+
+    # 5 s at 64 tick is 320 ticks either side
+    assert events_near(events["kills"], 1300, 5)["attacker_name"].tolist() == ["B", "C"]
@@ -0,0 +1,65 @@
+import sys
+import os
+
+# Add the project root directory to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)  # Add to the beginning of sys.path
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm project root is added
+
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+from code.export import EXPORT_FORMATS, match_tables, write_export, export_archive
+
+
+@pytest.fixture
+def parsed_matches():
+    kills = pd.DataFrame({"tick": range(5), "attacker_name": ["a", "b", None, "d", "e"]})
+    return {
+        "abc123": {
+            "file_name": "g2-vs-heroic-m1-ancient.dem",
+            "game_events": {"kills": kills, "smokes": pd.DataFrame({"start_tick": [1]})},
+            "combined_stats": pd.DataFrame({"player_name": ["a"], "kills": [3]}),
+            "economy": None,
+        }
+    }
+
+
+def test_match_tables(parsed_matches):
+    """Test every event table and stats table is listed under the match's folder."""
+    names = [name for name, _ in match_tables(parsed_matches)]
+    assert names == [
+        "g2-vs-heroic-m1-ancient/kills",
+        "g2-vs-heroic-m1-ancient/smokes",
+        "g2-vs-heroic-m1-ancient/combined_stats",
+    ]
+
+
+@pytest.mark.parametrize("fmt", EXPORT_FORMATS)
+def test_export_archive_round_trip(parsed_matches, fmt):
+    """Test the archive holds every table and reads back unchanged."""
+    archive = zipfile.ZipFile(export_archive(parsed_matches, fmt))
+    assert len(archive.namelist()) == 3
+
+    data = archive.read(f"g2-vs-heroic-m1-ancient/kills.{fmt}")
+    kills = pd.read_csv(io.BytesIO(data)) if fmt == "csv" else pd.read_parquet(io.BytesIO(data))
+    expected = parsed_matches["abc123"]["game_events"]["kills"]
+    assert kills["tick"].tolist() == expected["tick"].tolist()
+    assert kills["attacker_name"].isna().tolist() == expected["attacker_name"].isna().tolist()
+
+
+def test_write_export_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        write_export([], io.BytesIO(), fmt="xlsx")
+
+
+def test_export_archive_is_downloadable(parsed_matches):
+    """Test the archive is a file object Streamlit's download_button can serve."""
+    archive = export_archive(parsed_matches, "csv")
+    data, _ = convert_data_to_bytes_and_infer_mime(archive, TypeError("unsupported type"))
+    archive.close()
+    assert len(zipfile.ZipFile(io.BytesIO(data)).namelist()) == 3
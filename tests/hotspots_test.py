@@ -0,0 +1,93 @@
+import sys
+import os
+
+# Add project root and code folder to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+code_folder = os.path.join(project_root, "code")
+sys.path.insert(0, code_folder)  # Add 'code' directory first
+sys.path.insert(0, project_root)  # Add project root afterward
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm updated paths
+
+import numpy as np
+import pytest
+import pandas as pd
+from code.hotspots import round_phase, hotspot_positions, detect_hotspots, merge_hotspots, HOTSPOT_COLUMNS
+
+
+def test_round_phase():
+    assert round_phase([0, 39.9, 40, 100]).tolist() == ["early", "early", "mid", "late"]
+
+
+def test_hotspot_positions_phases():
+    """Test positions are tagged with side and the phase of their round."""
+    kills_df = pd.DataFrame({
+        "map_name": ["de_nuke"] * 2,
+        "round": [1, 2],
+        "tick": [64 * 10, 10000 + 64 * 90],
+        "attacker_X": [100.0, 200.0], "attacker_Y": [100.0, 200.0], "attacker_team_name": ["CT", "TERRORIST"],
+        "victim_X": [150.0, None], "victim_Y": [150.0, 250.0], "victim_team_name": ["TERRORIST", "CT"],
+    })
+    round_index = pd.DataFrame({"round": [1, 2], "start_tick": [0, 10000], "end_tick": [9000, 20000]})
+    positions = hotspot_positions({"m1": {"kills_df": kills_df, "round_index": round_index}})
+
+    kills = positions[positions["show_option"] == "kills"]
+    assert kills["phase"].tolist() == ["early", "late"]
+    assert kills["side"].tolist() == ["CT", "TERRORIST"]
+    assert len(positions[positions["show_option"] == "deaths"]) == 1  # Missing positions are dropped
+
+
+def test_detect_hotspots_finds_clusters():
+    """Test two dense clusters are found per group with their centroids, and scattered noise is not."""
+    rng = np.random.default_rng(7)
+    frames = []
+    for side in ["CT", "TERRORIST"]:
+        for cx, cy, n in [(-1000, 500, 60), (800, -300, 30)]:
+            frames.append(pd.DataFrame({
+                "map_name": "de_nuke", "show_option": "kills", "side": side, "phase": "early",
+                "X": rng.normal(cx, 20, n), "Y": rng.normal(cy, 20, n),
+            }))
+    noise = pd.DataFrame({
+        "map_name": "de_nuke", "show_option": "kills", "side": "CT", "phase": "early",
+        "X": np.linspace(-4000, 4000, 10), "Y": np.linspace(3000, -3000, 10),
+    })
+    positions = pd.concat(frames + [noise], ignore_index=True)
+
+    hotspots = detect_hotspots(positions)
+    assert list(hotspots.columns) == HOTSPOT_COLUMNS
+    assert len(hotspots) == 4
+    ct = hotspots[hotspots["side"] == "CT"]
+    assert ct["hotspot"].tolist() == [1, 2]
+    assert ct["count"].tolist() == [60, 30]
+    assert np.allclose(ct[["X", "Y"]].to_numpy(), [[-1000, 500], [800, -300]], atol=15)
+    assert np.isclose(ct["share"].iloc[0], 60 / 100)
+
+
+def test_detect_hotspots_empty():
+    positions = pd.DataFrame(columns=["map_name", "show_option", "side", "phase", "X", "Y"])
+    assert detect_hotspots(positions).empty
+
+
+def test_merge_hotspots_matches_pooled_positions():
+    """Test merging stored per-match hotspots finds the hotspots of the pooled positions with their shares."""
+    rng = np.random.default_rng(11)
+
+    def positions(n_cluster, n_noise):
+        return pd.concat([
+            pd.DataFrame({"X": rng.normal(-1000, 20, n_cluster), "Y": rng.normal(500, 20, n_cluster)}),
+            pd.DataFrame({"X": rng.uniform(2000, 3000, n_noise), "Y": rng.uniform(-3000, -2000, n_noise)}),
+        ], ignore_index=True).assign(map_name="de_nuke", show_option="kills", side="CT", phase="early")
+
+    first, second = positions(40, 10), positions(20, 0)
+    parsed_matches = {"m1": {"hotspots": detect_hotspots(first)}, "m2": {"hotspots": detect_hotspots(second)}}
+    merged = merge_hotspots(parsed_matches)
+    pooled = detect_hotspots(pd.concat([first, second], ignore_index=True))
+
+    assert list(merged.columns) == HOTSPOT_COLUMNS
+    assert merged["count"].iloc[0] == pooled["count"].iloc[0] == 60
+    assert merged["share"].iloc[0] == pytest.approx(60 / 70)
+    assert merged["X"].iloc[0] == pytest.approx(pooled["X"].iloc[0])
+
+    # A single match is served as stored, and matches without hotspots are skipped
+    assert merge_hotspots({"m1": parsed_matches["m1"]}) is parsed_matches["m1"]["hotspots"]
+    assert merge_hotspots({"m": {"hotspots": detect_hotspots(first.iloc[:0])}}).empty
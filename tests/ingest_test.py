@@ -0,0 +1,207 @@
+import sys
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root and code folder to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+code_folder = os.path.join(project_root, "code")
+sys.path.insert(0, code_folder)  # Add 'code' directory first
+sys.path.insert(0, project_root)  # Add project root afterward
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm updated paths
+
+import pandas as pd
+import pytest
+import code.ingest as ingest
+from code.ingest import ParseCancelled, ParseJob, parse_demo_in_stages, shared_view, PARSE_STAGES
+from code.parse_cache import load_parsed, load_stage, save_stage
+
+
+def test_parse_demo_in_stages_cancelled():
+    """Test that a set cancel event stops the parse before any stage runs."""
+    cancel_event = threading.Event()
+    cancel_event.set()
+    progress = []
+
+    with pytest.raises(ParseCancelled):
+        parse_demo_in_stages("missing.dem", "missing.dem", lambda stage, f: progress.append(stage), cancel_event)
+    assert progress == []
+
+
+def test_parse_job_reports_progress(monkeypatch):
+    """Test a job runs on the executor, reports each stage and stores the result."""
+    def fake_parse(demo_path, file_name, on_progress, cancel_event, **kwargs):
+        for index, stage in enumerate(PARSE_STAGES):
+            on_progress(stage, (index + 1) / len(PARSE_STAGES))
+        return {"file": file_name}
+
+    monkeypatch.setattr(ingest, "parse_demo_in_stages", fake_parse)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        job = ParseJob("temp.dem", "g2-vs-heroic-m1-ancient.dem").start(executor)
+    assert job.done() and job.status == "done"
+    assert job.stage == PARSE_STAGES[-1] and job.progress == 1.0
+    assert job.result == {"file": "g2-vs-heroic-m1-ancient.dem"}
+
+
+def test_parse_job_failure(monkeypatch):
+    """Test that errors are captured on the job."""
+    def failing_parse(demo_path, file_name, on_progress, cancel_event, **kwargs):
+        raise ValueError("corrupt demo")
+
+    monkeypatch.setattr(ingest, "parse_demo_in_stages", failing_parse)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        job = ParseJob("temp.dem", "bad.dem").start(executor)
+    assert job.status == "failed" and isinstance(job.error, ValueError)
+
+
+def test_parse_job_cancel_queued(monkeypatch):
+    """Test a job cancelled while queued behind a busy worker ends cancelled without ever parsing."""
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def blocking_parse(demo_path, file_name, on_progress, cancel_event, **kwargs):
+        calls.append(file_name)
+        started.set()
+        release.wait(5)
+        return {"file": file_name}
+
+    monkeypatch.setattr(ingest, "parse_demo_in_stages", blocking_parse)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        running = ParseJob("a.dem", "running.dem").start(executor)
+        started.wait(5)
+        queued = ParseJob("b.dem", "queued.dem").start(executor)
+        assert queued.status == "queued"
+        queued.cancel()
+        release.set()
+
+    assert running.status == "done"
+    assert queued.status == "cancelled" and queued.done()
+    assert calls == ["running.dem"]
+
+
+def test_parse_job_uses_parse_cache(monkeypatch, tmp_path):
+    """Test a job with a demo ID hands its cache folder to the pipeline and stores the result once."""
+    calls = []
+    kills_df = pd.DataFrame({"round": [1, 2]})
+
+    def fake_parse(demo_path, file_name, on_progress, cancel_event, demo_id=None, cache_dir=None):
+        calls.append((demo_id, cache_dir))
+        save_stage(demo_id, "economy", "key", {"economy": None, "kills_df": kills_df}, {}, cache_dir)
+        return {"kills_df": kills_df}
+
+    monkeypatch.setattr(ingest, "parse_demo_in_stages", fake_parse)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        job = ParseJob("temp.dem", "a.dem", demo_id="abc123", cache_dir=str(tmp_path)).start(executor)
+
+    assert job.status == "done"
+    assert calls == [("abc123", str(tmp_path))]
+    loaded = load_parsed("abc123", str(tmp_path))
+    assert loaded["file_name"] == "a.dem" and loaded["kills_df"].equals(kills_df)
+
+    # The entry points at the economy stage's kills table instead of writing a second copy
+    assert not list(tmp_path.glob("abc123/g-*/kills_df.arrow"))
+    assert len(list(tmp_path.glob("abc123/stages/economy/g-*/kills_df.arrow"))) == 1
+
+
+def test_cancelled_job_stores_nothing(monkeypatch, tmp_path):
+    """Test a job cancelled while a stage runs writes neither later stage outputs nor its cache entry."""
+    def cancelled_mid_stage(demo_path, file_name, on_progress, cancel_event, demo_id=None, cache_dir=None):
+        store = ingest._JobStageStore(demo_id, cache_dir, cancel_event)
+        store.save("header", "key", {"header": {"map_name": "de_ancient"}}, {})
+        cancel_event.set()  # The last session cancels while 'events' runs
+        store.save("events", "key", {"demo_tables": {}}, {})
+        return {"header": {"map_name": "de_ancient"}}
+
+    def cancelled_last_stage(demo_path, file_name, on_progress, cancel_event, demo_id=None, cache_dir=None):
+        cancel_event.set()
+        return {"header": {"map_name": "de_ancient"}}
+
+    for fake_parse in [cancelled_mid_stage, cancelled_last_stage]:
+        monkeypatch.setattr(ingest, "parse_demo_in_stages", fake_parse)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            job = ParseJob("temp.dem", "a.dem", demo_id="abc123", cache_dir=str(tmp_path)).start(executor)
+        assert job.status == "cancelled"
+        assert load_parsed("abc123", str(tmp_path)) is None
+
+    assert load_stage("abc123", "header", str(tmp_path)) is not None
+    assert load_stage("abc123", "events", str(tmp_path)) is None
+
+
+def test_submit_parse_job_single_flight(monkeypatch):
+    """Test concurrent submits of one demo share a single parse, and one session cancelling does not stop it."""
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_parse(demo_path, file_name, on_progress, cancel_event, **kwargs):
+        calls.append(file_name)
+        started.set()
+        release.wait(5)
+        return {"file": file_name}
+
+    monkeypatch.setattr(ingest, "parse_demo_in_stages", slow_parse)
+    monkeypatch.setattr(ingest, "_shared_jobs", OrderedDict())
+    monkeypatch.setattr(ingest, "save_parsed", lambda demo_id, parsed_data, cache_dir, **kwargs: None)
+    monkeypatch.setattr(ingest, "save_document", lambda document, cache_dir: None)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = ingest.submit_parse_job("a.dem", "final.dem", executor, demo_id="abc123", session="tab-1")
+        started.wait(5)
+        second = ingest.submit_parse_job("b.dem", "final-copy.dem", executor, demo_id="abc123", session="tab-2")
+        # Repeated clicks of the second tab's cancel button still withdraw only that tab
+        second.cancel("tab-2")
+        second.cancel("tab-2")
+        release.set()
+
+    assert second is first
+    assert calls == ["final.dem"]
+    assert first.status == "done" and not first._cancel_event.is_set()
+
+
+def test_submit_parse_job_after_cancel(monkeypatch):
+    """Test a submit while the only session's cancel is winding the job down starts a fresh job."""
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_parse(demo_path, file_name, on_progress, cancel_event, **kwargs):
+        calls.append(file_name)
+        started.set()
+        release.wait(5)
+        if cancel_event.is_set():
+            raise ParseCancelled(file_name)
+        return {"file": file_name}
+
+    monkeypatch.setattr(ingest, "parse_demo_in_stages", slow_parse)
+    monkeypatch.setattr(ingest, "_shared_jobs", OrderedDict())
+    monkeypatch.setattr(ingest, "save_parsed", lambda demo_id, parsed_data, cache_dir, **kwargs: None)
+    monkeypatch.setattr(ingest, "save_document", lambda document, cache_dir: None)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = ingest.submit_parse_job("a.dem", "final.dem", executor, demo_id="abc123", session="tab-1")
+        started.wait(5)
+        first.cancel("tab-1")
+        second = ingest.submit_parse_job("a.dem", "final.dem", executor, demo_id="abc123", session="tab-2")
+        # A cancel from a session that never joined the new job does nothing
+        second.cancel("tab-1")
+        release.set()
+
+    assert second is not first
+    assert calls == ["final.dem", "final.dem"]
+    assert first.status == "cancelled" and second.status == "done"
+
+
+def test_shared_view_copy_on_write():
+    """Test a session changing its view leaves the shared result untouched."""
+    shared = {"kills_df": pd.DataFrame({"round": [1, 2]}), "game_events": {"kills": pd.DataFrame({"tick": [5]})}}
+    view = shared_view(shared)
+    view["kills_df"]["round"] = [7, 8]
+    view["kills_df"].loc[0, "round"] = 9
+    view["game_events"]["kills"]["zone"] = "A Site"
+
+    assert shared["kills_df"]["round"].tolist() == [1, 2]
+    assert "zone" not in shared["game_events"]["kills"].columns
@@ -4,16 +4,22 @@ import pandas as pd
 import sys
 import os
 
-# Add the project root directory to PYTHONPATH
+# Add project root and code folder to PYTHONPATH
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-sys.path.insert(0, project_root)  # Add to the beginning of sys.path
+code_folder = os.path.join(project_root, "code")
+sys.path.insert(0, code_folder)  # Add 'code' directory first
+sys.path.insert(0, project_root)  # Add project root afterward
 
-print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm project root is added
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm updated paths
 
 from code.map_viz import (
     extract_map_name_from_filename,
     generate_map_visuals,
-    get_available_maps
+    get_available_maps,
+    collect_map_points,
+    build_position_index,
+    MapHistogram,
+    merge_map_histograms,
 )
 import matplotlib.figure
 
@@ -75,3 +81,55 @@ def test_get_available_maps(mock_matches_data):
     """Test retrieving available maps from match data."""
     available_maps = get_available_maps(mock_matches_data)
     assert available_maps == ["de_ancient", "de_inferno"]
+
+
+def test_collect_map_points(mock_matches_data):
+    """Test positions are collected per clan and can be filtered by area through the index."""
+    points = collect_map_points(mock_matches_data, "de_ancient", "deaths")
+    assert points[["X", "Y"]].values.tolist() == [[400, 450], [300, 350]]
+    assert points["clan_name"].tolist() == ["ClanA", "ClanB"]
+    assert points["clan"].tolist() == [1, 2]
+
+    index = build_position_index(points)
+    assert points.iloc[index.query_rect(250, 300, 350, 400)]["clan_name"].tolist() == ["ClanB"]
+
+    # Maps with a single clan have nothing to compare
+    assert collect_map_points(mock_matches_data, "de_inferno", "kills").empty
+
+
+def test_map_histogram_merge():
+    """Test per-demo histograms count by clan and side and sum across demos."""
+    kills_df = pd.DataFrame({
+        "map_name": ["de_ancient"] * 3,
+        "attacker_team_clan_name": ["ClanA", "ClanA", "ClanB"],
+        "attacker_team_name": ["CT", "TERRORIST", "TERRORIST"],
+        "victim_team_clan_name": ["ClanB", "ClanB", "ClanA"],
+        "victim_team_name": ["TERRORIST", "CT", "CT"],
+        "attacker_X": [100, 100, -2000],
+        "attacker_Y": [150, 150, 900],
+        "victim_X": [300, 400, 99999],  # Off the grid, not counted
+        "victim_Y": [350, 450, 0],
+    })
+    histogram = MapHistogram.from_kills(kills_df)
+    assert histogram.map_name == "de_ancient"
+    assert histogram.clans() == ["ClanA", "ClanB"]
+    assert histogram.grid("kills", clan="ClanA").sum() == 2
+    assert histogram.grid("kills", clan="ClanA", side="CT").sum() == 1
+    assert histogram.grid("deaths").sum() == 2
+
+    # Both ClanA kills land in the same cell
+    assert histogram.grid("kills", clan="ClanA").max() == 2
+
+    merged = histogram.merge(MapHistogram.from_kills(kills_df))
+    assert merged.grid("kills").sum() == 6
+    assert (merged.grid("kills") == 2 * histogram.grid("kills")).all()
+
+    with pytest.raises(ValueError):
+        histogram.merge(MapHistogram("de_inferno"))
+
+    parsed_matches = {
+        name: {"kills_df": kills_df, "map_histogram": histogram} for name in ["match1", "match2"]
+    }
+    clan1_grid, clan2_grid, clan1, clan2 = merge_map_histograms(parsed_matches, "de_ancient", "kills", side="TERRORIST")
+    assert (clan1, clan2) == ("ClanA", "ClanB")
+    assert clan1_grid.sum() == 2 and clan2_grid.sum() == 2
@@ -0,0 +1,78 @@
+import sys
+import os
+import urllib.request
+
+# Add project root and code folder to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+code_folder = os.path.join(project_root, "code")
+sys.path.insert(0, code_folder)  # Add 'code' directory first
+sys.path.insert(0, project_root)  # Add project root afterward
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm updated paths
+
+import pytest
+from code.metrics import Counter, Histogram, Registry, serve_metrics, write_metrics
+
+
+def test_counter_and_histogram_render():
+    """Test counters and histograms render as Prometheus text with cumulative buckets."""
+    registry = Registry()
+    hits = Counter("cache_requests", "Cache lookups.", ["cache", "result"], registry=registry)
+    rows = Histogram("event_rows", 'Rows per "table".', ["table"], buckets=[10, 100], registry=registry)
+
+    hits.inc(cache="stage", result="hit")
+    hits.inc(2, cache="stage", result="hit")
+    for value in [5, 10, 50, 500]:
+        rows.observe(value, table="kills")
+
+    assert hits.value(cache="stage", result="hit") == 3
+    assert rows.count(table="kills") == 4
+    assert registry.render().splitlines() == [
+        "# HELP cache_requests Cache lookups.",
+        "# TYPE cache_requests counter",
+        'cache_requests_total{cache="stage",result="hit"} 3',
+        '# HELP event_rows Rows per \\"table\\".',
+        "# TYPE event_rows histogram",
+        'event_rows_bucket{table="kills",le="10"} 2',
+        'event_rows_bucket{table="kills",le="100"} 3',
+        'event_rows_bucket{table="kills",le="+Inf"} 4',
+        'event_rows_sum{table="kills"} 565',
+        'event_rows_count{table="kills"} 4',
+    ]
+
+
+def test_metric_validation():
+    """Test wrong labels, negative increments and duplicate names are rejected."""
+    registry = Registry()
+    hits = Counter("hits", "Hits.", ["cache"], registry=registry)
+    with pytest.raises(ValueError):
+        hits.inc(result="hit")
+    with pytest.raises(ValueError):
+        hits.inc(-1, cache="stage")
+    with pytest.raises(ValueError):
+        Counter("hits", "Hits again.", registry=registry)
+
+
+def test_histogram_time_and_file_dump(tmp_path):
+    """Test timing a block observes it even when it raises, and the dump holds the rendered metrics."""
+    registry = Registry()
+    seconds = Histogram("render_seconds", "Render time.", ["function"], registry=registry)
+    with seconds.time(function="plot"):
+        pass
+    with pytest.raises(KeyError):
+        with seconds.time(function="plot"):
+            raise KeyError("missing column")
+    assert seconds.count(function="plot") == 2
+
+    path = write_metrics(str(tmp_path / "metrics" / "ealytics.prom"), registry)
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == registry.render()
+
+
+def test_serve_metrics():
+    """Test the metrics server answers /metrics and is started once per process."""
+    server = serve_metrics(0)
+    assert serve_metrics(0) is server
+    with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics") as response:
+        assert response.status == 200
+        assert "# TYPE ealytics_render_seconds histogram" in response.read().decode("utf-8")
@@ -0,0 +1,89 @@
+import sys
+import os
+
+# Add project root and code folder to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+code_folder = os.path.join(project_root, "code")
+sys.path.insert(0, code_folder)  # Add 'code' directory first
+sys.path.insert(0, project_root)  # Add project root afterward
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm updated paths
+
+import pandas as pd
+import pytest
+from code.pipeline import Pipeline, Stage, StageStore, fingerprint
+
+
+def make_stages(calls, rounds_version=1, scale=1):
+    """A three-stage pipeline: kills -> rounds -> summary, recording every stage run in calls."""
+    def kills(demo_path):
+        calls.append("kills")
+        return {"kills": pd.DataFrame({"round": [1, 1, 2], "damage": [100, 100, 100 * scale]})}
+
+    def rounds(kills):
+        calls.append("rounds")
+        return {"rounds": kills.groupby("round", as_index=False)["damage"].sum()}
+
+    def summary(rounds):
+        calls.append("summary")
+        return {"summary": int(rounds["damage"].sum())}
+
+    return [
+        Stage("kills", ["demo_path"], ["kills"], kills),
+        Stage("rounds", ["kills"], ["rounds"], rounds, version=rounds_version),
+        Stage("summary", ["rounds"], ["summary"], summary),
+    ]
+
+
+def test_pipeline_reuses_stored_stages(tmp_path):
+    """Test a second run reads every stage back, and a version bump re-runs only what changed."""
+    store = StageStore("abc123", str(tmp_path))
+    calls = []
+    values, ran = Pipeline(make_stages(calls)).run({"demo_path": "a.dem"}, store, {"demo_path": "abc123"})
+    assert ran == ["kills", "rounds", "summary"] and values["summary"] == 300
+
+    calls.clear()
+    values, ran = Pipeline(make_stages(calls)).run({"demo_path": "moved/a.dem"}, store, {"demo_path": "abc123"})
+    assert ran == [] and calls == []
+    pd.testing.assert_frame_equal(values["rounds"], pd.DataFrame({"round": [1, 2], "damage": [200, 100]}))
+
+    # 'rounds' produces the same table under its new version, so 'summary' stays cached (early cutoff)
+    values, ran = Pipeline(make_stages(calls, rounds_version=2)).run({"demo_path": "a.dem"}, store, {"demo_path": "abc123"})
+    assert ran == ["rounds"] and values["summary"] == 300
+
+
+def test_pipeline_reruns_downstream_of_changed_input(tmp_path):
+    """Test a changed source re-runs every stage depending on it, and without a store everything runs."""
+    store = StageStore("abc123", str(tmp_path))
+    calls = []
+    Pipeline(make_stages(calls)).run({"demo_path": "a.dem"}, store, {"demo_path": "abc123"})
+
+    _, ran = Pipeline(make_stages(calls, scale=2)).run({"demo_path": "a.dem"}, store, {"demo_path": "def456"})
+    assert ran == ["kills", "rounds", "summary"]
+
+    _, ran = Pipeline(make_stages(calls)).run({"demo_path": "a.dem"})
+    assert ran == ["kills", "rounds", "summary"]
+
+
+def test_pipeline_orders_and_validates_stages():
+    """Test stages are run in dependency order, and cycles, duplicate outputs and missing sources are rejected."""
+    stages = make_stages([])
+    pipeline = Pipeline([stages[2], stages[0], stages[1]])
+    assert [stage.name for stage in pipeline.stages] == ["kills", "rounds", "summary"]
+    assert pipeline.sources == ["demo_path"]
+
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", ["b"], ["a"], None), Stage("b", ["a"], ["b"], None)])
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", [], ["x"], None), Stage("b", [], ["x"], None)])
+    with pytest.raises(ValueError):
+        pipeline.run({})
+
+
+def test_fingerprint():
+    """Test fingerprints follow content, not identity."""
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+    assert fingerprint(df) == fingerprint(df.copy())
+    assert fingerprint(df) != fingerprint(df.assign(a=[1, 3]))
+    assert fingerprint({"kills": df, "n": 1}) == fingerprint({"n": 1, "kills": df.copy()})
+    assert fingerprint(pd.DataFrame({"a": [[1], [2]]})) == fingerprint(pd.DataFrame({"a": [[1], [2]]}))
@@ -0,0 +1,149 @@
+import sys
+import os
+
+# Add the project root directory to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)  # Add to the beginning of sys.path
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm project root is added
+
+import pytest
+import pandas as pd
+from code.player_rounds import (
+    mark_traded_deaths,
+    build_player_round_facts,
+    filter_player_rounds,
+    aggregate_player_stats,
+    compute_combined_stats,
+    COMBINED_STATS_COLUMNS
+)
+
+
+@pytest.fixture
+def mock_kills_df():
+    """Fixture for a two-round kills DataFrame."""
+    data = {
+        "tick": [100, 150, 400, 1000, 1100],
+        "round": [1, 1, 1, 2, 2],
+        "attacker_name": ["A1", "B1", "A2", "B2", "B2"],
+        "attacker_steamid": [1, 11, 2, 12, 12],
+        "attacker_team_name": ["CT", "TERRORIST", "CT", "TERRORIST", "TERRORIST"],
+        "attacker_team_clan_name": ["ClanA", "ClanB", "ClanA", "ClanB", "ClanB"],
+        "victim_name": ["B2", "A1", "B1", "A1", "A2"],
+        "victim_steamid": [12, 1, 11, 1, 2],
+        "victim_team_name": ["TERRORIST", "CT", "TERRORIST", "CT", "CT"],
+        "victim_team_clan_name": ["ClanB", "ClanA", "ClanB", "ClanA", "ClanA"],
+        "assister_name": [None, "B2", "A1", None, None],
+        "assister_steamid": [None, 12, 1, None, None],
+        "assister_team_name": [None, "TERRORIST", "CT", None, None],
+        "assister_team_clan_name": [None, "ClanB", "ClanA", None, None],
+    }
+    return pd.DataFrame(data)
+
+
+@pytest.fixture
+def mock_damages_df():
+    """Fixture for a damages DataFrame matching the kills fixture."""
+    data = {
+        "round": [1, 1, 2],
+        "attacker_name": ["A1", "A1", "B2"],
+        "attacker_steamid": [1, 1, 12],
+        "attacker_team_name": ["CT", "CT", "TERRORIST"],
+        "attacker_team_clan_name": ["ClanA", "ClanA", "ClanB"],
+        "dmg_health_real": [40, 60, 100],
+    }
+    return pd.DataFrame(data)
+
+
+def test_mark_traded_deaths(mock_kills_df):
+    """Test that a death is traded when the killer dies inside the window."""
+    traded = mark_traded_deaths(mock_kills_df, tickrate=64, trade_seconds=3.0)
+    assert traded.tolist() == [True, False, False, False, False]
+
+    # A window shorter than the 50 tick gap means nothing is traded
+    assert not mark_traded_deaths(mock_kills_df, tickrate=64, trade_seconds=0.5).any()
+
+
+def test_build_player_round_facts(mock_kills_df, mock_damages_df):
+    """Test the per-player-per-round fact table."""
+    facts = build_player_round_facts(mock_kills_df, mock_damages_df)
+
+    assert len(facts) == 7, "Expected one row per player per round played"
+    a1_round1 = facts[(facts["player_name"] == "A1") & (facts["round"] == 1)].iloc[0]
+    assert a1_round1["kills"] == 1
+    assert a1_round1["assists"] == 1
+    assert a1_round1["deaths"] == 1
+    assert a1_round1["damage"] == 100
+    assert bool(a1_round1["kast"])
+
+    b2_round1 = facts[(facts["player_name"] == "B2") & (facts["round"] == 1)].iloc[0]
+    assert bool(b2_round1["traded"]) and not bool(b2_round1["survived"])
+
+
+def test_aggregate_player_stats(mock_kills_df, mock_damages_df):
+    """Test aggregating facts into KAST, ADR and Rating 2.0 per side and 'Both'."""
+    facts = build_player_round_facts(mock_kills_df, mock_damages_df)
+    stats = aggregate_player_stats(facts)
+
+    assert set(stats["team_name"]) == {"CT", "TERRORIST", "Both"}
+    a1 = stats[(stats["player_name"] == "A1") & (stats["team_name"] == "Both")].iloc[0]
+    assert a1["n_rounds"] == 2
+    assert a1["kast_percentage"] == 50.0
+    assert a1["average_damage_per_round"] == 50.0
+    assert "rating_2.0" in stats.columns and "impact" in stats.columns
+
+    # B1 avenged B2 in round 1, on the T side
+    b1 = stats[(stats["player_name"] == "B1") & (stats["team_name"] == "TERRORIST")].iloc[0]
+    b2 = stats[(stats["player_name"] == "B2") & (stats["team_name"] == "TERRORIST")].iloc[0]
+    assert (b1["trade_kills"], b2["traded_deaths"]) == (1, 1)
+
+    # A1 won round 1's opening duel, B2 won round 2's
+    a1 = stats[(stats["player_name"] == "A1") & (stats["team_name"] == "Both")].iloc[0]
+    assert (a1["opening_kills"], a1["opening_deaths"]) == (1, 1)
+
+    # B1 was left 1v2 after B2's death in round 1 and A2 1v2 after A1's in round 2, both lost
+    clutches = stats.loc[stats["clutch_attempts"] > 0, ["player_name", "team_name", "clutch_attempts", "clutch_wins"]]
+    assert sorted(clutches.values.tolist()) == [
+        ["A2", "Both", 1, 0], ["A2", "CT", 1, 0], ["B1", "Both", 1, 0], ["B1", "TERRORIST", 1, 0],
+    ]
+
+
+def test_clutches_use_tick_roster(mock_kills_df):
+    """Test a player who never killed or died still counts towards the alive players of their side."""
+    ticks = pd.DataFrame({
+        "round": [1, 1, 1, 1, 2, 2, 2, 2, 2],
+        "name": ["A1", "A2", "B1", "B2", "A1", "A2", "A3", "B1", "B2"],
+        "team_name": ["CT", "CT", "TERRORIST", "TERRORIST", "CT", "CT", "CT", "TERRORIST", "TERRORIST"],
+    })
+    rounds_df = pd.DataFrame({"round": [1, 2], "winner": ["ct", "ct"]})
+    facts = build_player_round_facts(mock_kills_df, ticks_df=ticks, rounds_df=rounds_df)
+
+    # A3 was alive in round 2, so A2 was never alone; A3 was, after A2 died, and CT won the round
+    clutches = facts.loc[facts["clutch_attempts"] > 0, ["player_name", "round", "clutch_attempts", "clutch_wins"]]
+    assert sorted(clutches.values.tolist()) == [["A3", 2, 1, 1], ["B1", 1, 1, 0]]
+
+
+def test_filter_player_rounds(mock_kills_df):
+    """Test filtering facts by round range and pistol rounds."""
+    facts = build_player_round_facts(mock_kills_df)
+
+    assert set(filter_player_rounds(facts, round_range=(2, 2))["round"]) == {2}
+    assert set(filter_player_rounds(facts, pistol_only=True)["round"]) == {1}
+
+    facts["map_name"] = "de_ancient"
+    assert filter_player_rounds(facts, map_names=["de_nuke"]).empty
+
+
+def test_compute_combined_stats(mock_kills_df, mock_damages_df):
+    """Test the single-pass engine returns the combined_stats schema."""
+    combined_stats, facts = compute_combined_stats(mock_kills_df, mock_damages_df)
+
+    assert list(combined_stats.columns) == COMBINED_STATS_COLUMNS
+    assert len(facts) == 7
+
+    # Kills, assists and deaths on 'Both' add up to the per-side rows
+    both = combined_stats[combined_stats["team_name"] == "Both"]
+    sides = combined_stats[combined_stats["team_name"] != "Both"]
+    for col in ["kills", "assists", "deaths", "total_damage"]:
+        assert both[col].sum() == sides[col].sum()
+    assert both["kills"].sum() == len(mock_kills_df)
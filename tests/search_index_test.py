@@ -0,0 +1,95 @@
+import sys
+import os
+
+# Add project root and code folder to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+code_folder = os.path.join(project_root, "code")
+sys.path.insert(0, code_folder)  # Add 'code' directory first
+sys.path.insert(0, project_root)  # Add project root afterward
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm updated paths
+
+import pandas as pd
+import pytest
+from code.search_index import (
+    SearchIndex,
+    demo_document,
+    load_documents,
+    load_search_index,
+    save_document,
+    team_key,
+)
+
+
+def parsed(file_name, map_name, clans, players):
+    return {
+        "file_name": file_name,
+        "kills_df": pd.DataFrame({
+            "map_name": [map_name] * 2,
+            "attacker_team_clan_name": clans,
+            "victim_team_clan_name": clans[::-1],
+            "attacker_name": players[:2],
+            "victim_name": players[2:],
+            "attacker_steamid": [76561198000000001, 76561198000000002],
+        }),
+    }
+
+
+@pytest.fixture
+def documents():
+    return {
+        "d1": demo_document("d1", parsed("spirit-vs-faze-m1-nuke.dem", "de_nuke", ["Team Spirit", "FaZe Clan"], ["donk", "zont1x", "ropz", "broky"]), "cache/d1.dem"),
+        "d2": demo_document("d2", parsed("spirit-vs-faze-m2-mirage.dem", "de_mirage", ["Team Spirit", "FaZe Clan"], ["donk", "sh1ro", "frozen", "rain"])),
+        "d3": demo_document("d3", parsed("g2-vs-mouz-m1-nuke.dem", "de_nuke", ["G2 Esports", "MOUZ"], ["m0NESY", "NiKo", "torzsi", "xertioN"])),
+    }
+
+
+@pytest.fixture
+def matches_df():
+    return pd.DataFrame({
+        "Tournament": ["Perfect World Shanghai Major 2024", "BLAST Premier World Final 2024"],
+        "Team 1": ["Spirit", "G2"],
+        "Team 2": ["FaZe", "MOUZ"],
+    })
+
+
+def test_demo_document(documents):
+    """Test documents collect the map, teams, players and steamids of a demo."""
+    document = documents["d1"]
+    assert document["map_name"] == "de_nuke"
+    assert document["teams"] == ["FaZe Clan", "Team Spirit"]
+    assert document["players"] == ["broky", "donk", "ropz", "zont1x"]
+    assert document["steamids"] == ["76561198000000001", "76561198000000002"]
+    assert document["demo_path"] == "cache/d1.dem"
+
+
+def test_team_key():
+    assert team_key("Team Spirit") == team_key("Spirit") == "spirit"
+    assert team_key("G2 Esports") == "g2"
+    assert team_key("Team") == "team"
+
+
+def test_search_fields_prefixes_and_tournaments(documents, matches_df):
+    """Test field-restricted, bare, prefix and tournament queries."""
+    index = SearchIndex(documents, matches_df)
+    assert index.search("player:donk") == ["d1", "d2"]
+    assert index.search("player:donk map:nuke") == ["d1"]
+    assert index.search("nuke") == ["d3", "d1"]  # Sorted by file name
+    assert index.search("player:m0n") == ["d3"]  # Prefix match
+    assert index.search("tournament:shanghai") == ["d1", "d2"]
+    assert index.search("blast mouz") == ["d3"]
+    assert index.search("steamid:76561198000000002") == ["d3", "d1", "d2"]
+    assert index.search("team:spirit player:niko") == []
+    assert index.search("player") == []  # Field names are not tokens
+    assert index.search("") == []
+
+
+def test_documents_round_trip(tmp_path, documents):
+    """Test documents saved at ingest are indexed by load_search_index."""
+    for document in documents.values():
+        save_document(document, str(tmp_path))
+    save_document(documents["d1"], str(tmp_path))  # Re-parsing replaces the document
+
+    assert sorted(load_documents(str(tmp_path))) == ["d1", "d2", "d3"]
+    index = load_search_index(str(tmp_path), matches_file=str(tmp_path / "missing.csv"))
+    assert index.search("mirage") == ["d2"]
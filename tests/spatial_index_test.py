@@ -0,0 +1,58 @@
+import sys
+import os
+
+# Add the project root directory to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)  # Add to the beginning of sys.path
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm project root is added
+
+import numpy as np
+from code.spatial_index import SpatialGridIndex, points_in_polygon
+
+
+def random_positions(n=5000):
+    rng = np.random.default_rng(7)
+    x = rng.uniform(-2500, 2000, n)
+    y = rng.uniform(-1200, 3000, n)
+    x[:3] = np.nan  # Positions missing from the demo are never returned
+    return x, y
+
+
+def test_query_rect_matches_full_scan():
+    """Test rectangle queries return the same rows as scanning every point."""
+    x, y = random_positions()
+    index = SpatialGridIndex(x, y)
+    assert len(index) == len(x) - 3
+
+    for bounds in [(-500, 0, 300, 900), (-5000, -5000, 5000, 5000), (100, 100, 100.5, 100.5), (3000, 0, 4000, 100)]:
+        x_min, y_min, x_max, y_max = bounds
+        expected = np.flatnonzero((x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max))
+        assert np.array_equal(index.query_rect(*bounds), expected)
+
+
+def test_query_polygon_matches_full_scan():
+    """Test polygon queries agree with the plain point-in-polygon test."""
+    x, y = random_positions()
+    index = SpatialGridIndex(x, y)
+    polygon = np.array([[0, 0], [1000, 0], [1000, 1000], [500, 1500], [0, 1000]])
+
+    expected = np.flatnonzero(points_in_polygon(np.nan_to_num(x, nan=1e9), y, polygon))
+    assert np.array_equal(index.query_polygon(polygon), expected)
+    assert points_in_polygon([500, 500, 2000], [500, 1600, 500], polygon).tolist() == [True, False, False]
+
+
+def test_nearest_matches_full_scan():
+    """Test nearest-neighbour queries inside and outside the indexed area."""
+    x, y = random_positions()
+    index = SpatialGridIndex(x, y)
+    distances = lambda qx, qy: np.nan_to_num(np.hypot(x - qx, y - qy), nan=np.inf)
+
+    for qx, qy, k in [(0, 0, 1), (-2400, 2900, 5), (9000, -9000, 3)]:
+        rows, found = index.nearest(qx, qy, k)
+        assert np.allclose(found, np.sort(distances(qx, qy))[:k])
+        assert np.allclose(distances(qx, qy)[rows], found)
+
+    empty = SpatialGridIndex([], [])
+    assert len(empty.query_rect(0, 0, 1, 1)) == 0
+    assert len(empty.nearest(0, 0)[0]) == 0
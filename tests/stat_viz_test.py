@@ -12,7 +12,8 @@ import pandas as pd
 from code.stat_viz import (
     generate_kill_details,
     process_kills_data,
-    combine_heatmaps
+    combine_heatmaps,
+    HeadToHead
 )
 
 
@@ -83,3 +84,46 @@ def test_combine_heatmaps(mock_kills_df):
     assert isinstance(team2_data, pd.DataFrame)
     assert team1_data.sum().sum() == 4, "Combined kills count for Team 1 is incorrect"
     assert team2_data.sum().sum() == 4, "Combined kills count for Team 2 is incorrect"
+
+
+def test_head_to_head(mock_kills_df):
+    """Test sparse head-to-head counts, submatrix selection and lazy kill details."""
+    kills_df = pd.concat([mock_kills_df, mock_kills_df.iloc[:1]], ignore_index=True)
+    head_to_head = HeadToHead(kills_df)
+
+    # Only pairs that met are stored
+    assert len(head_to_head.pair_keys) == 4
+    assert head_to_head.team_players("ClanA") == (["Player1", "Player2"], ["Player3", "Player4"])
+
+    matrix = head_to_head.matrix(["Player1"], ["Player3", "Player4"])
+    assert matrix.values.tolist() == [[2, 0]]
+
+    hover = head_to_head.hover_matrix(matrix)
+    assert hover.loc["Player1", "Player3"] == generate_kill_details(kills_df.iloc[[0, 4]])
+    assert hover.loc["Player1", "Player4"] == ""
+    assert head_to_head.pair_kills("Player3", "Player4").empty
+
+    # Player selection limits the rendered matrices
+    (team1_data, team1_hover), _ = process_kills_data(kills_df, players=["Player1", "Player3"])
+    assert team1_data.shape == (1, 1)
+
+
+def test_compact_summaries(mock_kills_df):
+    """Test compact mode sends a short top weapon and headshot summary per cell."""
+    kills_df = pd.concat([mock_kills_df, mock_kills_df.iloc[:1].assign(weapon="AWP", headshot=False)], ignore_index=True)
+    (team1_data, team1_summary), _ = process_kills_data(kills_df, compact=True)
+
+    assert team1_summary.loc["Player1", "Player3"] == "AK-47, 50% HS"
+    assert team1_summary.loc["Player2", "Player4"] == "M4A4, 0% HS"
+    assert team1_summary.loc["Player1", "Player4"] == ""
+    assert team1_summary.shape == team1_data.shape
+
+
+def test_compact_summary_ties_and_missing_headshots(mock_kills_df):
+    """Test a weapon tie goes to the pair's first weapon, not the first weapon overall, and missing headshots count as none."""
+    kills_df = mock_kills_df.astype({"headshot": object})
+    extra = kills_df.iloc[[1]].assign(weapon="AK-47", headshot=None)
+    (_, team1_summary), _ = process_kills_data(pd.concat([kills_df, extra], ignore_index=True), compact=True)
+
+    assert team1_summary.loc["Player2", "Player4"] == "M4A4, 0% HS"
+    assert team1_summary.loc["Player1", "Player3"] == "AK-47, 100% HS"
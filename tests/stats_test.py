@@ -3,6 +3,8 @@ import os
 import glob
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+code_folder = os.path.join(project_root, "code")
+sys.path.insert(0, code_folder)  # Add 'code' directory first
 sys.path.insert(0, project_root)  # Add to the beginning of sys.path
 
 print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm project root is added
@@ -42,8 +44,9 @@ def test_parse_demo_file(mock_demo_file):
     """Test parsing a demo file and validating combined stats."""
     result = parse_demo_file(mock_demo_file)
 
-    # Ensure 'combined_stats' and 'kills_df' are returned
+    # Ensure 'combined_stats', 'kills_df' and 'player_round_facts' are returned
     assert 'combined_stats' in result and 'kills_df' in result
+    assert 'player_round_facts' in result
     assert isinstance(result['combined_stats'], pd.DataFrame)
     assert isinstance(result['kills_df'], pd.DataFrame)
 
@@ -0,0 +1,45 @@
+import sys
+import os
+
+# Add the project root directory to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)  # Add to the beginning of sys.path
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm project root is added
+
+import numpy as np
+import pandas as pd
+from code.trades import detect_trades
+
+
+def test_detect_trades():
+    """Test trade flags, the avenged kill and the time to trade."""
+    kills_df = pd.DataFrame({
+        "tick": [100, 150, 160, 400, 420],
+        "round": [1, 1, 1, 1, 2],
+        "attacker_name": ["A1", "B1", "B1", "A2", "B3"],
+        "victim_name": ["B2", "A1", "A3", "B1", "A2"],
+    }, index=[10, 11, 12, 13, 14])
+
+    trades = detect_trades(kills_df, tickrate=64, trade_seconds=3.0)
+
+    # A1 killed B2 and died 50 ticks later; B1's later death is outside the window
+    assert trades["is_traded"].tolist() == [True, False, False, False, False]
+    assert trades.loc[11, "trade_of"] == 10
+    assert trades["trade_of"].isna().sum() == 4
+    assert trades.loc[10, "time_to_trade"] == 50 / 64
+    assert np.isnan(trades.loc[12, "time_to_trade"])
+
+    # A longer window also catches B1 dying 250 ticks after A1 and A3; the latest death is credited
+    trades = detect_trades(kills_df, tickrate=64, trade_seconds=5.0)
+    assert trades["is_traded"].tolist() == [True, True, True, False, False]
+    assert trades.loc[13, "trade_of"] == 12
+
+    # A2 died 20 ticks after killing B1, but in the next round, so that is no trade
+    assert not trades.loc[13, "is_traded"]
+
+
+def test_detect_trades_empty():
+    """Test an empty kills table still gets the trade columns."""
+    trades = detect_trades(pd.DataFrame(columns=["tick", "round", "attacker_name", "victim_name"]))
+    assert {"is_traded", "trade_of", "time_to_trade"} <= set(trades.columns)
@@ -0,0 +1,72 @@
+import sys
+import os
+
+# Add the project root directory to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)  # Add to the beginning of sys.path
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm project root is added
+
+import numpy as np
+import pandas as pd
+from code.utility import (
+    UtilityIntervalIndex,
+    combine_utility,
+    utility_at_kills,
+    add_utility_context,
+    utility_kill_credits,
+)
+
+SMOKES = pd.DataFrame({
+    "start_tick": [100, 900], "end_tick": [1250, 2000], "X": [0.0, 5000.0], "Y": [0.0, 0.0],
+    "thrower_name": ["A1", "B1"], "thrower_team_clan_name": ["ClanA", "ClanB"], "round": [1, 1],
+})
+INFERNOS = pd.DataFrame({
+    "start_tick": [500], "end_tick": [950], "X": [100.0], "Y": [0.0],
+    "thrower_name": ["A2"], "thrower_team_clan_name": ["ClanA"], "round": [1],
+})
+KILLS = pd.DataFrame({
+    "tick": [600, 1000, 1300, 1000],
+    "round": [1, 1, 1, 1],
+    "victim_X": [50.0, 50.0, 50.0, np.nan],
+    "victim_Y": [0.0, 0.0, 0.0, 0.0],
+    "victim_name": ["B2", "A3", "B3", "B4"],
+    "victim_team_name": ["TERRORIST", "CT", "TERRORIST", "TERRORIST"],
+    "victim_team_clan_name": ["ClanB", "ClanA", "ClanB", "ClanB"],
+})
+
+
+def test_interval_index_matches_full_scan():
+    """Test the sorted sweep finds exactly the active, nearby intervals a full scan finds."""
+    rng = np.random.default_rng(3)
+    start = rng.integers(0, 100000, 400)
+    utility = pd.DataFrame({
+        "start_tick": start, "end_tick": start + rng.integers(100, 1200, 400),
+        "X": rng.uniform(-2000, 2000, 400), "Y": rng.uniform(-2000, 2000, 400),
+    })
+    ticks, x, y = rng.integers(0, 101000, 300), rng.uniform(-2000, 2000, 300), rng.uniform(-2000, 2000, 300)
+
+    index = UtilityIntervalIndex(utility)
+    queries, rows, _ = index.active_pairs(ticks, x, y, radius=600)
+    found = set(zip(queries.tolist(), index.utility.iloc[rows]["start_tick"].tolist()))
+
+    s, e, ux, uy = (index.utility[col].to_numpy()[None, :] for col in ["start_tick", "end_tick", "X", "Y"])
+    mask = (s <= ticks[:, None]) & (e >= ticks[:, None]) & (np.hypot(ux - x[:, None], uy - y[:, None]) <= 600)
+    expected = {(q, int(s[0, r])) for q, r in zip(*np.nonzero(mask))}
+    assert found == expected
+
+
+def test_utility_at_kills():
+    """Test per-kill context and thrower credits for enemy deaths near active utility."""
+    pairs = utility_at_kills(KILLS, combine_utility(SMOKES, INFERNOS))
+    kills = add_utility_context(KILLS, pairs)
+
+    # Kill 0 is in A1's smoke and A2's fire, kill 1 in A1's smoke only (the fire went out), kill 2 after both
+    assert kills["smokes_nearby"].tolist() == [1, 1, 0, 0]
+    assert kills["infernos_nearby"].tolist() == [1, 0, 0, 0]
+
+    credits = utility_kill_credits(KILLS, pairs)
+    assert sorted(zip(credits["thrower_name"], credits["kind"])) == [("A1", "smoke"), ("A2", "inferno")]
+    assert set(credits["thrower_team_name"]) == {"CT"}
+
+    assert utility_at_kills(KILLS, combine_utility(None, None)).empty
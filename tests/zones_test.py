@@ -0,0 +1,63 @@
+import sys
+import os
+
+# Add project root and code folder to PYTHONPATH
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+code_folder = os.path.join(project_root, "code")
+sys.path.insert(0, code_folder)  # Add 'code' directory first
+sys.path.insert(0, project_root)  # Add project root afterward
+
+print("Updated PYTHONPATH:", sys.path)  # Debugging to confirm updated paths
+
+import json
+import numpy as np
+import pandas as pd
+from code.zones import ZoneRaster, build_zone_raster, assign_zones
+
+ZONES = {
+    "A Site": [[0, 0], [1000, 0], [1000, 1000], [0, 1000]],
+    "Mid": [[800, 800], [2000, 800], [2000, 1600], [800, 1600]],
+}
+
+
+def test_zone_raster_from_polygons():
+    """Test rasterized polygons agree with their geometry and the first zone wins overlaps."""
+    raster = ZoneRaster.from_polygons(ZONES, cell_size=10)
+    zones = raster.lookup([500, 900, 1500, 3000, np.nan, -50], [500, 900, 1200, 3000, 0, 0])
+    assert zones.tolist() == ["A Site", "A Site", "Mid", None, None, None]
+
+
+def test_zone_raster_from_places():
+    """Test cells vote for their most common place name and grow into empty neighbours."""
+    x = [10, 20, 30, 300, 310, 600]
+    y = [10, 20, 30, 10, 10, 10]
+    places = ["BombsiteA", "BombsiteA", "Middle", "Middle", "Middle", ""]
+    raster = ZoneRaster.from_places(x, y, places, cell_size=64, fill_passes=1)
+
+    assert raster.lookup([15, 305, 100, 200], [15, 10, 10, 10]).tolist() == ["A Site", "Middle", "A Site", None]
+
+
+def test_assign_zones(tmp_path):
+    """Test zone columns are added to positional events, reading kill positions from the raw table."""
+    (tmp_path / "de_ancient.json").write_text(json.dumps(ZONES))
+    raster = build_zone_raster("de_ancient", zones_dir=str(tmp_path))
+
+    raw_kills = pd.DataFrame({"attacker_X": [100, 1500], "attacker_Y": [100, 1000], "victim_X": [900, 5000], "victim_Y": [100, 0]})
+    events = {
+        "kills": pd.DataFrame({"tick": [1, 2]}),
+        "smokes": pd.DataFrame({"X": [1200.0], "Y": [900.0]}),
+        "grenades": pd.DataFrame(columns=["X", "Y"]),
+    }
+    events = assign_zones(events, raster, raw_events={"kills": raw_kills})
+
+    assert events["kills"]["attacker_zone"].tolist() == ["A Site", "Mid"]
+    assert events["kills"]["victim_zone"].iloc[0] == "A Site"
+    assert pd.isna(events["kills"]["victim_zone"].iloc[1])
+    assert events["smokes"]["zone"].tolist() == ["Mid"]
+    assert "zone" in events["grenades"].columns
+
+    # Per-zone aggregation is now a plain groupby
+    assert events["kills"].groupby("attacker_zone").size().to_dict() == {"A Site": 1, "Mid": 1}
+
+    # Without polygons or kill place names there is no raster
+    assert build_zone_raster("de_nuke", pd.DataFrame(), zones_dir=str(tmp_path)) is None